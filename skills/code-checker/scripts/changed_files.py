@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Changed-file discovery shared by the code-checker scripts' incremental mode.
+
+Changed files come either from git (--since <rev>: everything that differs
+between <rev> and the working tree, including untracked files) or from an
+explicit list (--files-from <file>, one path per line, '-' for stdin).
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+
+def _git(args: List[str], cwd: Path) -> str:
+    result = subprocess.run(['git'] + args, cwd=cwd, capture_output=True,
+                            text=True, errors='replace')
+    if result.returncode != 0:
+        raise ValueError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def git_toplevel(path: Path) -> Path:
+    """Root of the git work tree containing path."""
+    start = path if path.is_dir() else path.parent
+    return Path(_git(['rev-parse', '--show-toplevel'], start).strip()).resolve()
+
+
+def git_changed_files(path: Path, since: str) -> List[Path]:
+    """
+    Files added, modified or deleted between `since` and the working tree.
+
+    Renames are reported as a delete plus an add. Deleted files are included
+    so callers can drop them from cached state.
+    """
+    top = git_toplevel(path.resolve())
+    try:
+        _git(['rev-parse', '--verify', '--quiet', f'{since}^{{commit}}'], top)
+    except ValueError:
+        raise ValueError(f"unknown git revision '{since}'") from None
+    diff = _git(['diff', '-z', '--name-only', '--no-renames', since, '--'], top)
+    untracked = _git(['ls-files', '-z', '--others', '--exclude-standard'], top)
+    names = {name for name in (diff + untracked).split('\0') if name}
+    return sorted(top / name for name in names)
+
+
+def git_show_file(path: Path, rev: str, top: Optional[Path] = None) -> Optional[str]:
+    """Content of path at rev, or None if it did not exist there."""
+    path = path.resolve()
+    try:
+        top = top or git_toplevel(path)
+        rel = path.relative_to(top).as_posix()
+    except ValueError:
+        return None
+    result = subprocess.run(['git', 'show', f'{rev}:{rel}'], cwd=top,
+                            capture_output=True, text=True, errors='ignore')
+    return result.stdout if result.returncode == 0 else None
+
+
+def read_files_from(list_file: str) -> List[Path]:
+    """Read paths from a list file ('-' for stdin); blank lines and # comments are skipped."""
+    if list_file == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(list_file, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    return [Path(line.strip()).resolve() for line in lines
+            if line.strip() and not line.lstrip().startswith('#')]
+
+
+def changed_files(path: Path, since: Optional[str], files_from: Optional[str]) -> List[Path]:
+    """Resolve the changed-file list for --since / --files-from."""
+    if files_from:
+        return read_files_from(files_from)
+    return git_changed_files(path, since)
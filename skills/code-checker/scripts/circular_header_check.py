@@ -9,13 +9,20 @@ Detects circular dependencies between these directory modules.
 """
 
 import argparse
+import hashlib
+import json
 import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Dict, Set, List, Tuple
-from collections import defaultdict
+from typing import Callable, Dict, Iterable, Optional, Set, List, Tuple
+from array import array
+from collections import defaultdict, deque
+from xml.sax.saxutils import quoteattr
+
+from changed_files import changed_files, git_show_file, git_toplevel
 
 
 @dataclass
@@ -40,6 +47,10 @@ class CircularDependency:
     """Represents a circular dependency path."""
     cycle: List[str]  # List of directory paths
     cycle_type: str  # 'header' or 'module' or 'directory'
+    # All modules of the strongly connected component the cycle was taken from
+    members: List[str] = field(default_factory=list)
+    # (from_module, to_module) -> [(file_path, IncludeInfo)] for each edge of the cycle
+    edge_files: Dict[Tuple[str, str], List[Tuple[str, IncludeInfo]]] = field(default_factory=dict)
 
 
 @dataclass
@@ -64,6 +75,21 @@ INCLUDE_PATTERN = re.compile(
 # GN build file patterns
 GN_INCLUDE_DIR = re.compile(r'"([^"]+)"')
 
+# Directories never descended into while scanning
+SKIP_DIRS = {'build', 'out', 'node_modules', '.git', 'third_party',
+             'vendor', 'external', '__pycache__', 'cmake-build'}
+
+# Persistent per-file include cache; by default one file per scan root under
+# the user cache directory, so scanning never writes into the scanned tree
+CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'ohos_code_checker'
+CACHE_VERSION = 1
+
+# Include graph export formats, selected by --graph-format or the output suffix
+GRAPH_FORMATS = {'.json': 'json', '.graphml': 'graphml', '.dot': 'dot', '.gv': 'dot'}
+
+# Below this many files to read, a process pool costs more than it saves
+PARALLEL_MIN_FILES = 64
+
 
 def get_file_type(file_path: Path) -> str:
     """Determine if a file is a header or source file."""
@@ -101,11 +127,9 @@ def parse_gn_build_file(gn_file: Path) -> List[str]:
 def find_gn_build_files(root_path: Path) -> List[Path]:
     """Find all BUILD.gn and *.gni files in the project."""
     build_files = []
-    skip_dirs = {'build', 'out', 'node_modules', '.git', 'third_party',
-                 'vendor', 'external', '__pycache__', 'cmake-build'}
 
     for root, dirs, files in os.walk(root_path):
-        dirs[:] = [d for d in dirs if d not in skip_dirs]
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
         for filename in files:
             if filename == 'BUILD.gn' or filename.endswith('.gni'):
                 build_files.append(Path(root) / filename)
@@ -159,6 +183,25 @@ def normalize_include_path(include: str, source_dir: Path,
     return result
 
 
+def extract_local_includes(content: str) -> List[Tuple[str, int]]:
+    """
+    Extract quoted includes as (include_path, line_number) pairs.
+
+    Line numbers are counted incrementally between matches, so the whole
+    file is traversed once.
+    """
+    includes = []
+    line_num = 1
+    last_pos = 0
+    for match in INCLUDE_PATTERN.finditer(content):
+        include_spec = match.group('angle')
+        line_num += content.count('\n', last_pos, match.start())
+        last_pos = match.start()
+        if not include_spec.startswith('<'):  # Only track local includes
+            includes.append((include_spec.strip('"'), line_num))
+    return includes
+
+
 def scan_file(file_path: Path, include_dirs: Set[Path], file_cache: Dict[str, str]) -> FileInfo:
     """Scan a single C/C++ file for includes."""
     try:
@@ -178,22 +221,126 @@ def scan_file(file_path: Path, include_dirs: Set[Path], file_cache: Dict[str, st
 
     source_dir = file_path.parent
 
-    for match in INCLUDE_PATTERN.finditer(content):
-        include_spec = match.group('angle')
-        line_num = content[:match.start()].count('\n') + 1
-        is_system = include_spec.startswith('<')
-
-        if not is_system:  # Only track local includes
-            resolved = normalize_include_path(include_spec, source_dir, include_dirs, file_cache)
-            file_info.includes.append(IncludeInfo(
-                included_file=resolved,
-                line_number=line_num,
-                is_system=is_system
-            ))
+    for include_path, line_num in extract_local_includes(content):
+        resolved = normalize_include_path(f'"{include_path}"', source_dir, include_dirs, file_cache)
+        file_info.includes.append(IncludeInfo(
+            included_file=resolved,
+            line_number=line_num,
+            is_system=False
+        ))
 
     return file_info
 
 
+def read_file_includes(file_path: str) -> List[Tuple[str, int]]:
+    """Read one file and return its local includes; unreadable files have none."""
+    try:
+        with open(file_path, encoding='utf-8', errors='ignore') as f:
+            return extract_local_includes(f.read())
+    except OSError:
+        return []
+
+
+class IncludeIndex:
+    """
+    In-memory index of scanned files for include resolution without filesystem probes.
+
+    Only files found by the project walk are indexed. Those are the only files
+    that can belong to a directory module, so restricting resolution to them
+    does not change which module edges are found.
+    """
+
+    def __init__(self, files: Iterable[str], include_dirs: Set[Path]):
+        self.files = set(files)
+        self.by_name = defaultdict(list)
+        for file_path in sorted(self.files):
+            self.by_name[os.path.basename(file_path)].append(file_path)
+        self.include_dirs = {str(d) for d in include_dirs}
+        self.cache = {}
+
+    def _in_include_dirs(self, include_path: str) -> Optional[str]:
+        norm = os.path.normpath(include_path)
+        if os.path.isabs(norm) or norm.startswith(os.pardir):
+            # Paths escaping the include dir cannot be matched by suffix
+            for inc_dir in sorted(self.include_dirs):
+                candidate = os.path.normpath(os.path.join(inc_dir, include_path))
+                if candidate in self.files:
+                    return candidate
+            return None
+
+        suffix = os.sep + norm
+        for candidate in self.by_name.get(os.path.basename(norm), ()):
+            if candidate.endswith(suffix) and candidate[:-len(suffix)] in self.include_dirs:
+                return candidate
+        return None
+
+    def resolve(self, include_path: str, source_dir: str) -> str:
+        """
+        Resolve an include the same way normalize_include_path does: relative
+        to the including file first, then the include directories, then with
+        .h/.hpp appended when the include has no extension.
+        """
+        cache_key = (source_dir, include_path)
+        if cache_key in self.cache:
+            return self.cache[cache_key]
+
+        names = [include_path]
+        if not Path(include_path).suffix:
+            names.extend(include_path + suffix for suffix in ('.h', '.hpp'))
+
+        result = include_path
+        for name in names:
+            rel_path = os.path.normpath(os.path.join(source_dir, name))
+            if rel_path in self.files:
+                result = rel_path
+                break
+            found = self._in_include_dirs(name)
+            if found:
+                result = found
+                break
+
+        self.cache[cache_key] = result
+        return result
+
+
+def default_cache_path(root: Path) -> Path:
+    """Cache file for a scan root: <CACHE_DIR>/circular_header-<name>-<hash of path>.json."""
+    root = root.resolve()
+    digest = hashlib.sha1(str(root).encode('utf-8')).hexdigest()[:16]
+    return CACHE_DIR / f'circular_header-{root.name or "root"}-{digest}.json'
+
+
+def load_include_cache(cache_path: Path) -> Tuple[Dict[str, list], List[str]]:
+    """
+    Load the include cache.
+
+    Returns (entries, include_dirs) where entries maps path -> [mtime_ns, size,
+    includes] and include_dirs are those found by the scan that wrote it.
+    """
+    try:
+        with open(cache_path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}, []
+    if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+        return {}, []
+    return data.get('files', {}), data.get('include_dirs', [])
+
+
+def save_include_cache(cache_path: Path, entries: Dict[str, list],
+                       include_dirs: Iterable[Path] = ()) -> None:
+    """Write the include cache atomically."""
+    Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f'{cache_path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': CACHE_VERSION,
+            'include_dirs': sorted(str(d) for d in include_dirs),
+            'files': entries,
+        }, f, separators=(',', ':'))
+    os.replace(tmp_path, cache_path)
+
+
 def get_component_module(dir_path: str, root_path: Path) -> str:
     """
     Get the component/module name for a file directory.
@@ -281,21 +428,111 @@ def group_files_by_directory(all_files: Dict[str, FileInfo],
     return modules, file_to_module
 
 
+def strongly_connected_components(graph: Dict[str, Set[str]]) -> List[List[str]]:
+    """
+    Iterative Tarjan SCC over an adjacency mapping.
+
+    Runs in O(V + E) with an explicit stack, so deep module graphs cannot hit
+    Python's recursion limit. Nodes only reachable as edge targets are included.
+    """
+    index_of = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+
+    nodes = set(graph)
+    for targets in graph.values():
+        nodes.update(targets)
+
+    for start in sorted(nodes):
+        if start in index_of:
+            continue
+        index_of[start] = lowlink[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+        work = [(start, iter(sorted(graph.get(start, ()))))]
+        while work:
+            node, neighbors = work[-1]
+            advanced = False
+            for neighbor in neighbors:
+                if neighbor not in index_of:
+                    index_of[neighbor] = lowlink[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack.add(neighbor)
+                    work.append((neighbor, iter(sorted(graph.get(neighbor, ())))))
+                    advanced = True
+                    break
+                if neighbor in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[neighbor])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index_of[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+
+    return components
+
+
+def shortest_cycle(graph: Dict[str, Set[str]], component: List[str],
+                   start: Optional[str] = None) -> List[str]:
+    """
+    Shortest cycle through `start` (default: the smallest member) of a
+    strongly connected component.
+
+    BFS restricted to the component; returns a closed path [a, ..., a].
+    """
+    members = set(component)
+    start = start or component[0]
+    parent = {}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for neighbor in sorted(graph.get(node, ())):
+            if neighbor not in members:
+                continue
+            if neighbor == start:
+                path = [node]
+                while path[-1] != start:
+                    path.append(parent[path[-1]])
+                return list(reversed(path)) + [start]
+            if neighbor not in parent:
+                parent[neighbor] = node
+                queue.append(neighbor)
+    return [start, start]
+
+
 def find_directory_cycles(all_files: Dict[str, FileInfo],
                          modules: Dict[str, ModuleInfo],
                          file_to_module: Dict[str, str],
-                         root_path: Path) -> List[CircularDependency]:
+                         root_path: Path,
+                         start_key: Optional[Callable[[str], tuple]] = None) -> List[CircularDependency]:
     """
     Find circular dependencies between directory modules.
     A directory A depends on directory B if any file in A includes any file in B.
+
+    Every strongly connected component with more than one module is reported
+    once, with its shortest representative cycle and the includes behind each
+    edge of that cycle. The cycle goes through the member that sorts first by
+    start_key, or the smallest member by default.
     """
     # Build directory dependency graph
     graph = defaultdict(set)  # module_name -> set of dependent module names
-
-    # Track which files in each module are included by others
-    module_file_set = {}  # module_name -> set of file paths in that module
-    for mod_name, mod_info in modules.items():
-        module_file_set[mod_name] = set(mod_info.files)
+    # (from_module, to_module) -> [(file_path, IncludeInfo)]
+    edge_files = defaultdict(list)
 
     # Build dependencies: for each file in each module, check what it includes
     for mod_name, mod_info in modules.items():
@@ -310,63 +547,33 @@ def find_directory_cycles(all_files: Dict[str, FileInfo],
                 if inc.included_file:
                     # Check if the included file belongs to any module
                     target_mod = file_to_module.get(inc.included_file)
-                    if target_mod and target_mod != mod_name:
+                    if target_mod and target_mod != mod_name and target_mod in modules:
                         dependencies.add(target_mod)
+                        edge_files[(mod_name, target_mod)].append((file_path, inc))
 
         graph[mod_name] = dependencies
 
-    # Find cycles using DFS
     cycles = []
-    visited = set()
-    rec_stack = set()
-
-    def dfs(node: str, path: List[str]) -> None:
-        if node in rec_stack:
-            # Found a cycle
-            cycle_start = path.index(node)
-            cycles.append(path[cycle_start:] + [node])
-            return
-
-        if node in visited:
-            return
-
-        visited.add(node)
-        rec_stack.add(node)
-
-        for neighbor in graph.get(node, set()):
-            if neighbor in modules:  # Only follow edges to known modules
-                dfs(neighbor, path + [node])
-
-        rec_stack.remove(node)
-
-    for mod_name in modules:
-        if mod_name not in visited:
-            dfs(mod_name, [])
-
-    # Deduplicate cycles
-    unique_cycles = []
-    seen = set()
-
-    for cycle in cycles:
-        # Normalize by rotating to start with smallest element
-        min_idx = cycle.index(min(cycle))
-        rotated = tuple(cycle[min_idx:] + cycle[:min_idx])
-        reverse_rotated = tuple(reversed(rotated))
-
-        if rotated not in seen and reverse_rotated not in seen:
-            seen.add(rotated)
-            unique_cycles.append(cycle)
-
-    return [CircularDependency(cycle=c, cycle_type='directory') for c in unique_cycles]
-
-
-def scan_project(root_path: Path, verbose: bool = False) -> Tuple[Dict[str, FileInfo], Set[Path]]:
-    """Scan entire project for C/C++ files."""
-    all_files = {}
-    all_include_dirs = {root_path.resolve()}
-    file_cache = {}
-    skip_dirs = {'build', 'out', 'node_modules', '.git', 'third_party',
-                 'vendor', 'external', '__pycache__', 'cmake-build'}
+    for component in strongly_connected_components(graph):
+        if len(component) < 2:
+            continue
+        start = min(component, key=start_key) if start_key else None
+        cycle = shortest_cycle(graph, component, start)
+        cycles.append(CircularDependency(
+            cycle=cycle,
+            cycle_type='directory',
+            members=component,
+            edge_files={
+                (a, b): edge_files[(a, b)] for a, b in zip(cycle, cycle[1:])
+            },
+        ))
+
+    return cycles
+
+
+def find_include_dirs(root_path: Path, verbose: bool = False) -> Set[Path]:
+    """Collect include directories from GN build files; the root is always included."""
+    all_include_dirs = {root_path}
 
     # Find GN build files
     if verbose:
@@ -384,41 +591,487 @@ def scan_project(root_path: Path, verbose: bool = False) -> Tuple[Dict[str, File
             if inc_path.exists():
                 all_include_dirs.add(inc_path)
 
-    # Scan files
+    return all_include_dirs
+
+
+def file_stamp(file_path: str) -> List[int]:
+    """[mtime_ns, size] cache key of a file; [0, -1] if it cannot be stat'ed."""
+    try:
+        st = os.stat(file_path)
+        return [st.st_mtime_ns, st.st_size]
+    except OSError:
+        return [0, -1]
+
+
+def collect_include_entries(root_path: Path, include_dirs: Set[Path], verbose: bool = False,
+                            jobs: int = 1, cache_path: Optional[Path] = None) -> Dict[str, list]:
+    """
+    Walk root_path and return path -> [mtime_ns, size, includes] for every C/C++ file.
+
+    Files whose (mtime_ns, size) match the include cache are not re-read; the
+    rest are read across `jobs` processes. The cache is rewritten if anything
+    changed.
+    """
     if verbose:
         print("Scanning C/C++ files...", file=sys.stderr, flush=True)
-    count = 0
+    stamps = {}
     for root, dirs, files in os.walk(root_path):
-        dirs[:] = [d for d in dirs if d not in skip_dirs]
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
 
         for filename in files:
             ext = os.path.splitext(filename)[1].lower()
             if ext in CPP_EXTENSIONS:
-                file_path = Path(root) / filename
-                file_info = scan_file(file_path, all_include_dirs, file_cache)
-                all_files[file_info.path] = file_info
-                count += 1
+                file_path = os.path.join(root, filename)
+                stamps[file_path] = file_stamp(file_path)
+
+    cached, cached_dirs = load_include_cache(cache_path) if cache_path else ({}, [])
+    entries = {}
+    stale = []
+    for file_path, stamp in stamps.items():
+        entry = cached.get(file_path)
+        if entry and entry[:2] == stamp:
+            entries[file_path] = entry
+        else:
+            stale.append(file_path)
+
+    if verbose:
+        print(f"  {len(stamps)} files, {len(stamps) - len(stale)} cached, "
+              f"{len(stale)} to read", file=sys.stderr, flush=True)
+
+    if jobs > 1 and len(stale) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = executor.map(read_file_includes, stale, chunksize=32)
+            for count, (file_path, includes) in enumerate(zip(stale, results), 1):
+                entries[file_path] = stamps[file_path] + [includes]
                 if verbose and count % 500 == 0:
                     print(f"  Scanned {count} files...", file=sys.stderr, flush=True)
+    else:
+        for count, file_path in enumerate(stale, 1):
+            entries[file_path] = stamps[file_path] + [read_file_includes(file_path)]
+            if verbose and count % 500 == 0:
+                print(f"  Scanned {count} files...", file=sys.stderr, flush=True)
+
+    dirs_changed = sorted(str(d) for d in include_dirs) != sorted(cached_dirs)
+    if cache_path and (stale or dirs_changed or len(entries) != len(cached)):
+        try:
+            save_include_cache(cache_path, entries, include_dirs)
+        except OSError as e:
+            if verbose:
+                print(f"Warning: cannot write include cache {cache_path}: {e}",
+                      file=sys.stderr)
+
+    return entries
+
+
+def file_skeletons(paths: Iterable[str]) -> Dict[str, FileInfo]:
+    """FileInfo per path with includes left empty, to be filled by resolve_includes."""
+    return {
+        path: FileInfo(path=path, dir_path=os.path.dirname(path),
+                       file_type=get_file_type(Path(path)))
+        for path in paths
+    }
+
+
+def resolve_includes(file_info: FileInfo, includes: List[Tuple[str, int]],
+                     index: IncludeIndex) -> None:
+    """Fill file_info.includes from raw (include_path, line_number) pairs."""
+    file_info.includes = [
+        IncludeInfo(
+            included_file=index.resolve(include_path, file_info.dir_path),
+            line_number=line_num,
+            is_system=False
+        )
+        for include_path, line_num in includes
+    ]
+
+
+def scan_project(root_path: Path, verbose: bool = False, jobs: int = 1,
+                 cache_path: Optional[Path] = None) -> Tuple[Dict[str, FileInfo], Set[Path]]:
+    """
+    Scan entire project for C/C++ files.
+
+    Includes are read through the include cache (see collect_include_entries)
+    and resolved against an index of the scanned files.
+    """
+    root_path = root_path.resolve()
+    all_include_dirs = find_include_dirs(root_path, verbose)
+    entries = collect_include_entries(root_path, all_include_dirs, verbose, jobs, cache_path)
+
+    # Resolve includes
+    index = IncludeIndex(entries, all_include_dirs)
+    all_files = file_skeletons(entries)
+    for file_path, file_info in all_files.items():
+        resolve_includes(file_info, entries[file_path][2], index)
 
     return all_files, all_include_dirs
 
 
+def reachable_modules(start: Iterable[str], modules: Dict[str, ModuleInfo],
+                      file_to_module: Dict[str, str], all_files: Dict[str, FileInfo],
+                      prepare_file) -> Dict[str, ModuleInfo]:
+    """
+    Modules reachable from `start` over module include edges.
+
+    Only files of visited modules are passed to prepare_file (which must fill
+    their includes), so the rest of the tree is never resolved.
+    """
+    visited = set()
+    queue = deque(mod for mod in start if mod in modules)
+    while queue:
+        mod_name = queue.popleft()
+        if mod_name in visited:
+            continue
+        visited.add(mod_name)
+        for file_path in modules[mod_name].files:
+            prepare_file(file_path)
+            for inc in all_files[file_path].includes:
+                target_mod = file_to_module.get(inc.included_file)
+                if target_mod and target_mod in modules and target_mod not in visited:
+                    queue.append(target_mod)
+    return {mod_name: modules[mod_name] for mod_name in visited}
+
+
+def scan_incremental(root_path: Path, changed: List[Path], since: Optional[str] = None,
+                     verbose: bool = False, jobs: int = 1, cache_path: Optional[Path] = None
+                     ) -> Tuple[List[CircularDependency], Dict[str, FileInfo],
+                                Dict[str, ModuleInfo], Set[Path]]:
+    """
+    Find cycles introduced by the changed files only.
+
+    Unchanged files come from the include cache (a full scan fills it first if
+    it is empty). The baseline is the cache itself, or with `since` the changed
+    files' content at that revision; with neither, all cycles through changed
+    modules are reported. Both graphs are explored only from the
+    modules owning changed files; a current strongly connected component is new
+    unless all its members already formed one component in the baseline.
+
+    The cache stays a baseline: only refreshed unchanged files are written
+    back, so rerunning with the same changes reports the same cycles. Changed
+    files are picked up by the next full scan.
+
+    Returns (new_cycles, all_files, reachable_modules, include_dirs).
+    """
+    root_path = root_path.resolve()
+    cached_entries, cached_dirs = load_include_cache(cache_path) if cache_path else ({}, [])
+    entries = cached_entries
+
+    gn_changed = any(p.name == 'BUILD.gn' or p.suffix == '.gni' for p in changed)
+    if cached_dirs and not gn_changed:
+        include_dirs = {Path(d) for d in cached_dirs}
+    else:
+        include_dirs = find_include_dirs(root_path, verbose)
+
+    # Without a cache or a revision there is nothing to compare against, so
+    # every cycle through a changed module is reported
+    has_baseline = bool(entries) or bool(since)
+    if not entries:
+        if verbose:
+            print("No include cache, scanning the full tree...", file=sys.stderr)
+        entries = collect_include_entries(root_path, include_dirs, verbose, jobs)
+
+    changed_paths = set()
+    for file_path in changed:
+        if file_path.suffix.lower() not in CPP_EXTENSIONS or root_path not in file_path.parents:
+            continue
+        if not SKIP_DIRS.intersection(file_path.relative_to(root_path).parts[:-1]):
+            changed_paths.add(str(file_path))
+
+    current = dict(entries)
+    baseline = dict(entries)
+    # What gets written back: changed files keep their cached entry, and have
+    # none if the cache was only just built from the current tree
+    saved = {path: entry for path, entry in entries.items()
+             if cached_entries or path not in changed_paths}
+    top = git_toplevel(root_path) if since and changed_paths else None
+    for file_path in changed_paths:
+        if os.path.isfile(file_path):
+            current[file_path] = file_stamp(file_path) + [read_file_includes(file_path)]
+        else:
+            current.pop(file_path, None)
+        if since:
+            content = git_show_file(Path(file_path), since, top)
+            if content is None:
+                baseline.pop(file_path, None)
+            else:
+                baseline[file_path] = [0, -1, extract_local_includes(content)]
+
+    if verbose:
+        print(f"  {len(changed_paths)} changed files", file=sys.stderr, flush=True)
+
+    changed_modules = {get_component_module(os.path.dirname(p), root_path) for p in changed_paths}
+
+    def explore(state: Dict[str, list], start_key=None):
+        all_files = file_skeletons(state)
+        modules, file_to_module = group_files_by_directory(all_files, root_path)
+        index = IncludeIndex(state, include_dirs)
+
+        def prepare_file(file_path: str) -> None:
+            # Unchanged files may have moved on since the cache was written
+            if file_path not in changed_paths:
+                stamp = file_stamp(file_path)
+                if state[file_path][:2] != stamp:
+                    entry = stamp + [read_file_includes(file_path)]
+                    current[file_path] = baseline[file_path] = saved[file_path] = entry
+            resolve_includes(all_files[file_path], state[file_path][2], index)
+
+        reachable = reachable_modules(changed_modules, modules, file_to_module, all_files, prepare_file)
+        cycles = find_directory_cycles(all_files, reachable, file_to_module, root_path, start_key)
+        touched = [c for c in cycles if changed_modules.intersection(c.members)]
+        return touched, all_files, reachable
+
+    baseline_components = [set(c.members) for c in explore(baseline)[0]] if has_baseline else []
+    previously_cyclic = set().union(*baseline_components)
+
+    # Show each cycle through a module that newly joined it, else a changed one
+    def start_key(mod_name: str) -> tuple:
+        return mod_name in previously_cyclic, mod_name not in changed_modules, mod_name
+
+    cycles, all_files, reachable = explore(current, start_key)
+    new_cycles = [c for c in cycles
+                  if not any(set(c.members) <= members for members in baseline_components)]
+
+    if cache_path and saved != cached_entries:
+        try:
+            save_include_cache(cache_path, saved, cached_dirs or include_dirs)
+        except OSError as e:
+            if verbose:
+                print(f"Warning: cannot write include cache {cache_path}: {e}",
+                      file=sys.stderr)
+
+    return new_cycles, all_files, reachable, include_dirs
+
+
+# Nodes per bitset pass in IncludeGraph closure metrics
+CLOSURE_CHUNK_BITS = 4096
+
+
+def popcount(bits: int) -> int:
+    """Number of set bits (int.bit_count is 3.10+)."""
+    return bin(bits).count('1')
+
+
+class IncludeGraph:
+    """
+    File-level include graph over the scanned files.
+
+    Files get integer IDs in sorted path order; edges are stored CSR-style in
+    two int arrays (`offsets`, `targets`) so the graph stays compact for
+    tens of thousands of files. Only includes that resolve to a scanned file
+    become edges.
+    """
+
+    def __init__(self, all_files: Dict[str, FileInfo]):
+        self.paths = sorted(all_files)
+        self.ids = {path: i for i, path in enumerate(self.paths)}
+        self.is_source = [all_files[path].file_type == 'source' for path in self.paths]
+        self.offsets = array('i', [0])
+        self.targets = array('i')
+
+        for i, path in enumerate(self.paths):
+            successors = set()
+            for inc in all_files[path].includes:
+                target = self.ids.get(inc.included_file)
+                if target is not None and target != i:
+                    successors.add(target)
+            self.targets.extend(sorted(successors))
+            self.offsets.append(len(self.targets))
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def successors(self, node: int) -> array:
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def edges(self) -> Iterable[Tuple[int, int]]:
+        for node in range(len(self.paths)):
+            for target in self.successors(node):
+                yield node, target
+
+    def predecessors(self) -> List[List[int]]:
+        reverse = [[] for _ in self.paths]
+        for node, target in self.edges():
+            reverse[target].append(node)
+        return reverse
+
+    @staticmethod
+    def _reachable_counts(adjacency: List, weighted: List[bool],
+                          chunk_bits: int = CLOSURE_CHUNK_BITS) -> List[int]:
+        """
+        Number of `weighted` nodes reachable from each node (itself included).
+
+        Works on the SCC condensation: Tarjan emits components sinks first, so
+        each component only merges bitsets that are already final. Bitsets
+        cover `chunk_bits` nodes per pass and are counted as they finish, so
+        memory stays O(components * chunk_bits / 8) rather than O(n^2 / 8).
+        """
+        graph = {node: adjacency[node] for node in range(len(adjacency))}
+        components = strongly_connected_components(graph)
+        component_of = [0] * len(adjacency)
+        for index, component in enumerate(components):
+            for node in component:
+                component_of[node] = index
+        component_targets = []
+        for index, component in enumerate(components):
+            targets = {component_of[target] for node in component for target in adjacency[node]}
+            targets.discard(index)
+            component_targets.append(targets)
+
+        counts = [0] * len(components)
+        for low in range(0, len(adjacency), chunk_bits):
+            high = min(low + chunk_bits, len(adjacency))
+            if not any(weighted[low:high]):
+                continue
+            component_bits = [0] * len(components)
+            for index, component in enumerate(components):
+                bits = 0
+                for node in component:
+                    if low <= node < high and weighted[node]:
+                        bits |= 1 << (node - low)
+                for target_component in component_targets[index]:
+                    bits |= component_bits[target_component]
+                component_bits[index] = bits
+                counts[index] += popcount(bits)
+
+        return [counts[component_of[node]] for node in range(len(adjacency))]
+
+    def analyze(self) -> Dict[str, List[int]]:
+        """
+        Per-file metrics:
+        - fan_in / fan_out: direct includers / direct includes
+        - closure: files transitively included
+        - rebuild_tus: source files (TUs) that transitively include the file,
+          i.e. what an edit to it recompiles
+        """
+        n = len(self.paths)
+        forward = [self.successors(node) for node in range(n)]
+        reverse = self.predecessors()
+
+        closure = self._reachable_counts(forward, [True] * n)
+        rebuild_tus = self._reachable_counts(reverse, self.is_source)
+
+        return {
+            'fan_in': [len(preds) for preds in reverse],
+            'fan_out': [len(succs) for succs in forward],
+            'closure': [count - 1 for count in closure],
+            'rebuild_tus': rebuild_tus,
+        }
+
+    def display_paths(self, root_path: Path) -> List[str]:
+        root = str(root_path.resolve())
+        return [os.path.relpath(path, root) if path.startswith(root + os.sep) else path
+                for path in self.paths]
+
+
+def export_include_graph(graph: IncludeGraph, metrics: Dict[str, List[int]],
+                         root_path: Path, output_path: str, fmt: str) -> None:
+    """Write the include graph with per-file metrics as JSON, GraphML or DOT."""
+    names = graph.display_paths(root_path)
+    attrs = ['fan_in', 'fan_out', 'closure', 'rebuild_tus']
+
+    def node_type(node: int) -> str:
+        return 'source' if graph.is_source[node] else 'header'
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        if fmt == 'json':
+            json.dump({
+                'root': str(root_path.resolve()),
+                'nodes': [
+                    dict({'id': node, 'path': names[node], 'type': node_type(node)},
+                         **{attr: metrics[attr][node] for attr in attrs})
+                    for node in range(len(graph))
+                ],
+                'edges': [list(edge) for edge in graph.edges()],
+            }, f, indent=1)
+            f.write('\n')
+        elif fmt == 'graphml':
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            f.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+            f.write('  <key id="path" for="node" attr.name="path" attr.type="string"/>\n')
+            f.write('  <key id="type" for="node" attr.name="type" attr.type="string"/>\n')
+            for attr in attrs:
+                f.write(f'  <key id="{attr}" for="node" attr.name="{attr}" attr.type="int"/>\n')
+            f.write('  <graph id="includes" edgedefault="directed">\n')
+            for node in range(len(graph)):
+                f.write(f'    <node id="n{node}">')
+                f.write(f'<data key="path">{quoteattr(names[node])[1:-1]}</data>')
+                f.write(f'<data key="type">{node_type(node)}</data>')
+                for attr in attrs:
+                    f.write(f'<data key="{attr}">{metrics[attr][node]}</data>')
+                f.write('</node>\n')
+            for source, target in graph.edges():
+                f.write(f'    <edge source="n{source}" target="n{target}"/>\n')
+            f.write('  </graph>\n</graphml>\n')
+        else:
+            f.write('digraph includes {\n')
+            f.write('  node [shape=box];\n')
+            for node in range(len(graph)):
+                label = names[node].replace('\\', '\\\\').replace('"', '\\"')
+                shape = ' shape=ellipse' if graph.is_source[node] else ''
+                f.write(f'  n{node} [label="{label}"{shape}];\n')
+            for source, target in graph.edges():
+                f.write(f'  n{source} -> n{target};\n')
+            f.write('}\n')
+
+
+def generate_hotspot_report(graph: IncludeGraph, metrics: Dict[str, List[int]],
+                            root_path: Path, top: int) -> str:
+    """Markdown tables of the headers that matter most for build time."""
+    names = graph.display_paths(root_path)
+    headers = [node for node in range(len(graph)) if not graph.is_source[node]]
+    total_tus = sum(graph.is_source)
+
+    lines = [
+        "## Include Hotspots",
+        "",
+        f"**Files:** {len(graph)} ({total_tus} sources), "
+        f"**Include Edges:** {len(graph.targets)}",
+        "",
+    ]
+
+    tables = [
+        ("Headers Whose Edit Rebuilds the Most TUs", 'rebuild_tus', "TUs Rebuilt"),
+        ("Highest Fan-In Headers", 'fan_in', "Direct Includers"),
+        ("Largest Transitive Include Closures", 'closure', "Files Pulled In"),
+    ]
+    for title, key, column in tables:
+        pool = range(len(graph)) if key == 'closure' else headers
+        ranked = sorted(pool, key=lambda node: (-metrics[key][node], names[node]))[:top]
+        lines.extend([f"### {title}", "", f"| File | {column} |", "|------|------|"])
+        for node in ranked:
+            if metrics[key][node] == 0:
+                break
+            lines.append(f"| `{names[node]}` | {metrics[key][node]} |")
+        lines.append("")
+
+    return "\n".join(lines)
+
+
 def generate_markdown_report(directory_cycles: List[CircularDependency],
                              all_files: Dict[str, FileInfo],
                              modules: Dict[str, ModuleInfo],
                              root_path: Path,
-                             include_dirs: Set[Path]) -> str:
+                             include_dirs: Set[Path],
+                             incremental: str = '') -> str:
     """Generate a markdown report."""
     lines = [
         "# C/C++ Circular Dependency Report (Directory-Based)",
         "",
         f"**Scan Path:** `{root_path}`",
         "",
+    ]
+
+    if incremental:
+        lines.extend([
+            f"**Mode:** incremental ({incremental}); only cycles through changed modules "
+            "that did not exist before are reported",
+            "",
+        ])
+
+    lines.extend([
         f"**Include Directories:** {len(include_dirs)}",
         f"**Files Scanned:** {len(all_files)}",
         f"**Directory Modules:** {len(modules)}",
-    ]
+    ])
 
     if directory_cycles:
         lines.append(f"**Circular Dependencies:** {len(directory_cycles)}")
@@ -445,6 +1098,13 @@ def generate_markdown_report(directory_cycles: List[CircularDependency],
             lines.append("**Dependency Details:**")
             lines.append("")
 
+            if len(cycle.members) > len(cycle.cycle) - 1:
+                lines.append(
+                    f"**Component:** {len(cycle.members)} mutually dependent modules "
+                    f"(shortest cycle shown): " + ", ".join(f"`{m}`" for m in cycle.members)
+                )
+                lines.append("")
+
             for j, mod_name in enumerate(cycle.cycle):
                 if j == 0:
                     lines.append(f"- `{mod_name}/`")
@@ -453,30 +1113,23 @@ def generate_markdown_report(directory_cycles: List[CircularDependency],
                     lines.append(f"- `{mod_name}/`")
 
                 # Show which files in this directory create the dependency
-                mod_info = modules.get(mod_name)
-                next_mod = cycle.cycle[(j + 1) % len(cycle.cycle)]
-
-                if mod_info and j < len(cycle.cycle) - 1:
-                    # Find files that include something from the next module
-                    next_mod_info = modules.get(next_mod)
-                    if next_mod_info:
-                        next_files = set(next_mod_info.files)
-                        deps_found = []
-
-                        for file_path in mod_info.files:
-                            file_info = all_files.get(file_path)
-                            if file_info:
-                                for inc in file_info.includes:
-                                    if inc.included_file in next_files:
-                                        filename = Path(file_path).name
-                                        target_file = Path(inc.included_file).name
-                                        deps_found.append(f"  - `{filename}` includes `{target_file}` (line {inc.line_number})")
-                                        break
-
-                        if deps_found:
-                            lines.extend(deps_found[:3])  # Show up to 3 examples
-                            if len(deps_found) > 3:
-                                lines.append(f"  - ... and {len(deps_found) - 3} more")
+                if j < len(cycle.cycle) - 1:
+                    next_mod = cycle.cycle[j + 1]
+                    deps_found = []
+                    seen_files = set()
+                    for file_path, inc in cycle.edge_files.get((mod_name, next_mod), []):
+                        # One example per including file
+                        if file_path in seen_files:
+                            continue
+                        seen_files.add(file_path)
+                        filename = Path(file_path).name
+                        target_file = Path(inc.included_file).name
+                        deps_found.append(f"  - `{filename}` includes `{target_file}` (line {inc.line_number})")
+
+                    if deps_found:
+                        lines.extend(deps_found[:3])  # Show up to 3 examples
+                        if len(deps_found) > 3:
+                            lines.append(f"  - ... and {len(deps_found) - 3} more")
 
                 lines.append("")
 
@@ -528,9 +1181,29 @@ def main():
                         help='Verbose output')
     parser.add_argument('--no-gn', action='store_true',
                         help='Skip GN parsing')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Parallel file readers (default: CPU count)')
+    parser.add_argument('--cache', help=f'Include cache file (default: one file per scan root in {CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Do not read or write the include cache')
+    parser.add_argument('--graph', help='Export the file-level include graph to this file')
+    parser.add_argument('--graph-format', choices=sorted(set(GRAPH_FORMATS.values())),
+                        help='Include graph format (default: from --graph suffix, else json)')
+    parser.add_argument('--hotspots', type=int, default=0, metavar='N',
+                        help='Append top-N fan-in / closure / rebuild-impact tables to the report')
+    parser.add_argument('--since', metavar='REV',
+                        help='Only check modules reachable from files changed since this git '
+                             'revision and report cycles that are new relative to it')
+    parser.add_argument('--files-from', metavar='FILE',
+                        help="Only check modules reachable from the files listed in FILE "
+                             "('-' for stdin), relative to the include cache")
 
     args = parser.parse_args()
     scan_path = Path(args.path)
+    incremental = bool(args.since or args.files_from)
+
+    if incremental and (args.graph or args.hotspots > 0):
+        parser.error('--graph and --hotspots need a full scan; drop --since/--files-from')
 
     if not scan_path.exists():
         print(f"Error: Path '{args.path}' does not exist.")
@@ -539,22 +1212,58 @@ def main():
     if args.verbose:
         print(f"Scanning: {scan_path}", file=sys.stderr)
 
-    all_files, include_dirs = scan_project(scan_path, args.verbose)
+    if args.no_cache or not scan_path.is_dir():
+        cache_path = None
+    else:
+        cache_path = Path(args.cache) if args.cache else default_cache_path(scan_path)
+
+    if incremental:
+        if not scan_path.is_dir():
+            print(f"Error: Path '{args.path}' is not a directory.")
+            return 1
+        try:
+            changed = changed_files(scan_path, args.since, args.files_from)
+            directory_cycles, all_files, modules, include_dirs = scan_incremental(
+                scan_path, changed, args.since, args.verbose, args.jobs, cache_path)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return 1
+
+        if args.verbose:
+            print(f"Reachable modules: {len(modules)}, new circular dependencies: "
+                  f"{len(directory_cycles)}", file=sys.stderr)
+
+        mode = f"since `{args.since}`" if args.since else "changed files vs. include cache"
+        report = generate_markdown_report(directory_cycles, all_files, modules, scan_path,
+                                          include_dirs, mode)
+    else:
+        all_files, include_dirs = scan_project(scan_path, args.verbose, args.jobs, cache_path)
+
+        if args.verbose:
+            print(f"Files: {len(all_files)}, Include dirs: {len(include_dirs)}", file=sys.stderr)
 
-    if args.verbose:
-        print(f"Files: {len(all_files)}, Include dirs: {len(include_dirs)}", file=sys.stderr)
+        modules, file_to_module = group_files_by_directory(all_files, scan_path)
 
-    modules, file_to_module = group_files_by_directory(all_files, scan_path)
+        if args.verbose:
+            print(f"Directory modules: {len(modules)}", file=sys.stderr)
 
-    if args.verbose:
-        print(f"Directory modules: {len(modules)}", file=sys.stderr)
+        directory_cycles = find_directory_cycles(all_files, modules, file_to_module, scan_path)
 
-    directory_cycles = find_directory_cycles(all_files, modules, file_to_module, scan_path)
+        if args.verbose:
+            print(f"Circular dependencies: {len(directory_cycles)}", file=sys.stderr)
 
-    if args.verbose:
-        print(f"Circular dependencies: {len(directory_cycles)}", file=sys.stderr)
+        report = generate_markdown_report(directory_cycles, all_files, modules, scan_path,
+                                          include_dirs)
 
-    report = generate_markdown_report(directory_cycles, all_files, modules, scan_path, include_dirs)
+    if args.graph or args.hotspots > 0:
+        graph = IncludeGraph(all_files)
+        metrics = graph.analyze()
+        if args.graph:
+            fmt = args.graph_format or GRAPH_FORMATS.get(Path(args.graph).suffix.lower(), 'json')
+            export_include_graph(graph, metrics, scan_path, args.graph, fmt)
+            print(f"Include graph: {args.graph} ({fmt})", file=sys.stderr)
+        if args.hotspots > 0:
+            report += "\n\n" + generate_hotspot_report(graph, metrics, scan_path, args.hotspots)
 
     if args.output:
         with open(args.output, 'w', encoding='utf-8') as f:
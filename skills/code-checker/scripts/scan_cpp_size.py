@@ -7,9 +7,14 @@ Reports files and functions with 2000+ non-blank, non-comment lines.
 import argparse
 import os
 import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from dataclasses import dataclass
-from typing import List, Dict
+from typing import List, Dict, Iterator, Optional, Tuple
+
+from changed_files import changed_files, git_show_file, git_toplevel
 
 
 @dataclass
@@ -68,6 +73,43 @@ MULTI_LINE_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
 # Preprocessor directives
 PREPROCESSOR = re.compile(r'^\s*#.*?$')
 
+# Lexer tokens: comment openers, string/char literals (possibly unterminated) and braces
+LEX_TOKEN = re.compile(r'//|/\*|"(?:[^"\\]|\\.)*"?|\'(?:[^\'\\]|\\.)*\'?|[{}]')
+
+# Characters that make a line worth lexing; other lines are plain code
+LEX_TRIGGERS = ('/', '"', "'", '{', '}')
+
+# Pattern to match function signature lines
+# This matches lines that look like function definitions
+FUNC_SIGNATURE_PATTERN = re.compile(
+    r'^\s*'  # leading whitespace
+    r'(?:template\s*<[^>]*>\s*)?'  # optional template
+    r'(?:[\w\s\*&:<>]+?)'  # return type (lazy)
+    r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*'  # function name
+    r'(?:\s*::\s*[a-zA-Z_][a-zA-Z0-9_]*)?'  # optional :: qualifier
+    r'\s*\([^)]*\)\s*'  # parameters
+    r'(?:const\s+)?(?:volatile\s+)?(?:override\s+)?(?:final\s+)?(?:noexcept\s*\(.*?\))?'  # qualifiers
+    r'(?:\s*=\s*0)?'  # pure virtual
+    r'(?:\s*->\s*[^{;]+)?'  # trailing return
+    r'\s*(:\s*[^{;]+)?'  # constructor initializer list
+    r'\s*\{'  # opening brace
+)
+
+# Common non-function keywords that the signature pattern can match
+SKIP_KEYWORDS = {
+    'if', 'for', 'while', 'switch', 'catch', 'struct', 'class',
+    'namespace', 'enum', 'union', 'typedef', 'using', 'extern',
+    'return', 'break', 'continue', 'goto', 'do', 'else', 'case',
+    'default', 'try', 'throw', 'sizeof', 'decltype', 'typeid',
+    'static_assert', 'alignas', 'alignof', 'typeof', 'reinterpret_cast'
+}
+
+# Skip common build/output directories
+SKIP_DIRS = {
+    'build', 'out', 'node_modules', '.git', 'third_party',
+    'vendor', 'external', '__pycache__', 'cmake-build'
+}
+
 
 def count_effective_lines(content: str) -> int:
     """Count non-blank, non-comment lines."""
@@ -98,147 +140,112 @@ def count_effective_lines(content: str) -> int:
     return count
 
 
-def find_functions(content: str) -> List[Dict]:
+def lex_line(line: str, in_comment: bool) -> Tuple[str, int, int, bool]:
     """
-    Find function definitions and their line ranges.
-    Returns list of dicts with name, start_line, end_line, and the function body.
+    Lex one line, carrying block comment state across lines.
+
+    Returns (code, open_braces, close_braces, in_comment): code is the line
+    with comments removed, and braces inside comments or string/char literals
+    are not counted.
     """
-    functions = []
-    lines = content.split('\n')
+    if not in_comment and not any(c in line for c in LEX_TRIGGERS):
+        return line, 0, 0, False
+
+    pieces = []
+    opens = closes = 0
+    pos = 0
+    length = len(line)
+    while pos < length:
+        if in_comment:
+            end = line.find('*/', pos)
+            if end < 0:
+                break
+            in_comment = False
+            pieces.append(' ')
+            pos = end + 2
+            continue
 
-    # Stack to track brace levels
-    brace_stack = []
-    current_function = None
-    function_start_line = 0
-    template_depth = 0
-
-    # Pattern to match function signature lines
-    # This matches lines that look like function definitions
-    func_signature_pattern = re.compile(
-        r'^\s*'  # leading whitespace
-        r'(?:template\s*<[^>]*>\s*)?'  # optional template
-        r'(?:[\w\s\*&:<>]+?)'  # return type (lazy)
-        r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*'  # function name
-        r'(?:\s*::\s*[a-zA-Z_][a-zA-Z0-9_]*)?'  # optional :: qualifier
-        r'\s*\([^)]*\)\s*'  # parameters
-        r'(?:const\s+)?(?:volatile\s+)?(?:override\s+)?(?:final\s+)?(?:noexcept\s*\(.*?\))?'  # qualifiers
-        r'(?:\s*=\s*0)?'  # pure virtual
-        r'(?:\s*->\s*[^{;]+)?'  # trailing return
-        r'\s*(:\s*[^{;]+)?'  # constructor initializer list
-        r'\s*\{'  # opening brace
-    )
+        match = LEX_TOKEN.search(line, pos)
+        if not match:
+            pieces.append(line[pos:])
+            break
+        pieces.append(line[pos:match.start()])
+        token = match.group()
+        pos = match.end()
+        if token == '//':
+            break
+        if token == '/*':
+            in_comment = True
+            continue
+        if token == '{':
+            opens += 1
+        elif token == '}':
+            closes += 1
+        pieces.append(token)
+
+    return ''.join(pieces), opens, closes, in_comment
 
-    # Pattern for constructor/destructor
-    ctor_dtor_pattern = re.compile(
-        r'^\s*(?:(?:[\w:]+::)?(?:~?[A-Z][a-zA-Z0-9_]*|[a-z_][a-zA-Z0-9_]*)\s*\([^)]*\)\s*(?::\s*[^{]+)?\{)',
-        re.MULTILINE
-    )
 
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-
-        # Track template depth
-        if '<' in line and '>' in line:
-            template_count = line.count('<') - line.count('>')
-            template_depth += template_count
-
-        # Check for function signature
-        match = func_signature_pattern.match(line)
-
-        if match and not current_function:
-            func_name = match.group(1)
-
-            # Filter out common non-function keywords
-            skip_keywords = {
-                'if', 'for', 'while', 'switch', 'catch', 'struct', 'class',
-                'namespace', 'enum', 'union', 'typedef', 'using', 'extern',
-                'return', 'break', 'continue', 'goto', 'do', 'else', 'case',
-                'default', 'try', 'throw', 'sizeof', 'decltype', 'typeid',
-                'static_assert', 'alignas', 'alignof', 'typeof', 'reinterpret_cast'
-            }
-
-            if func_name not in skip_keywords:
-                # Count braces to find function end
-                brace_count = line.count('{') - line.count('}')
-                brace_stack = [brace_count] if brace_count > 0 else []
-
-                if brace_count > 0:
-                    current_function = {
-                        'name': func_name,
-                        'line_start': i + 1,  # 1-indexed
-                        'content': []
-                    }
-                    function_start_line = i
-                else:
-                    # Opening brace might be on next line
-                    if i + 1 < len(lines) and '{' in lines[i + 1]:
-                        brace_stack = [lines[i + 1].count('{') - lines[i + 1].count('}')]
-
-                        if brace_stack[0] > 0:
-                            current_function = {
-                                'name': func_name,
-                                'line_start': i + 1,
-                                'content': []
-                            }
-                            function_start_line = i
-
-        elif current_function:
-            # Track brace level within function
-            open_braces = line.count('{')
-            close_braces = line.count('}')
-            brace_stack[-1] += open_braces - close_braces
-
-            current_function['content'].append(line)
-
-            # Check if function ended
-            if brace_stack[-1] <= 0:
-                current_function['line_end'] = i + 1
+def scan_text(content: str) -> Tuple[int, List[Dict]]:
+    """
+    Single pass over a file: effective line count plus function definitions.
+
+    A line is effective if code remains after removing comments and it is not
+    a preprocessor directive. A function starts on a line matching the
+    signature pattern with more `{` than `}`, and ends when brace depth
+    returns to zero; its count covers the lines after the signature line.
+    Returns (total_effective_lines, functions) where each function is a dict
+    with name, line_start, line_end (1-indexed) and lines_count.
+    """
+    total = 0
+    functions = []
+    current_function = None
+    depth = 0
+    in_comment = False
+
+    for line_no, line in enumerate(content.split('\n'), 1):
+        code, opens, closes, in_comment = lex_line(line, in_comment)
+        stripped = code.strip()
+        effective = bool(stripped) and not stripped.startswith('#')
+        total += effective
+
+        if current_function:
+            current_function['lines_count'] += effective
+            depth += opens - closes
+            if depth <= 0:
+                current_function['line_end'] = line_no
                 functions.append(current_function)
                 current_function = None
-                brace_stack = []
+            continue
+
+        if opens > closes and '(' in code:
+            match = FUNC_SIGNATURE_PATTERN.match(code)
+            if match and match.group(1) not in SKIP_KEYWORDS:
+                current_function = {
+                    'name': match.group(1),
+                    'line_start': line_no,
+                    'lines_count': 0,
+                }
+                depth = opens - closes
 
-        i += 1
+    return total, functions
 
+
+def find_functions(content: str) -> List[Dict]:
+    """
+    Find function definitions and their line ranges.
+    Returns list of dicts with name, start_line, end_line, and the function body.
+    """
+    lines = content.split('\n')
+    functions = scan_text(content)[1]
+    for func in functions:
+        func['content'] = lines[func['line_start']:func['line_end']]
     return functions
 
 
 def count_effective_lines_in_text(text: str) -> int:
     """Count non-blank, non-comment, non-preprocessor lines in a text block."""
-    lines = text.split('\n')
-    count = 0
-
-    in_block_comment = False
-
-    for line in lines:
-        # Handle block comment state
-        if '/*' in line and '*/' not in line and not in_block_comment:
-            in_block_comment = True
-            # Remove content before /* and check remaining
-            line = line.split('/*')[0]
-
-        if '*/' in line and in_block_comment:
-            in_block_comment = False
-            # Remove content after */
-            parts = line.split('*/')
-            if len(parts) > 1:
-                line = parts[1]
-            else:
-                line = ''
-
-        if in_block_comment:
-            continue
-
-        # Remove single line comments
-        line = SINGLE_LINE_COMMENT.sub('', line)
-
-        stripped = line.strip()
-
-        # Skip blank lines and preprocessor directives
-        if stripped and not stripped.startswith('#'):
-            count += 1
-
-    return count
+    return scan_text(text)[0]
 
 
 def analyze_file(file_path: Path, file_threshold: int, func_threshold: int) -> Dict:
@@ -248,21 +255,17 @@ def analyze_file(file_path: Path, file_threshold: int, func_threshold: int) -> D
     except Exception:
         return None
 
-    total_effective_lines = count_effective_lines_in_text(content)
-    functions = find_functions(content)
+    total_effective_lines, functions = scan_text(content)
 
     large_functions = []
 
     for func in functions:
-        func_content = '\n'.join(func['content'])
-        func_lines = count_effective_lines_in_text(func_content)
-
-        if func_lines >= func_threshold:
+        if func['lines_count'] >= func_threshold:
             large_functions.append(LargeFunction(
                 name=func['name'],
                 line_start=func['line_start'],
                 line_end=func['line_end'],
-                lines_count=func_lines,
+                lines_count=func['lines_count'],
                 file_path=str(file_path)
             ))
 
@@ -276,42 +279,114 @@ def analyze_file(file_path: Path, file_threshold: int, func_threshold: int) -> D
     }
 
 
-def scan_directory(path: Path, file_threshold: int, func_threshold: int) -> Dict:
-    """Scan directory recursively for C/C++ files."""
+def iter_cpp_files(path: Path) -> Iterator[Path]:
+    """Yield C/C++ files under path (or path itself if it is a file)."""
+    if path.is_file():
+        yield path
+        return
+
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+
+        for filename in files:
+            ext = os.path.splitext(filename)[1].lower()
+            if ext in CPP_EXTENSIONS:
+                yield Path(root) / filename
+
+
+def analyze_files(file_paths: List[Path], file_threshold: int, func_threshold: int,
+                  jobs: int = 1) -> List[Dict]:
+    """Run analyze_file over file_paths, across `jobs` processes, preserving order."""
+    analyze = partial(analyze_file, file_threshold=file_threshold, func_threshold=func_threshold)
+
+    if jobs > 1 and len(file_paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            return list(executor.map(analyze, file_paths, chunksize=16))
+    return [analyze(file_path) for file_path in file_paths]
+
+
+def scan_directory(path: Path, file_threshold: int, func_threshold: int, jobs: int = 1) -> Dict:
+    """Scan directory recursively for C/C++ files, across `jobs` processes."""
     results = {
         'large_files': [],
         'all_large_functions': [],
         'total_files_scanned': 0
     }
 
-    for root, dirs, files in os.walk(path):
-        # Skip common build/output directories
-        dirs[:] = [d for d in dirs if d not in {
-            'build', 'out', 'node_modules', '.git', 'third_party',
-            'vendor', 'external', '__pycache__', 'cmake-build'
-        }]
+    file_paths = list(iter_cpp_files(path))
+    results['total_files_scanned'] = len(file_paths)
 
-        for filename in files:
-            ext = os.path.splitext(filename)[1].lower()
-            if ext in CPP_EXTENSIONS:
-                file_path = Path(root) / filename
-                results['total_files_scanned'] += 1
+    for result in analyze_files(file_paths, file_threshold, func_threshold, jobs):
+        if result:
+            if result['is_large_file']:
+                results['large_files'].append(LargeFile(
+                    path=result['path'],
+                    lines_count=result['total_lines'],
+                    large_functions=result['large_functions']
+                ))
+
+            results['all_large_functions'].extend(result['large_functions'])
+
+    return results
 
-                result = analyze_file(file_path, file_threshold, func_threshold)
 
-                if result:
-                    if result['is_large_file']:
-                        results['large_files'].append(LargeFile(
-                            path=result['path'],
-                            lines_count=result['total_lines'],
-                            large_functions=result['large_functions']
-                        ))
-                    elif result['large_functions']:
-                        # Add to large functions even if file itself isn't large
-                        for func in result['large_functions']:
-                            results['all_large_functions'].append(func)
+def scan_changed_files(path: Path, changed: List[Path], file_threshold: int, func_threshold: int,
+                       since: Optional[str] = None, jobs: int = 1) -> Dict:
+    """
+    Scan only the changed C/C++ files under path.
 
-                    results['all_large_functions'].extend(result['large_functions'])
+    With `since`, each file is compared with its content at that revision and
+    only findings introduced since then are kept: files that crossed the file
+    threshold, and large functions beyond those the file already had under the
+    same name. Without it, every finding in the changed files is reported.
+    """
+    root = path.resolve()
+    file_paths = []
+    for file_path in changed:
+        if file_path.suffix.lower() not in CPP_EXTENSIONS or not file_path.is_file():
+            continue
+        if file_path != root and root not in file_path.parents:
+            continue
+        rel_dirs = file_path.relative_to(root).parts[:-1] if root.is_dir() else ()
+        if not SKIP_DIRS.intersection(rel_dirs):
+            file_paths.append(file_path)
+
+    results = {
+        'large_files': [],
+        'all_large_functions': [],
+        'total_files_scanned': len(file_paths),
+        'incremental': f'new findings since `{since}`' if since else 'changed files only',
+    }
+    top = git_toplevel(root) if since and file_paths else None
+
+    for file_path, result in zip(file_paths, analyze_files(file_paths, file_threshold, func_threshold, jobs)):
+        if not result:
+            continue
+
+        was_large_file = False
+        known_large = Counter()
+        baseline = git_show_file(file_path, since, top) if since else None
+        if baseline is not None:
+            total_lines, functions = scan_text(baseline)
+            was_large_file = total_lines >= file_threshold
+            known_large.update(func['name'] for func in functions
+                               if func['lines_count'] >= func_threshold)
+
+        new_functions = []
+        for func in result['large_functions']:
+            if known_large[func.name] > 0:
+                known_large[func.name] -= 1
+            else:
+                new_functions.append(func)
+
+        if result['is_large_file'] and not was_large_file:
+            results['large_files'].append(LargeFile(
+                path=result['path'],
+                lines_count=result['total_lines'],
+                large_functions=new_functions
+            ))
+
+        results['all_large_functions'].extend(new_functions)
 
     return results
 
@@ -326,11 +401,17 @@ def generate_markdown_report(results: Dict, file_threshold: int, func_threshold:
         f"- Large Functions: {func_threshold}+ effective lines",
         "",
         f"**Summary:**",
+    ]
+
+    if results.get('incremental'):
+        lines.append(f"- Mode: incremental ({results['incremental']})")
+
+    lines.extend([
         f"- Total Files Scanned: {results['total_files_scanned']}",
         f"- Large Files Found: {len(results['large_files'])}",
         f"- Large Functions Found: {len(results['all_large_functions'])}",
         "",
-    ]
+    ])
 
     if results['large_files']:
         lines.extend([
@@ -434,6 +515,22 @@ def main():
         default=50,
         help='Threshold for large functions in effective lines (default: 50)'
     )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Number of worker processes (default: CPU count)'
+    )
+    parser.add_argument(
+        '--since',
+        metavar='REV',
+        help='Only scan files changed since this git revision and report new findings'
+    )
+    parser.add_argument(
+        '--files-from',
+        metavar='FILE',
+        help="Only scan the files listed in FILE ('-' for stdin)"
+    )
 
     args = parser.parse_args()
 
@@ -443,7 +540,17 @@ def main():
         print(f"Error: Path '{args.path}' does not exist.")
         return 1
 
-    results = scan_directory(scan_path, args.file_threshold, args.function_threshold)
+    incremental = bool(args.since or args.files_from)
+    if incremental:
+        try:
+            changed = changed_files(scan_path, args.since, args.files_from)
+            results = scan_changed_files(scan_path, changed, args.file_threshold,
+                                         args.function_threshold, args.since, args.jobs)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return 1
+    else:
+        results = scan_directory(scan_path, args.file_threshold, args.function_threshold, args.jobs)
 
     report = generate_markdown_report(results, args.file_threshold, args.function_threshold)
 
@@ -454,6 +561,9 @@ def main():
     else:
         print(report)
 
+    # Incremental mode gates pre-submit: fail when new findings were introduced
+    if incremental and (results['large_files'] or results['all_large_functions']):
+        return 1
     return 0
 
 
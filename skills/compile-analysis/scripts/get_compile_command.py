@@ -8,13 +8,35 @@
 示例:
     python3 get_compile_command.py frameworks/core/components_ng/base/frame_node.cpp
     python3 get_compile_command.py foundation/arkui/ace_engine/frameworks/core/components_ng/base/frame_node.cpp
+
+批量导出 compile_commands.json:
+    python3 get_compile_command.py --export-compdb <out目录> [-o compile_commands.json] [--filter foundation/arkui/ace_engine] [-j N]
+
+构建索引:
+    首次查询时把所有子 ninja 文件中的 cxx 编译边（源文件 -> ninja 文件、输出 .o）及各 ninja 文件的
+    编译变量一次性索引到 out/<product>/.compile_command_index.json，build.ninja 的 mtime 变化
+    （gn 重新生成）后自动重建；之后的查询只读索引，不再逐个扫描 ninja 文件
 """
 
 import os
 import sys
 import re
+import json
+import shlex
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
+BUILD_INDEX_NAME = '.compile_command_index.json'
+BUILD_INDEX_VERSION = 1
+# parse_variables 关心的变量
+COMPILE_VARIABLES = ['defines', 'include_dirs', 'cflags', 'cflags_cc',
+                     'cflags_pch_cxx', 'root_out_dir', 'target_output_name']
+# ninja 语法中的 $ 引用：${var} / $var 变量，或 '$ ' '$:' '$$' 转义
+NINJA_DOLLAR = re.compile(r'\$(?:\{(\w+)\}|(\w+)|([ :$]))')
+
 
 def find_ninja_files(out_dir):
     """查找所有相关的ninja文件"""
@@ -140,6 +162,133 @@ def find_build_rule(source_file, ninja_files):
     return None, None, None
 
 
+def _index_ninja_file(ninja_path):
+    """
+    流式读取单个子 ninja 文件，返回 (variables, edges)
+
+    variables 与 parse_variables 相同（第一条 build 之前的关心变量）；
+    edges 为 [(source_basename, output_file, source_path)]，判定条件与 find_build_rule 一致
+    """
+    variables = {}
+    edges = []
+    in_header = True
+    pending = None
+    with open(ninja_path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            stripped = line.strip()
+            if pending:
+                # build 行的下一行需为 source_file_part = <basename>
+                build_part, source_path = pending
+                pending = None
+                if stripped.startswith('source_file_part ='):
+                    basename = stripped.split('=', 1)[1].strip()
+                    if basename:
+                        edges.append((basename, build_part, source_path))
+            if stripped.startswith('build '):
+                in_header = False
+                if '.o:' in line and 'cxx' in line:
+                    cxx_part = line.split('cxx', 1)[1].strip()
+                    source_path = cxx_part.split('||')[0].strip()
+                    build_part = line.split(':')[0].replace('build ', '').strip()
+                    pending = (build_part, source_path)
+                continue
+            if in_header and '=' in line and not stripped.startswith('#') \
+                    and not stripped.startswith('rule '):
+                var_name, var_value = line.split('=', 1)
+                var_name = var_name.strip()
+                if var_name in COMPILE_VARIABLES:
+                    variables[var_name] = var_value.strip()
+    return variables, edges
+
+
+def _build_ninja_stamp(out_dir):
+    """索引失效标记：build.ninja 的 mtime_ns（gn gen 重新生成子 ninja 时会更新）"""
+    try:
+        return os.stat(os.path.join(out_dir, 'build.ninja')).st_mtime_ns
+    except OSError:
+        return None
+
+
+def build_ninja_index(out_dir, ninja_files=None):
+    """
+    一次性索引 out_dir 下所有子 ninja 文件中的 cxx 编译边
+
+    返回: {"version", "stamp", "ninja_files": [相对 out_dir 的路径],
+           "variables": {ninja 序号: {变量}}, "sources": {basename: [[ninja 序号, 输出, 源路径]]}}
+    """
+    if ninja_files is None:
+        ninja_files = find_ninja_files(out_dir)
+    index = {
+        'version': BUILD_INDEX_VERSION,
+        'stamp': _build_ninja_stamp(out_dir),
+        'ninja_files': [],
+        'variables': {},
+        'sources': {},
+    }
+    for ninja_type, ninja_path in ninja_files:
+        if ninja_type == 'toolchain':
+            continue
+        try:
+            variables, edges = _index_ninja_file(ninja_path)
+        except OSError:
+            continue
+        if not edges:
+            continue
+        file_id = len(index['ninja_files'])
+        index['ninja_files'].append(os.path.relpath(ninja_path, out_dir))
+        index['variables'][str(file_id)] = variables
+        for basename, output_file, source_path in edges:
+            index['sources'].setdefault(basename, []).append([file_id, output_file, source_path])
+    return index
+
+
+def load_ninja_index(out_dir, ninja_files=None, rebuild=False):
+    """读取持久化索引；不存在、版本不符或 build.ninja 已变化时重建并保存"""
+    index_path = os.path.join(out_dir, BUILD_INDEX_NAME)
+    stamp = _build_ninja_stamp(out_dir)
+    if not rebuild and stamp is not None:
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') == BUILD_INDEX_VERSION and index.get('stamp') == stamp:
+                return index
+        except (OSError, ValueError):
+            pass
+
+    index = build_ninja_index(out_dir, ninja_files)
+    if stamp is not None:
+        tmp_path = index_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+            os.replace(tmp_path, index_path)
+        except OSError:
+            pass
+    return index
+
+
+def lookup_build_rule(index, source_file, out_dir):
+    """
+    在索引中查找源文件的编译规则，返回 (ninja_path, output_file, source_path, variables)
+
+    同名源文件有多个时优先取 ninja 中源路径与 source_file 后缀一致的一条，
+    否则与 find_build_rule 相同取第一条（ace_engine 源文件只匹配 ace_engine 的 ninja）
+    """
+    candidates = index['sources'].get(os.path.basename(source_file), [])
+    if 'ace_engine' in source_file:
+        candidates = [c for c in candidates
+                      if 'ace_engine' in index['ninja_files'][c[0]]]
+    if not candidates:
+        return None, None, None, {}
+
+    wanted = source_file.replace('\\', '/').lstrip('./')
+    chosen = next((c for c in candidates
+                   if c[2].replace('../', '').endswith(wanted)), candidates[0])
+    file_id, output_file, source_path = chosen
+    ninja_path = os.path.join(out_dir, index['ninja_files'][file_id])
+    return ninja_path, output_file, source_path, index['variables'].get(str(file_id), {})
+
+
 def expand_variables(command_template, variables, output_file, source_file):
     """展开变量生成完整命令"""
     import re
@@ -176,8 +325,144 @@ def expand_variables(command_template, variables, output_file, source_file):
     return command
 
 
-def get_compile_command(source_file, out_dir=None):
-    """主函数：获取源文件的编译命令"""
+def ninja_evaluate(text, variables):
+    """按 ninja 语义求值：展开 ${var}/$var（未定义的变量为空串），'$ ' '$:' '$$' 反转义"""
+    def substitute(match):
+        if match.group(3):
+            return match.group(3)
+        return variables.get(match.group(1) or match.group(2), '')
+    return NINJA_DOLLAR.sub(substitute, text)
+
+
+def expand_compdb_arguments(command_template, variables, output_file, source_file):
+    """
+    compile_commands.json 用的展开，结果与 ninja 实际执行的命令一致
+
+    expand_variables 面向生成 shell 脚本（保留未知变量、改写算术表达式），这里改为：
+    变量值先按 ninja 语义求值，$in/$out 按 shell 规则引用，最终命令按 shell 规则拆成参数数组；
+    返回 (arguments, command)，命令无法拆分（引号不配对）时 arguments 为 None
+    """
+    scope = {name: ninja_evaluate(value, {}) for name, value in variables.items()}
+    scope['in'] = shlex.quote(source_file)
+    scope['out'] = shlex.quote(output_file)
+    command = ninja_evaluate(command_template, scope)
+    try:
+        return shlex.split(command), command
+    except ValueError:
+        return None, command
+
+
+def _normalize_source(source_path):
+    """ninja 中的源路径（../../foundation/...）转为相对 OpenHarmony 根的路径"""
+    while source_path.startswith('../'):
+        source_path = source_path[3:]
+    return source_path
+
+
+def _compile_entries(ninja_path, out_dir, cxx_template, filters=None):
+    """单个子 ninja 文件中所有 cxx 编译边的 compile_commands 条目（进程池 worker）"""
+    try:
+        variables, edges = _index_ninja_file(ninja_path)
+    except OSError:
+        return []
+    entries = []
+    for _, output_file, source_path in edges:
+        if filters and not any(f in _normalize_source(source_path) for f in filters):
+            continue
+        arguments, command = expand_compdb_arguments(cxx_template, variables, output_file,
+                                                     source_path)
+        entry = {'directory': out_dir, 'file': source_path, 'output': output_file}
+        if arguments is not None:
+            entry['arguments'] = arguments
+        else:
+            entry['command'] = command
+        entries.append(entry)
+    return entries
+
+
+def _bounded_map(pool, func, items, window):
+    """按 items 顺序产出 func(item) 的结果，同时提交到进程池的任务不超过 window 个"""
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(func, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def export_compile_commands(out_dir, output_path, filters=None, jobs=None):
+    """
+    一次流式扫描所有子 ninja 文件，导出全部（或按路径过滤的）cxx 编译条目
+
+    子 ninja 文件分发到进程池解析，在途任务不超过 jobs*4 个，主进程按 ninja 文件顺序边收边写，
+    内存中只保留在途 ninja 文件的条目；返回写入的条目数
+    """
+    out_dir = os.path.abspath(out_dir)
+    ninja_files = find_ninja_files(out_dir)
+    toolchain = next((path for kind, path in ninja_files if kind == 'toolchain'), None)
+    if not toolchain:
+        raise FileNotFoundError(f"找不到toolchain.ninja: {out_dir}")
+    cxx_template = parse_cxx_rule(toolchain)
+    if not cxx_template:
+        raise ValueError("无法解析cxx规则")
+    sub_ninjas = [path for kind, path in ninja_files if kind == 'sub']
+
+    worker = partial(_compile_entries, out_dir=out_dir, cxx_template=cxx_template,
+                     filters=filters)
+    jobs = jobs or os.cpu_count() or 1
+    tmp_path = output_path + '.tmp'
+    count = 0
+    with open(tmp_path, 'w', encoding='utf-8') as output:
+        output.write('[\n')
+        if jobs > 1 and len(sub_ninjas) > 1:
+            pool = ProcessPoolExecutor(max_workers=jobs)
+            results = _bounded_map(pool, worker, sub_ninjas, jobs * 4)
+        else:
+            pool = None
+            results = map(worker, sub_ninjas)
+        try:
+            for entries in results:
+                for entry in entries:
+                    if count:
+                        output.write(',\n')
+                    json.dump(entry, output, ensure_ascii=False)
+                    count += 1
+        finally:
+            if pool:
+                pool.shutdown()
+        output.write('\n]\n')
+    os.replace(tmp_path, output_path)
+    return count
+
+
+def export_main(argv):
+    """--export-compdb 模式入口"""
+    parser = argparse.ArgumentParser(
+        prog='get_compile_command.py --export-compdb',
+        description='从ninja文件批量导出 compile_commands.json（覆盖全部 cxx 编译边）')
+    parser.add_argument('out_dir', help='out/<product> 目录')
+    parser.add_argument('-o', '--output', help='输出文件（默认: <out目录>/compile_commands.json）')
+    parser.add_argument('--filter', action='append', default=None, metavar='PATH',
+                        help='只导出源路径包含该子串的条目（可重复，如 foundation/arkui/ace_engine）')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='解析ninja文件的进程数（默认: CPU核数）')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.out_dir):
+        print(f"错误: 找不到out目录: {args.out_dir}")
+        sys.exit(1)
+    output_path = args.output or os.path.join(args.out_dir, 'compile_commands.json')
+    try:
+        count = export_compile_commands(args.out_dir, output_path, args.filter, args.jobs)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+    print(f"✓ 已导出 {count} 条编译命令到: {output_path}")
+
+
+def get_compile_command(source_file, out_dir=None, use_index=True, rebuild_index=False):
+    """主函数：获取源文件的编译命令（默认走持久化构建索引，use_index=False 时逐个扫描ninja文件）"""
 
     # 确定out目录
     if out_dir is None:
@@ -206,22 +491,9 @@ def get_compile_command(source_file, out_dir=None):
 
     print(f"查找源文件: {source_file}")
 
-    # 1. 查找所有ninja文件
-    ninja_files = find_ninja_files(out_dir)
-    if not ninja_files:
-        print("错误: 找不到ninja文件")
-        return None
-
-    print(f"找到 {len(ninja_files)} 个ninja文件")
-
-    # 2. 获取cxx规则
-    toolchain_ninja = None
-    for ninja_type, ninja_path in ninja_files:
-        if ninja_type == 'toolchain':
-            toolchain_ninja = ninja_path
-            break
-
-    if not toolchain_ninja:
+    # 1. 获取cxx规则（直接读取toolchain.ninja）
+    toolchain_ninja = os.path.join(out_dir, "toolchain.ninja")
+    if not os.path.exists(toolchain_ninja):
         print("错误: 找不到toolchain.ninja")
         return None
 
@@ -232,8 +504,17 @@ def get_compile_command(source_file, out_dir=None):
 
     print(f"CXX模板: {cxx_template[:100]}...")
 
-    # 3. 查找对应的build规则
-    ninja_path, output_file, source_path_in_ninja = find_build_rule(source_file, ninja_files)
+    # 2. 查找对应的build规则（索引有效时不遍历 obj 目录，只有重建索引才查找子ninja文件）
+    if use_index:
+        index = load_ninja_index(out_dir, rebuild=rebuild_index)
+        print(f"构建索引: {len(index['sources'])} 个源文件 / {len(index['ninja_files'])} 个ninja文件")
+        ninja_path, output_file, source_path_in_ninja, variables = lookup_build_rule(
+            index, source_file, out_dir)
+    else:
+        ninja_files = find_ninja_files(out_dir)
+        print(f"找到 {len(ninja_files)} 个ninja文件")
+        ninja_path, output_file, source_path_in_ninja = find_build_rule(source_file, ninja_files)
+        variables = None
 
     if not ninja_path:
         print(f"错误: 找不到源文件的编译规则: {source_file}")
@@ -243,13 +524,14 @@ def get_compile_command(source_file, out_dir=None):
     print(f"输出文件: {output_file}")
     print(f"源文件路径: {source_path_in_ninja}")
 
-    # 4. 解析变量
-    variables = parse_variables(ninja_path)
+    # 3. 解析变量（使用索引时变量已随索引缓存）
+    if variables is None:
+        variables = parse_variables(ninja_path)
 
     if not variables:
         print("警告: 无法解析变量，使用基础命令")
 
-    # 5. 生成完整命令
+    # 4. 生成完整命令
     full_command = expand_variables(cxx_template, variables, output_file, source_path_in_ninja)
 
     return full_command
@@ -404,12 +686,21 @@ def generate_enhanced_command(command, source_file):
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--export-compdb':
+        export_main(sys.argv[2:])
+        return
+
     if len(sys.argv) < 2:
         print("用法: python3 get_compile_command.py <源文件路径> [out目录] [选项]")
         print()
         print("选项:")
         print("  --save           保存原始编译命令到脚本文件")
         print("  --save-enhanced  保存增强编译命令（带性能监控）到脚本文件")
+        print("  --rebuild-index  重建构建索引（默认在 build.ninja 变化后自动重建）")
+        print("  --no-index       不使用构建索引，逐个扫描ninja文件")
+        print()
+        print("批量导出:")
+        print("  python3 get_compile_command.py --export-compdb <out目录> [-o 文件] [--filter 路径] [-j N]")
         print()
         print("示例:")
         print("  python3 get_compile_command.py frameworks/core/components_ng/base/frame_node.cpp")
@@ -424,7 +715,9 @@ def main():
     save_to_file = '--save' in sys.argv
     save_enhanced = '--save-enhanced' in sys.argv
 
-    command = get_compile_command(source_file, out_dir)
+    command = get_compile_command(source_file, out_dir,
+                                  use_index='--no-index' not in sys.argv,
+                                  rebuild_index='--rebuild-index' in sys.argv)
 
     if command:
         print()
@@ -1,25 +1,40 @@
 #!/usr/bin/env python3
 
+import os
 import re
+import sys
+import json
 import argparse
+import importlib.util
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+LINEMARKER_PATTERN = re.compile(r'#\s*(\d+)\s+"([^"]+)"([\s\d]*)')
+
 
 def parse_ii_file(file_path):
     file_include_pattern = re.compile(r'#\s*\d+\s+"([^"]+)"')
     target_prefix = "foundation/"
     dependencies = []
     stack = []
+    # 与 stack 同步的 文件 -> 下标，避免每个 linemarker 做 stack.index 线性查找
+    position = {}
 
     with open(file_path, 'r', encoding='utf-8') as file:
         for line in file:
+            if not line.startswith('#'):
+                continue
             match = file_include_pattern.match(line)
             if match:
                 new_file = match.group(1)
                 if target_prefix in new_file:
-                    if new_file in stack:
-                        index = stack.index(new_file)
+                    index = position.get(new_file)
+                    if index is not None:
                         dependencies.append(stack[:index + 1])
-                        stack = stack[:index]
+                        for popped in stack[index:]:
+                            del position[popped]
+                        del stack[index:]
+                    position[new_file] = len(stack)
                     stack.append(new_file)
 
     if stack:
@@ -27,6 +42,304 @@ def parse_ii_file(file_path):
 
     return dependencies
 
+
+class IncludeStats:
+    """
+    单个 .ii 文件的紧凑 include DAG 及行数开销
+
+    文件名按出现顺序编号，边与计数都以整数 id 保存：
+      include_count[id]   被 #include 进入的次数（linemarker flag 1）
+      self_lines[id]      该文件自身贡献的预处理行数
+      inclusive_lines[id] 自身 + 经它引入的所有头文件的预处理行数
+      edges               {(includer_id, header_id)}
+    """
+
+    def __init__(self):
+        self.files = []
+        self.ids = {}
+        self.include_count = []
+        self.self_lines = []
+        self.inclusive_lines = []
+        self.edges = set()
+        self.root = None
+        self.total_lines = 0
+
+    def intern(self, name):
+        file_id = self.ids.get(name)
+        if file_id is None:
+            file_id = len(self.files)
+            self.ids[name] = file_id
+            self.files.append(name)
+            self.include_count.append(0)
+            self.self_lines.append(0)
+            self.inclusive_lines.append(0)
+        return file_id
+
+    def headers(self, prefix=None):
+        """除主文件和 <built-in> 等伪文件外的头文件 id，可按路径子串过滤"""
+        return [
+            file_id for file_id, name in enumerate(self.files)
+            if file_id != self.root and not name.startswith('<')
+            and (not prefix or prefix in name)
+        ]
+
+    def includers(self):
+        """header_id -> 直接包含它的文件数"""
+        counts = defaultdict(int)
+        for _, header in self.edges:
+            counts[header] += 1
+        return counts
+
+    def top_headers(self, n=20, prefix=None):
+        """按 inclusive 行数降序的前 n 个头文件: [(name, inclusive, self, include_count, includers)]"""
+        includers = self.includers()
+        ranked = sorted(self.headers(prefix), key=lambda i: (-self.inclusive_lines[i], self.files[i]))
+        return [
+            (self.files[i], self.inclusive_lines[i], self.self_lines[i],
+             self.include_count[i], includers[i])
+            for i in ranked[:n]
+        ]
+
+    def to_dict(self, prefix=None):
+        includers = self.includers()
+        return {
+            'root': self.files[self.root] if self.root is not None else None,
+            'total_lines': self.total_lines,
+            'headers': [
+                {
+                    'file': self.files[i],
+                    'inclusive_lines': self.inclusive_lines[i],
+                    'self_lines': self.self_lines[i],
+                    'include_count': self.include_count[i],
+                    'includers': includers[i],
+                }
+                for i in self.headers(prefix)
+            ],
+            'edges': sorted(
+                [self.files[a], self.files[b]] for a, b in self.edges
+                if not prefix or (prefix in self.files[a] and prefix in self.files[b])
+            ),
+        }
+
+
+def analyze_includes(file_path):
+    """
+    流式解析 .ii 文件的 linemarker（# 行号 "文件" 标志），一遍得到 IncludeStats
+
+    标志 1 表示进入被包含文件，标志 2 表示返回到包含者；无标志的 linemarker 视为当前文件的
+    行号重置（或切换到栈中已有的文件）。两个 linemarker 之间的非空行计入栈顶文件。
+    """
+    stats = IncludeStats()
+    # 栈元素: [file_id, 进入时的 total_lines]
+    stack = []
+
+    def pop():
+        file_id, start = stack.pop()
+        stats.inclusive_lines[file_id] += stats.total_lines - start
+
+    def unwind_to(file_id):
+        while stack and stack[-1][0] != file_id:
+            pop()
+
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+        for line in file:
+            if line.startswith('#'):
+                match = LINEMARKER_PATTERN.match(line)
+                if match:
+                    file_id = stats.intern(match.group(2))
+                    flags = match.group(3).split()
+                    if not stack:
+                        stats.root = file_id
+                        stack.append([file_id, stats.total_lines])
+                    elif '1' in flags:
+                        stats.include_count[file_id] += 1
+                        stats.edges.add((stack[-1][0], file_id))
+                        stack.append([file_id, stats.total_lines])
+                    elif '2' in flags or any(entry[0] == file_id for entry in stack):
+                        unwind_to(file_id)
+                    elif stack[-1][0] != file_id:
+                        pop()
+                        stack.append([file_id, stats.total_lines])
+                    continue
+            if line.strip():
+                stats.total_lines += 1
+                if stack:
+                    stats.self_lines[stack[-1][0]] += 1
+
+    while stack:
+        pop()
+    return stats
+
+
+def print_top_headers(stats, top, prefix=None, output_file=None):
+    rows = stats.top_headers(top, prefix)
+    lines = [
+        f"预处理总行数: {stats.total_lines}，头文件数: {len(stats.headers(prefix))}",
+        f"开销最大的 {len(rows)} 个头文件（按 inclusive 行数）：",
+        f"{'inclusive':>10} {'self':>8} {'次数':>4} {'包含者':>4}  头文件",
+    ]
+    for name, inclusive, self_lines, count, includers in rows:
+        lines.append(f"{inclusive:>10} {self_lines:>8} {count:>6} {includers:>6}  {name}")
+    for line in lines:
+        print(line)
+        if output_file:
+            output_file.write(line + '\n')
+
+
+def normalize_header(name):
+    """../../foundation/x.h 与 foundation/x.h 视为同一头文件（不同 TU 的 .ii 相对路径一致时成立）"""
+    name = os.path.normpath(name)
+    while name.startswith('../'):
+        name = name[3:]
+    return name
+
+
+def tu_header_costs(file_path):
+    """单个 TU 中每个头文件的 (inclusive 行数, self 行数)，进程池 worker"""
+    try:
+        stats = analyze_includes(file_path)
+    except OSError as e:
+        print(f"警告: 无法读取 {file_path}: {e}", file=sys.stderr)
+        return {}
+    costs = {}
+    for i in stats.headers():
+        name = normalize_header(stats.files[i])
+        inclusive, self_lines = costs.get(name, (0, 0))
+        costs[name] = (inclusive + stats.inclusive_lines[i], self_lines + stats.self_lines[i])
+    return costs
+
+
+def find_ii_files(directory):
+    ii_files = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith('.ii'):
+                ii_files.append(os.path.join(root, name))
+    return sorted(ii_files)
+
+
+def aggregate_header_costs(ii_files, jobs=None):
+    """
+    并行分析多个 .ii，按头文件汇总跨 TU 开销
+
+    返回 {header: {"tu_count", "total_lines", "self_lines"}}：
+      tu_count    包含该头文件的 TU 数
+      total_lines 所有 TU 中经该头文件引入的预处理行数之和（即其总编译开销）
+      self_lines  头文件自身行数在所有 TU 中的合计
+    """
+    totals = {}
+    jobs = jobs or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 and len(ii_files) > 1 else None
+    # 每个 TU 的结果到达后立即并入 totals，不保留所有 TU 的中间字典
+    results = pool.map(tu_header_costs, ii_files) if pool else map(tu_header_costs, ii_files)
+    try:
+        for costs in results:
+            for name, (inclusive, self_lines) in costs.items():
+                entry = totals.setdefault(name, {'tu_count': 0, 'total_lines': 0, 'self_lines': 0})
+                entry['tu_count'] += 1
+                entry['total_lines'] += inclusive
+                entry['self_lines'] += self_lines
+    finally:
+        if pool:
+            pool.shutdown()
+    return totals
+
+
+def load_forward_decl_analyzer():
+    """加载 header-optimization 技能的 IncludeAnalyzer（同级技能目录不存在时返回 None）"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..',
+                          'header-optimization', 'scripts', 'extract-includes.py')
+    if not os.path.isfile(script):
+        return None
+    spec = importlib.util.spec_from_file_location('extract_includes', script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.IncludeAnalyzer
+
+
+def forward_decl_summary(analyzer_cls, source_root, header):
+    """对头文件做前置声明分析，返回 (include 数, 可前置声明数)；头文件找不到时返回 None"""
+    path = os.path.join(source_root, header)
+    if not os.path.isfile(path):
+        return None
+    try:
+        analysis = analyzer_cls(path).analyze()
+    except Exception:
+        return None
+    candidates = sum(1 for c in analysis['forward_decl_candidates'] if c['can_forward_declare'])
+    return analysis['stats']['include_count'], candidates
+
+
+def rank_header_costs(totals, top=30, prefix=None):
+    ranked = sorted(
+        ((name, entry) for name, entry in totals.items() if not prefix or prefix in name),
+        key=lambda item: (-item[1]['total_lines'], item[0]),
+    )
+    return ranked[:top]
+
+
+def print_header_costs(ranked, tu_total, fwd=None, output_file=None):
+    lines = [
+        f"共分析 {tu_total} 个 TU，跨 TU 编译开销最大的 {len(ranked)} 个头文件：",
+        f"{'总行数':>12} {'TU数':>6} {'平均/TU':>9} {'self':>10}"
+        + (f" {'include/可前置':>14}" if fwd is not None else '') + "  头文件",
+    ]
+    for name, entry in ranked:
+        avg = entry['total_lines'] // max(entry['tu_count'], 1)
+        row = f"{entry['total_lines']:>12} {entry['tu_count']:>6} {avg:>9} {entry['self_lines']:>10}"
+        if fwd is not None:
+            summary = fwd.get(name)
+            row += f" {f'{summary[0]}/{summary[1]}' if summary else '-':>14}"
+        lines.append(row + '  ' + name)
+    for line in lines:
+        print(line)
+        if output_file:
+            output_file.write(line + '\n')
+
+
+def main_directory(directory, output_path=None, top=30, prefix=None, json_path=None,
+                   jobs=None, source_root=None):
+    """目录模式：汇总目录下所有 .ii 的头文件开销并排序"""
+    ii_files = find_ii_files(directory)
+    if not ii_files:
+        print(f"错误: {directory} 下没有 .ii 文件")
+        sys.exit(1)
+    print(f"分析 {len(ii_files)} 个 .ii 文件...")
+    totals = aggregate_header_costs(ii_files, jobs)
+    ranked = rank_header_costs(totals, top, prefix)
+
+    fwd = None
+    if source_root:
+        analyzer_cls = load_forward_decl_analyzer()
+        if analyzer_cls is None:
+            print("警告: 未找到 header-optimization/scripts/extract-includes.py，跳过前置声明分析")
+        else:
+            fwd = {name: forward_decl_summary(analyzer_cls, source_root, name)
+                   for name, _ in ranked}
+
+    output_file = open(output_path, 'w', encoding='utf-8') if output_path else None
+    try:
+        print_header_costs(ranked, len(ii_files), fwd, output_file)
+    finally:
+        if output_file:
+            output_file.close()
+            print(f"\n✓ 结果已保存到: {output_path}")
+
+    if json_path:
+        report = {
+            'tu_count': len(ii_files),
+            'headers': [
+                dict(entry, file=name,
+                     forward_decl=(dict(zip(('include_count', 'candidates'), fwd[name]))
+                                   if fwd and fwd.get(name) else None))
+                for name, entry in ranked
+            ],
+        }
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✓ 汇总结果已保存到: {json_path}")
+
+
 def build_tree_structure(dependencies):
     tree = {}
     for path in dependencies:
@@ -54,20 +367,29 @@ def print_tree(tree, prefix='', is_last=True, output_file=None):
         # 递归处理子节点
         print_tree(subtree, new_prefix, is_last=i == count - 1, output_file=output_file)
 
-def main(file_path, output_path=None):
-    dependencies = parse_ii_file(file_path)
-    tree = build_tree_structure(dependencies)
-
-    header = "头文件的依赖关系树："
-    print(header)
-
+def main(file_path, output_path=None, top=None, prefix=None, json_path=None):
     output_file = None
     if output_path:
         output_file = open(output_path, 'w', encoding='utf-8')
-        output_file.write(header + '\n')
 
     try:
-        print_tree(tree, output_file=output_file)
+        if top or json_path:
+            stats = analyze_includes(file_path)
+            if json_path:
+                with open(json_path, 'w', encoding='utf-8') as f:
+                    json.dump(stats.to_dict(prefix), f, ensure_ascii=False, indent=2)
+                print(f"✓ include DAG 已保存到: {json_path}")
+            if top:
+                print_top_headers(stats, top, prefix, output_file)
+        else:
+            dependencies = parse_ii_file(file_path)
+            tree = build_tree_structure(dependencies)
+
+            header = "头文件的依赖关系树："
+            print(header)
+            if output_file:
+                output_file.write(header + '\n')
+            print_tree(tree, output_file=output_file)
     finally:
         if output_file:
             output_file.close()
@@ -75,10 +397,25 @@ def main(file_path, output_path=None):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='解析 .ii 文件并显示头文件依赖关系树。')
-    parser.add_argument('file', type=str, help='要解析的 .ii 文件路径')
+    parser.add_argument('file', type=str,
+                        help='要解析的 .ii 文件路径；传入目录时汇总目录下所有 .ii 的跨 TU 头文件开销')
     parser.add_argument('--output', '-o', type=str, help='保存依赖树到指定文件（可选）')
+    parser.add_argument('--top', type=int, metavar='N',
+                        help='改为输出开销最大的 N 个头文件（按 inclusive 预处理行数；目录模式默认 30）')
+    parser.add_argument('--prefix', type=str,
+                        help='--top/--json 只统计路径包含该子串的头文件（如 foundation/arkui/）')
+    parser.add_argument('--json', type=str, metavar='FILE',
+                        help='保存 include DAG（每个头文件的行数开销、包含次数和边）为 JSON')
+    parser.add_argument('-j', '--jobs', type=int, help='目录模式的并行进程数（默认: CPU核数）')
+    parser.add_argument('--fwd-decl', type=str, metavar='OH_ROOT',
+                        help='目录模式下对排名靠前的头文件调用 header-optimization 的前置声明分析'
+                             '（头文件路径相对该根目录解析）')
     args = parser.parse_args()
 
     # 如果指定了输出文件路径，使用该路径；否则输出到控制台
     output_path = args.output if args.output else None
-    main(args.file, output_path)
+    if os.path.isdir(args.file):
+        main_directory(args.file, output_path, top=args.top or 30, prefix=args.prefix,
+                       json_path=args.json, jobs=args.jobs, source_root=args.fwd_decl)
+    else:
+        main(args.file, output_path, top=args.top, prefix=args.prefix, json_path=args.json)
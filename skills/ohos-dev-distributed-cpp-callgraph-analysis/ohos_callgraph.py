@@ -13,20 +13,33 @@ evidence table and a modification coverage matrix from source evidence.
     python3 ohos_callgraph.py <target-function> --depth 4 --reverse
     python3 ohos_callgraph.py <entry-function> --repo <repo-filter> --depth 2
     python3 ohos_callgraph.py <entry-function> --name-keyword <keyword>
+    python3 ohos_callgraph.py <entry-function> --rebuild-db     # 忽略已缓存的图库重新提取
+    python3 ohos_callgraph.py <entry-function> --jobs 32        # 并发提取 bitcode
+    python3 ohos_callgraph.py --batch funcs.txt --format dot -o graph.dot  # 批量正反向查询
 
 要求:
     - OpenHarmony 已编译成功（需要 .o bitcode 文件）
     - LLVM 工具链可用（opt, llvm-dis, llvm-cxxfilt）
     - Agent must pass --oh-root and --repo explicitly; pass --product when known
+
+调用图库:
+    提取结果按 .o 路径 + mtime + size 持久化到 out/<product>/ohos_callgraph.db（SQLite），
+    后续查询只重新提取变更过的 .o，未变更的直接从图库读取。--db 指定其他位置，--no-db 关闭。
 """
 
 import argparse
 import glob
+import io
+import json
 import os
 import re
+import sqlite3
 import subprocess
 import sys
+import tempfile
+import threading
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 
 
@@ -114,20 +127,30 @@ def run(cmd, timeout=120):
         )
 
 
+# llvm_bin -> {mangled: demangled}；同一进程内的多次建树 / vtable 解析共享
+_DEMANGLE_CACHE = {}
+
+
 def demangle_batch(llvm_bin, symbols):
-    """批量 C++ 符号 demangle"""
+    """批量 C++ 符号 demangle（带进程内缓存，只为未缓存的符号启动一次 llvm-cxxfilt）"""
     if not symbols:
         return {}
-    inp = "\n".join(symbols)
-    try:
-        r = subprocess.run(
-            [os.path.join(llvm_bin, "llvm-cxxfilt")],
-            input=inp.encode(), capture_output=True, timeout=30
-        )
-        results = r.stdout.decode("utf-8", errors="replace").strip().split("\n")
-        return dict(zip(symbols, [r.strip() for r in results]))
-    except Exception:
-        return {s: s for s in symbols}
+    cache = _DEMANGLE_CACHE.setdefault(llvm_bin, {})
+    missing = [s for s in dict.fromkeys(symbols) if s not in cache]
+    if missing:
+        inp = "\n".join(missing)
+        try:
+            r = subprocess.run(
+                [os.path.join(llvm_bin, "llvm-cxxfilt")],
+                input=inp.encode(), capture_output=True, timeout=30
+            )
+            results = r.stdout.decode("utf-8", errors="replace").strip().split("\n")
+            if r.returncode == 0 and len(results) == len(missing):
+                cache.update(zip(missing, [r.strip() for r in results]))
+        except Exception:
+            pass
+    # 失败的符号不缓存，原样返回
+    return {s: cache.get(s, s) for s in symbols}
 
 
 def find_bitcode_files(obj_dir, repo_filter=None):
@@ -165,67 +188,411 @@ def extract_callgraph(llvm_bin, obj_file):
     return graph, None
 
 
+DEFINE_PATTERN = re.compile(r"define\s.*@([^\s(]+)")
+TYPE_TEST_PATTERN = re.compile(r'metadata\s*!"(_ZTS[^"]+)"')
+
+
+def stream_lines(cmd, consume, timeout=120):
+    """
+    执行命令并把 stdout 逐行交给 consume，不落盘、不在内存中保留完整输出
+
+    stderr 写入临时文件，避免管道写满阻塞；超时由计时器 kill 子进程。
+    返回结构化 CommandResult（stdout 为空）
+    """
+    with tempfile.TemporaryFile() as err:
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err)
+        except FileNotFoundError as exc:
+            return CommandResult(
+                cmd=cmd,
+                returncode=-1,
+                stderr=f"missing tool: {exc.filename}",
+                missing_tool=True,
+            )
+        timer = threading.Timer(timeout, proc.kill)
+        timer.start()
+        try:
+            with io.TextIOWrapper(proc.stdout, errors="replace") as out:
+                for line in out:
+                    consume(line)
+            returncode = proc.wait()
+        finally:
+            timed_out = not timer.is_alive()
+            timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+        err.seek(0)
+        stderr = err.read().decode("utf-8", errors="replace")
+    if timed_out:
+        stderr += f"\ncommand timed out after {timeout}s: {' '.join(cmd)}"
+        return CommandResult(cmd=cmd, returncode=-1, stderr=stderr, timed_out=True)
+    return CommandResult(cmd=cmd, returncode=returncode, stderr=stderr)
+
+
 def extract_vtable_calls(llvm_bin, obj_file):
-    """从 LLVM IR 提取虚函数间接调用的接口类型"""
-    ll_path = f"/tmp/ohos_cg_{os.getpid()}_{os.path.basename(obj_file)}.ll"
-    result = run([os.path.join(llvm_bin, "llvm-dis"), "-o", ll_path, obj_file], timeout=60)
+    """从 LLVM IR 提取虚函数间接调用的接口类型（llvm-dis 输出经管道流式解析，不写 .ll 文件）"""
     vtable_calls = defaultdict(set)
-    if not result.ok:
-        return vtable_calls, result.output.strip() or f"llvm-dis failed for {obj_file}"
-    if not os.path.exists(ll_path):
-        return vtable_calls, f"llvm-dis did not create {ll_path}"
     current_func = None
-    try:
-        with open(ll_path, "r", errors="replace") as f:
-            for line in f:
-                m = re.match(r"define\s.*@([^\s(]+)", line)
-                if m:
-                    current_func = m.group(1).strip('"')
-                    continue
-                if line.startswith("}"):
-                    current_func = None
-                    continue
-                if current_func and "type.test" in line:
-                    m2 = re.search(r'metadata\s*!"(_ZTS[^"]+)"', line)
-                    if m2:
-                        vtable_calls[current_func].add(m2.group(1))
-    finally:
+
+    def consume(line):
+        nonlocal current_func
+        if line.startswith("define"):
+            m = DEFINE_PATTERN.match(line)
+            if m:
+                current_func = m.group(1).strip('"')
+                return
+        if line.startswith("}"):
+            current_func = None
+            return
+        if current_func and "type.test" in line:
+            m2 = TYPE_TEST_PATTERN.search(line)
+            if m2:
+                vtable_calls[current_func].add(m2.group(1))
+
+    result = stream_lines(
+        [os.path.join(llvm_bin, "llvm-dis"), "-o", "-", obj_file], consume, timeout=60
+    )
+    if not result.ok:
+        return defaultdict(set), result.output.strip() or f"llvm-dis failed for {obj_file}"
+    return vtable_calls, None
+
+
+DB_FILENAME = "ohos_callgraph.db"
+DB_SCHEMA_VERSION = 1
+
+
+class CallGraphStore:
+    """
+    持久化调用图库（SQLite）。
+
+    每个 .o 以 (path, mtime_ns, size) 为键记录其 direct/indirect 调用边和 vtable 类型，
+    源码文件以同样的键记录 dlopen 相关事实；
+    LLVM 工具路径或表结构版本变化时整库失效。提取失败的 .o 不入库（旧记录一并删除），下次查询重试。
+    """
+
+    def __init__(self, path, llvm_bin):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS objects (
+                path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER);
+            CREATE TABLE IF NOT EXISTS edges (
+                obj TEXT, caller TEXT, kind TEXT, callee TEXT);
+            CREATE TABLE IF NOT EXISTS vtables (obj TEXT, func TEXT, type TEXT);
+            CREATE TABLE IF NOT EXISTS sources (
+                path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, facts TEXT);
+            CREATE INDEX IF NOT EXISTS edges_obj ON edges(obj);
+            CREATE INDEX IF NOT EXISTS edges_caller ON edges(caller);
+            CREATE INDEX IF NOT EXISTS edges_callee ON edges(callee);
+            CREATE INDEX IF NOT EXISTS vtables_obj ON vtables(obj);
+            """
+        )
+        stamp = {"schema": str(DB_SCHEMA_VERSION), "llvm_bin": llvm_bin or ""}
+        stored = dict(self.conn.execute("SELECT key, value FROM meta"))
+        if stored != stamp:
+            self.clear()
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)", stamp.items()
+            )
+            self.conn.commit()
+
+    def clear(self):
+        """清空所有已缓存的提取结果"""
+        for table in ("meta", "objects", "edges", "vtables", "sources"):
+            self.conn.execute(f"DELETE FROM {table}")
+        self.conn.commit()
+
+    @staticmethod
+    def _stat(obj_file):
+        st = os.stat(obj_file)
+        return st.st_mtime_ns, st.st_size
+
+    def stale(self, obj_files):
+        """返回需要重新提取的 .o（未入库或 mtime/size 已变化）"""
+        known = {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in self.conn.execute(
+                "SELECT path, mtime_ns, size FROM objects"
+            )
+        }
+        result = []
+        for obj_file in obj_files:
+            try:
+                if known.get(obj_file) != self._stat(obj_file):
+                    result.append(obj_file)
+            except OSError:
+                result.append(obj_file)
+        return result
+
+    def update(self, obj_file, graph, vtable):
+        """替换单个 .o 的提取结果（stat 在提取后读取，期间被改写的文件下次会再次失效）"""
         try:
-            os.unlink(ll_path)
+            mtime_ns, size = self._stat(obj_file)
         except OSError:
-            pass
-    return vtable_calls, None
+            return
+        self.forget(obj_file)
+        self.conn.execute(
+            "INSERT INTO objects VALUES (?, ?, ?)", (obj_file, mtime_ns, size)
+        )
+        self.conn.executemany(
+            "INSERT INTO edges VALUES (?, ?, ?, ?)",
+            [
+                (obj_file, caller, kind, callee)
+                for caller, callees in graph.items()
+                for kind, callee in callees
+            ],
+        )
+        self.conn.executemany(
+            "INSERT INTO vtables VALUES (?, ?, ?)",
+            [
+                (obj_file, func, vtype)
+                for func, types in vtable.items()
+                for vtype in types
+            ],
+        )
 
+    def forget(self, obj_file):
+        """删除单个 .o 的记录（重新提取失败时旧结果已不可信，不再保留）"""
+        for table, column in (("objects", "path"), ("edges", "obj"), ("vtables", "obj")):
+            self.conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (obj_file,))
+
+    def prune(self):
+        """删除磁盘上已不存在的 .o 的记录"""
+        paths = [row[0] for row in self.conn.execute("SELECT path FROM objects")]
+        for path in paths:
+            if not os.path.exists(path):
+                self.forget(path)
+
+    def commit(self):
+        self.conn.commit()
+
+    def load(self, obj_files):
+        """读取指定 .o 集合的合并调用图，返回 (graph, vtable)，形状与 extract_* 一致"""
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (path TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM wanted")
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO wanted VALUES (?)", [(f,) for f in obj_files]
+        )
+        graph = defaultdict(set)
+        for caller, kind, callee in self.conn.execute(
+            "SELECT caller, kind, callee FROM edges JOIN wanted ON edges.obj = wanted.path"
+        ):
+            graph[caller].add((kind, callee))
+        vtable = defaultdict(set)
+        for func, vtype in self.conn.execute(
+            "SELECT func, type FROM vtables JOIN wanted ON vtables.obj = wanted.path"
+        ):
+            vtable[func].add(vtype)
+        return graph, vtable
+
+    def source_facts(self, src_root):
+        """src_root 下已缓存的 dlopen 源码事实: {path: ((mtime_ns, size), facts)}"""
+        prefix = os.path.join(src_root, "")
+        return {
+            path: ((mtime_ns, size), json.loads(facts))
+            for path, mtime_ns, size, facts in self.conn.execute(
+                "SELECT path, mtime_ns, size, facts FROM sources "
+                "WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix),
+            )
+        }
+
+    def update_source(self, path, stamp, facts):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?)",
+            (path, stamp[0], stamp[1], json.dumps(facts)),
+        )
 
-def discover_dlopen_map(src_root):
-    """自动发现 dlopen 映射：Interface -> .so -> ConcreteClass"""
-    registry = {}
-    load_calls = run(["grep", "-rn", "LoadLibrary<", src_root,
-                       "--include=*.cpp", "--include=*.h"], timeout=30).output
-    so_names = run(["grep", "-rn", 'constexpr.*char.*LIB_.*"', src_root,
-                     "--include=*.cpp", "--include=*.h"], timeout=30).output
-    create_calls = run(["grep", "-rn", "extern.*C.*CreateInstance", src_root,
-                         "--include=*.cpp"], timeout=30).output
+    def forget_sources(self, paths):
+        self.conn.executemany("DELETE FROM sources WHERE path = ?", [(p,) for p in paths])
 
-    so_map = {}
-    for line in so_names.split("\n"):
-        m = re.search(r'constexpr\s+char\s+(\w+)\[\]\s*\{\s*"([^"]+)"', line)
-        if m:
-            so_map[m.group(1)] = m.group(2)
+    def close(self):
+        self.conn.close()
+
+
+def extract_object(llvm_bin, obj_file):
+    """提取单个 .o 的调用边和 vtable 类型，返回 (obj_file, graph, vtable, failures)"""
+    failures = []
+    graph, graph_error = extract_callgraph(llvm_bin, obj_file)
+    if graph_error:
+        failures.append((obj_file, "opt", graph_error))
+    vtable, vtable_error = extract_vtable_calls(llvm_bin, obj_file)
+    if vtable_error:
+        failures.append((obj_file, "llvm-dis", vtable_error))
+    return obj_file, graph, vtable, failures
+
+
+def analyze_objects(llvm_bin, obj_files, store=None, jobs=1):
+    """
+    提取 obj_files 的调用图和 vtable 信息
+
+    jobs > 1 时用线程池并发调用 opt / llvm-dis（耗时在外部进程，线程足够），
+    结果按完成顺序流式合并；提供 store 时只提取未入库或已变化的 .o，
+    结果写回图库后从图库读取合并视图；提取失败的 .o 删除旧记录，
+    本次提取到的部分结果（如 opt 成功、llvm-dis 失败）只并入本次返回的视图。
+    返回: (all_graphs, all_vtable, failures)，failures 为 [(obj_file, tool, error)]
+    """
+    pending = store.stale(obj_files) if store else obj_files
+    if store:
+        print(f"图库命中 {len(obj_files) - len(pending)} 个，需提取 {len(pending)} 个",
+              file=sys.stderr)
 
+    merged = defaultdict(set)
+    merged_vtable = defaultdict(set)
+    # 提取失败、未入库的 .o 的部分结果，读取图库视图后再并入
+    partial = defaultdict(set)
+    partial_vtable = defaultdict(set)
+    failures = []
+
+    def collect(done, result):
+        obj_file, graph, vtable, obj_failures = result
+        if done % 20 == 0:
+            print(f"  分析 {done}/{len(pending)}...", file=sys.stderr)
+        failures.extend(obj_failures)
+        if store and obj_failures:
+            store.forget(obj_file)
+            target, target_vtable = partial, partial_vtable
+        else:
+            target, target_vtable = merged, merged_vtable
+        for caller, callees in graph.items():
+            target[caller].update(callees)
+        for func, types in vtable.items():
+            target_vtable[func].update(types)
+        if store and not obj_failures:
+            store.update(obj_file, graph, vtable)
+
+    if jobs > 1 and len(pending) > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(extract_object, llvm_bin, f) for f in pending]
+            for done, future in enumerate(as_completed(futures), 1):
+                collect(done, future.result())
+        # 完成顺序不确定，失败示例按输入顺序输出
+        order = {f: i for i, f in enumerate(pending)}
+        failures.sort(key=lambda item: order[item[0]])
+    else:
+        for done, obj_file in enumerate(pending, 1):
+            collect(done, extract_object(llvm_bin, obj_file))
+
+    if store:
+        store.prune()
+        store.commit()
+        merged, merged_vtable = store.load(obj_files)
+        for caller, callees in partial.items():
+            merged[caller].update(callees)
+        for func, types in partial_vtable.items():
+            merged_vtable[func].update(types)
+    all_graphs = [merged] if merged else []
+    all_vtable = [merged_vtable] if merged_vtable else []
+    return all_graphs, all_vtable, failures
+
+
+DLOPEN_LOAD_PATTERN = re.compile(r"LoadLibrary<(\w+)>\s*\([^,]+,\s*(\w+)\)")
+DLOPEN_LIB_LINE = re.compile(r'constexpr.*char.*LIB_.*"')
+# 兼容 LIB_X[] { "..." } / LIB_X[] = { "..." } / LIB_X[] = "..." 三种写法
+DLOPEN_LIB_PATTERN = re.compile(r'constexpr\s+char\s+(\w+)\[\]\s*(?:=\s*)?(?:\{\s*)?"([^"]+)"')
+DLOPEN_CREATE_LINE = re.compile(r"extern.*C.*CreateInstance")
+DLOPEN_CREATE_PATTERN = re.compile(r"\b(\w+)\s*\*\s*CreateInstance")
+DLOPEN_MARKERS = ("LoadLibrary<", "LIB_", "CreateInstance")
+
+
+def scan_dlopen_source(path):
+    """
+    单文件提取 dlopen 相关事实，返回 {"loads": [[iface, lib_const]], "libs": {const: so}, "creates": [iface]}
+
+    只在文件包含任一标记时逐行匹配；CreateInstance 工厂只认 .cpp（与原 grep --include 一致）
+    """
+    facts = {"loads": [], "libs": {}, "creates": []}
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            text = f.read()
+    except OSError:
+        return facts
+    if not any(marker in text for marker in DLOPEN_MARKERS):
+        return facts
+    is_cpp = path.endswith(".cpp")
+    for line in text.split("\n"):
+        if "LoadLibrary<" in line:
+            m = DLOPEN_LOAD_PATTERN.search(line)
+            if m:
+                facts["loads"].append([m.group(1), m.group(2)])
+        if "LIB_" in line and DLOPEN_LIB_LINE.search(line):
+            m = DLOPEN_LIB_PATTERN.search(line)
+            if m:
+                facts["libs"][m.group(1)] = m.group(2)
+        if is_cpp and "CreateInstance" in line and DLOPEN_CREATE_LINE.search(line):
+            m = DLOPEN_CREATE_PATTERN.search(line)
+            if m:
+                facts["creates"].append(m.group(1))
+    return facts
+
+
+def _walk_sources(src_root):
+    """遍历 src_root 下的 .cpp/.h，返回 {path: (mtime_ns, size)}（跳过 .git/.repo 等隐藏目录）"""
+    sources = {}
+    for dirpath, dirnames, filenames in os.walk(src_root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in sorted(filenames):
+            if not name.endswith((".cpp", ".h")):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            sources[path] = (st.st_mtime_ns, st.st_size)
+    return sources
+
+
+def discover_dlopen_map(src_root, store=None, jobs=1):
+    """
+    自动发现 dlopen 映射：Interface -> .so -> ConcreteClass
+
+    单遍遍历源码，一次读文件同时提取 LoadLibrary<>、LIB_* 常量和 CreateInstance 工厂；
+    提供 store 时按文件 (mtime_ns, size) 缓存提取结果，只重读变更过的文件
+    """
+    sources = _walk_sources(src_root)
+    cached = store.source_facts(src_root) if store else {}
+    facts = {}
+    pending = []
+    for path, stamp in sources.items():
+        hit = cached.get(path)
+        if hit and hit[0] == stamp:
+            facts[path] = hit[1]
+        else:
+            pending.append(path)
+
+    if jobs > 1 and len(pending) > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            scanned = list(pool.map(scan_dlopen_source, pending))
+    else:
+        scanned = [scan_dlopen_source(path) for path in pending]
+    for path, result in zip(pending, scanned):
+        facts[path] = result
+
+    if store:
+        for path in pending:
+            store.update_source(path, sources[path], facts[path])
+        store.forget_sources([path for path in cached if path not in sources])
+        store.commit()
+
+    so_map = {}
     create_map = {}
-    for line in create_calls.split("\n"):
-        m = re.match(r"([^:]+):.*(\w+)\*\s*CreateInstance", line)
-        if m:
-            create_map[m.group(2)] = m.group(1)
+    loads = []
+    for path in sorted(facts):
+        result = facts[path]
+        so_map.update(result["libs"])
+        for iface in result["creates"]:
+            create_map[iface] = path
+        loads.extend(result["loads"])
 
-    for line in load_calls.split("\n"):
-        m = re.search(r"LoadLibrary<(\w+)>\s*\([^,]+,\s*(\w+)\)", line)
-        if m:
-            iface = m.group(1)
-            so_name = so_map.get(m.group(2), m.group(2))
-            registry[iface] = {"so": so_name, "create_src": create_map.get(iface, ""),
-                                "interface": iface}
+    registry = {}
+    for iface, lib_const in loads:
+        so_name = so_map.get(lib_const, lib_const)
+        registry[iface] = {"so": so_name, "create_src": create_map.get(iface, ""),
+                           "interface": iface}
     return registry
 
 
@@ -253,36 +620,100 @@ DEFAULT_SKIP_PREFIXES = ["HiLog", "std::__h::", "__cfi_slowpath", "__ubsan", "ab
                  "operator delete"]
 
 
+def class_name(demangled):
+    """demangled 函数名中的类名（最后一个 :: 前的标识符），自由函数返回 None"""
+    m = re.search(r"(\w+)::~?\w+\s*\(", demangled)
+    return m.group(1) if m else None
+
+
+class CallGraphIndex:
+    """
+    合并后的候选调用图及符号索引
+
+    一次加载后可反复查询：demangled 全名 / short_name / 类名 → mangled 列表，
+    精确命中走索引，未命中才回退到子串扫描。
+    """
+
+    def __init__(self, all_graphs, vtable_info, llvm_bin):
+        self.graph = defaultdict(set)
+        for graph in all_graphs:
+            for caller, callees in graph.items():
+                self.graph[caller].update(callees)
+
+        self.vtable = defaultdict(set)
+        for vt in vtable_info:
+            for func, types in vt.items():
+                self.vtable[func].update(types)
+
+        self.funcs = set(self.graph.keys())
+        for callees in self.graph.values():
+            for _, callee in callees:
+                if callee:
+                    self.funcs.add(callee)
+        self.funcs.update(self.vtable.keys())
+
+        # vtable 类型与函数一起批量 demangle，打印树时 resolve_vtable_to_impl 直接命中缓存
+        vtable_types = set()
+        for types in self.vtable.values():
+            vtable_types.update(types)
+        self.demangled = demangle_batch(llvm_bin, list(self.funcs | vtable_types))
+
+        self.by_name = defaultdict(list)
+        self.by_short = defaultdict(list)
+        self.by_class = defaultdict(list)
+        for mangled in sorted(self.funcs):
+            dm = self.demangled.get(mangled, mangled)
+            self.by_name[dm].append(mangled)
+            self.by_short[short_name(dm)].append(mangled)
+            cls = class_name(dm)
+            if cls:
+                self.by_class[cls].append(mangled)
+        self._reverse = None
+
+    @property
+    def reverse(self):
+        """callee -> {caller}，首次使用时构建"""
+        if self._reverse is None:
+            self._reverse = defaultdict(set)
+            for caller, callees in self.graph.items():
+                for _, callee in callees:
+                    if callee:
+                        self._reverse[callee].add(caller)
+        return self._reverse
+
+    def find(self, query):
+        """返回 [(mangled, demangled)]：mangled / 全名 / short_name / 类名精确匹配优先，否则子串匹配"""
+        if query in self.funcs:
+            hits = [query]
+        else:
+            hits = (
+                self.by_name.get(query)
+                or self.by_short.get(query)
+                or self.by_class.get(query)
+                or sorted(
+                    m for m in self.funcs
+                    if query in self.demangled.get(m, m) or query in m
+                )
+            )
+        return [(m, self.demangled.get(m, m)) for m in hits]
+
+
 def build_call_tree(target_func, all_graphs, vtable_info, dlopen_map,
                     llvm_bin, max_depth=5, reverse=False, check_keyword=None,
-                    skip_prefixes=None):
-    """构建候选调用树并可选检查函数名关键字"""
+                    skip_prefixes=None, index=None):
+    """构建候选调用树并可选检查函数名关键字（传入 index 时复用已加载的图和符号索引）"""
     if skip_prefixes is None:
         skip_prefixes = DEFAULT_SKIP_PREFIXES
-    merged = defaultdict(set)
-    for graph in all_graphs:
-        for caller, callees in graph.items():
-            merged[caller].update(callees)
-
-    merged_vtable = defaultdict(set)
-    for vt in vtable_info:
-        for func, types in vt.items():
-            merged_vtable[func].update(types)
+    if index is None:
+        index = CallGraphIndex(all_graphs, vtable_info, llvm_bin)
+    merged = index.graph
+    merged_vtable = index.vtable
+    demangled = index.demangled
 
-    all_funcs = set(merged.keys())
-    for callees in merged.values():
-        for _, callee in callees:
-            if callee:
-                all_funcs.add(callee)
-    all_funcs.update(merged_vtable.keys())
-
-    demangled = demangle_batch(llvm_bin, list(all_funcs))
-
-    matches = [(m, demangled.get(m, m)) for m in all_funcs
-               if target_func in demangled.get(m, m) or target_func in m]
+    matches = index.find(target_func)
 
     if not matches:
-        print(f"未找到包含 '{target_func}' 的函数（共 {len(all_funcs)} 个）", file=sys.stderr)
+        print(f"未找到包含 '{target_func}' 的函数（共 {len(index.funcs)} 个）", file=sys.stderr)
         return
 
     if len(matches) > 1:
@@ -305,13 +736,8 @@ def build_call_tree(target_func, all_graphs, vtable_info, dlopen_map,
     print(f"{'=' * 80}\n")
 
     if reverse:
-        reverse_graph = defaultdict(set)
-        for caller, callees in merged.items():
-            for _, callee in callees:
-                if callee:
-                    reverse_graph[callee].add(caller)
         visited = set()
-        _print_tree(root_mangled, reverse_graph, {}, demangled, dlopen_map,
+        _print_tree(root_mangled, index.reverse, {}, demangled, dlopen_map,
                     llvm_bin, max_depth, 0, visited, check_keyword, is_reverse=True,
                     skip_prefixes=skip_prefixes)
     else:
@@ -371,11 +797,142 @@ def _child_symbols(graph, func, is_reverse=False):
     return [callee for _, callee in graph.get(func, set()) if callee]
 
 
+def collect_tree(func, graph, vtable_info, demangled, dlopen_map, llvm_bin,
+                 max_depth, depth=0, visited=None, is_reverse=False, skip_prefixes=None):
+    """
+    与 _print_tree 相同的遍历规则（深度、去重、跳过前缀），返回结构化子节点列表
+
+    节点: {"symbol", "name", "demangled", "kind", "children"}；
+    kind 为 direct / caller / vtable / dlopen，vtable/dlopen 节点额外带 "impl"
+    """
+    if skip_prefixes is None:
+        skip_prefixes = DEFAULT_SKIP_PREFIXES
+    if visited is None:
+        visited = set()
+    if depth > max_depth or func in visited:
+        return []
+    visited.add(func)
+
+    if is_reverse:
+        callees = {("caller", c) for c in graph.get(func, set())}
+    else:
+        callees = graph.get(func, set())
+
+    nodes = []
+    for call_type, callee in sorted(callees, key=lambda x: x[1] or ""):
+        if callee is None:
+            continue
+        callee_dm = demangled.get(callee, callee)
+        if any(callee_dm.startswith(p) for p in skip_prefixes):
+            continue
+        nodes.append({
+            "symbol": callee,
+            "name": short_name(callee_dm),
+            "demangled": callee_dm,
+            "kind": call_type,
+            "children": collect_tree(callee, graph, vtable_info, demangled, dlopen_map,
+                                     llvm_bin, max_depth, depth + 1, visited,
+                                     is_reverse=is_reverse, skip_prefixes=skip_prefixes),
+        })
+
+    if not is_reverse:
+        for vtype in sorted(vtable_info.get(func, set())):
+            iface_name, impls = resolve_vtable_to_impl(vtype, dlopen_map, llvm_bin)
+            for impl in impls:
+                nodes.append({
+                    "symbol": vtype,
+                    "name": iface_name,
+                    "demangled": demangled.get(vtype, vtype),
+                    "kind": "dlopen" if impl.startswith("[dlopen:") else "vtable",
+                    "impl": impl,
+                    "children": [],
+                })
+    return nodes
+
+
+BATCH_MATCH_LIMIT = 20
+
+
+def load_queries(path):
+    """读取批量查询文件：每行一个函数名，忽略空行和 # 注释"""
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def run_batch_queries(queries, index, dlopen_map, llvm_bin, max_depth=3,
+                      skip_prefixes=None):
+    """在同一份已加载的图上对每个查询同时生成正向与反向候选树"""
+    results = []
+    for query in queries:
+        matches = index.find(query)
+        entry = {
+            "query": query,
+            "match_count": len(matches),
+            "matches": [d for _, d in matches[:BATCH_MATCH_LIMIT]],
+            "root": None,
+            "forward": [],
+            "reverse": [],
+        }
+        if matches:
+            root, root_dm = matches[0]
+            entry["root"] = {"symbol": root, "name": short_name(root_dm), "demangled": root_dm}
+            entry["forward"] = collect_tree(
+                root, index.graph, index.vtable, index.demangled, dlopen_map, llvm_bin,
+                max_depth, skip_prefixes=skip_prefixes,
+            )
+            entry["reverse"] = collect_tree(
+                root, index.reverse, {}, index.demangled, dlopen_map, llvm_bin,
+                max_depth, is_reverse=True, skip_prefixes=skip_prefixes,
+            )
+        results.append(entry)
+    return results
+
+
+def batch_to_dot(results):
+    """把批量查询结果合并成一张 DOT 图（边方向始终为 caller -> callee，vtable/dlopen 为虚线）"""
+    nodes = {}
+    edges = set()
+
+    def walk(parent, children, is_reverse):
+        for child in children:
+            if child["kind"] in ("vtable", "dlopen"):
+                node_id = f"{child['kind']}:{child['name']}"
+                nodes[node_id] = f"{child['name']} {child['impl']}"
+                edges.add((parent, node_id, True))
+                continue
+            nodes.setdefault(child["symbol"], child["name"])
+            if is_reverse:
+                edges.add((child["symbol"], parent, False))
+            else:
+                edges.add((parent, child["symbol"], False))
+            walk(child["symbol"], child["children"], is_reverse)
+
+    for entry in results:
+        root = entry["root"]
+        if not root:
+            continue
+        nodes[root["symbol"]] = root["name"]
+        walk(root["symbol"], entry["forward"], False)
+        walk(root["symbol"], entry["reverse"], True)
+
+    roots = {entry["root"]["symbol"] for entry in results if entry["root"]}
+    lines = ["digraph callgraph {", "  node [shape=box];"]
+    for node_id, label in sorted(nodes.items()):
+        style = ", style=bold" if node_id in roots else ""
+        lines.append(f"  {json.dumps(node_id)} [label={json.dumps(label)}{style}];")
+    for src, dst, dashed in sorted(edges):
+        style = " [style=dashed]" if dashed else ""
+        lines.append(f"  {json.dumps(src)} -> {json.dumps(dst)}{style};")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="OpenHarmony candidate call-edge finder (not a completeness proof)"
     )
-    parser.add_argument("function", help="目标函数名（支持部分匹配）")
+    parser.add_argument("function", nargs="?", help="目标函数名（支持部分匹配）")
     parser.add_argument("--depth", type=int, default=3, help="候选边展开深度（默认 3）")
     parser.add_argument("--reverse", action="store_true",
                         help="反向查询 direct callers；不反查 vtable/dlopen 候选边")
@@ -390,7 +947,32 @@ def main():
                         help="Function name prefixes to skip in output (repeatable). "
                              "Defaults: HiLog, std::__h::, __cfi_slowpath, __ubsan, abort, "
                              "operator new, operator delete")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="批量查询文件（每行一个函数名）；对每个函数同时输出正向与反向候选树")
+    parser.add_argument("--format", choices=["json", "dot"], default="json",
+                        help="批量查询输出格式（默认 json）")
+    parser.add_argument("-o", "--output", metavar="FILE", help="批量查询结果写入文件（默认 stdout）")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="并发提取的 .o 数（默认 CPU 核数；1 为串行）")
+    parser.add_argument("--db", metavar="PATH",
+                        help=f"调用图库路径（默认 out/<product>/{DB_FILENAME}）")
+    parser.add_argument("--no-db", action="store_true",
+                        help="不读写调用图库，每次全量提取")
+    parser.add_argument("--rebuild-db", action="store_true",
+                        help="清空调用图库后全量提取")
     args = parser.parse_args()
+    if not args.function and not args.batch:
+        parser.error("需要目标函数名或 --batch FILE")
+
+    queries = None
+    if args.batch:
+        try:
+            queries = load_queries(args.batch)
+        except OSError as exc:
+            print(f"错误：无法读取批量查询文件 {args.batch}: {exc}", file=sys.stderr)
+            sys.exit(1)
+        if args.function:
+            queries.insert(0, args.function)
 
     oh_root = args.oh_root
 
@@ -404,7 +986,8 @@ def main():
         print("错误：找不到编译产品，请用 --product 指定", file=sys.stderr)
         sys.exit(1)
 
-    obj_dir = os.path.join(oh_root, "out", product, "obj")
+    # 绝对路径：图库以 .o 路径为键，不随调用时的工作目录变化
+    obj_dir = os.path.abspath(os.path.join(oh_root, "out", product, "obj"))
     if not os.path.isdir(obj_dir):
         print(f"错误：{obj_dir} 不存在，请先编译", file=sys.stderr)
         sys.exit(1)
@@ -415,38 +998,42 @@ def main():
     print(f"Product:  {product}", file=sys.stderr)
     print(f"Repo:     {repo_filter or '(all)'}", file=sys.stderr)
 
-    # 发现 dlopen 映射（基于 agent 显式传入的源码根和仓过滤）
-    src_root = resolve_source_root(oh_root, repo_filter)
-    print(f"发现 dlopen 映射 (source={src_root})...", file=sys.stderr)
-    dlopen_map = discover_dlopen_map(src_root)
-    for iface, info in dlopen_map.items():
-        print(f"  {iface} -> {info['so']}", file=sys.stderr)
-
-    # 扫描 bitcode
-    print(f"扫描 bitcode (filter={repo_filter})...", file=sys.stderr)
-    obj_files = find_bitcode_files(obj_dir, repo_filter)
-    print(f"找到 {len(obj_files)} 个文件", file=sys.stderr)
+    store = None
+    if not args.no_db:
+        db_path = args.db or os.path.join(oh_root, "out", product, DB_FILENAME)
+        try:
+            store = CallGraphStore(db_path, llvm_bin)
+        except sqlite3.Error as exc:
+            print(f"警告: 无法打开调用图库 {db_path}: {exc}，本次不使用缓存", file=sys.stderr)
+        else:
+            print(f"调用图库: {db_path}", file=sys.stderr)
+            if args.rebuild_db:
+                store.clear()
+    jobs = max(1, args.jobs)
 
-    if not obj_files:
-        print("错误：未找到 bitcode 文件。确认已编译且 --repo 过滤正确", file=sys.stderr)
-        sys.exit(1)
+    try:
+        # 发现 dlopen 映射（基于 agent 显式传入的源码根和仓过滤）
+        src_root = os.path.abspath(resolve_source_root(oh_root, repo_filter))
+        print(f"发现 dlopen 映射 (source={src_root})...", file=sys.stderr)
+        dlopen_map = discover_dlopen_map(src_root, store, jobs=jobs)
+        for iface, info in dlopen_map.items():
+            print(f"  {iface} -> {info['so']}", file=sys.stderr)
+
+        # 扫描 bitcode
+        print(f"扫描 bitcode (filter={repo_filter})...", file=sys.stderr)
+        obj_files = find_bitcode_files(obj_dir, repo_filter)
+        print(f"找到 {len(obj_files)} 个文件", file=sys.stderr)
+
+        if not obj_files:
+            print("错误：未找到 bitcode 文件。确认已编译且 --repo 过滤正确", file=sys.stderr)
+            sys.exit(1)
 
-    all_graphs = []
-    all_vtable = []
-    failures = []
-    for i, obj_file in enumerate(obj_files):
-        if (i + 1) % 20 == 0:
-            print(f"  分析 {i+1}/{len(obj_files)}...", file=sys.stderr)
-        graph, graph_error = extract_callgraph(llvm_bin, obj_file)
-        if graph_error:
-            failures.append((obj_file, "opt", graph_error))
-        if graph:
-            all_graphs.append(graph)
-        vtable, vtable_error = extract_vtable_calls(llvm_bin, obj_file)
-        if vtable_error:
-            failures.append((obj_file, "llvm-dis", vtable_error))
-        if vtable:
-            all_vtable.append(vtable)
+        all_graphs, all_vtable, failures = analyze_objects(
+            llvm_bin, obj_files, store, jobs=jobs
+        )
+    finally:
+        if store:
+            store.close()
 
     if failures:
         print(f"警告: {len(failures)} 个工具调用失败，候选边可能缺失。示例：", file=sys.stderr)
@@ -469,10 +1056,35 @@ def main():
 
     skip_prefixes = args.skip_prefix if args.skip_prefix else DEFAULT_SKIP_PREFIXES
 
+    index = CallGraphIndex(all_graphs, all_vtable, llvm_bin)
+
+    if queries is not None:
+        results = run_batch_queries(queries, index, dlopen_map, llvm_bin,
+                                    max_depth=args.depth, skip_prefixes=skip_prefixes)
+        missing = [entry["query"] for entry in results if not entry["root"]]
+        if missing:
+            print(f"警告: {len(missing)} 个查询未找到匹配函数: {', '.join(missing[:10])}",
+                  file=sys.stderr)
+        if args.format == "dot":
+            text = batch_to_dot(results)
+        else:
+            text = json.dumps({
+                "note": "静态候选边发现结果，不证明调用链完整；reverse 只包含 direct call",
+                "depth": args.depth,
+                "queries": results,
+            }, ensure_ascii=False, indent=2) + "\n"
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text)
+            print(f"批量查询结果已写入 {args.output}（{len(results)} 个查询）", file=sys.stderr)
+        else:
+            sys.stdout.write(text)
+        return
+
     build_call_tree(
         args.function, all_graphs, all_vtable, dlopen_map,
         llvm_bin, max_depth=args.depth, reverse=args.reverse,
-        check_keyword=keyword, skip_prefixes=skip_prefixes
+        check_keyword=keyword, skip_prefixes=skip_prefixes, index=index
     )
 
 
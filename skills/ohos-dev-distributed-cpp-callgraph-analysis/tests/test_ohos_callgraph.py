@@ -1,5 +1,6 @@
 import importlib.util
 import io
+import os
 import subprocess
 import sys
 import tempfile
@@ -160,6 +161,318 @@ class OhosCallgraphTest(unittest.TestCase):
                 td,
             )
 
+    def test_store_round_trip_and_staleness(self):
+        with tempfile.TemporaryDirectory() as td:
+            obj = Path(td) / "a.o"
+            obj.write_bytes(b"bc")
+            db = str(Path(td) / "cg.db")
+
+            store = ohos_callgraph.CallGraphStore(db, "/fake/llvm")
+            self.assertEqual(store.stale([str(obj)]), [str(obj)])
+            store.update(
+                str(obj),
+                {"_ZA": {("direct", "_ZB"), ("indirect", None)}},
+                {"_ZA": {"_ZTSIface"}},
+            )
+            store.commit()
+            store.close()
+
+            store = ohos_callgraph.CallGraphStore(db, "/fake/llvm")
+            self.assertEqual(store.stale([str(obj)]), [])
+            graph, vtable = store.load([str(obj)])
+            self.assertEqual(graph["_ZA"], {("direct", "_ZB"), ("indirect", None)})
+            self.assertEqual(vtable["_ZA"], {"_ZTSIface"})
+
+            obj.write_bytes(b"bitcode")
+            self.assertEqual(store.stale([str(obj)]), [str(obj)])
+            store.close()
+
+            store = ohos_callgraph.CallGraphStore(db, "/other/llvm")
+            self.assertEqual(store.load([str(obj)]), ({}, {}))
+            store.close()
+
+    def test_analyze_objects_only_extracts_changed_objects(self):
+        with tempfile.TemporaryDirectory() as td:
+            objs = []
+            for name in ("a.o", "b.o"):
+                path = Path(td) / name
+                path.write_bytes(name.encode())
+                objs.append(str(path))
+            store = ohos_callgraph.CallGraphStore(str(Path(td) / "cg.db"), "/fake/llvm")
+
+            def fake_callgraph(llvm_bin, obj_file):
+                caller = "_Z" + os.path.basename(obj_file)[0]
+                return {caller: {("direct", "_ZLeaf")}}, None
+
+            with patch.object(ohos_callgraph, "extract_callgraph", side_effect=fake_callgraph) as cg, \
+                    patch.object(ohos_callgraph, "extract_vtable_calls", return_value=({}, None)), \
+                    redirect_stderr(io.StringIO()):
+                ohos_callgraph.analyze_objects("/fake/llvm", objs, store)
+                self.assertEqual(cg.call_count, 2)
+
+                os.utime(objs[1], ns=(0, 0))
+                graphs, _, failures = ohos_callgraph.analyze_objects("/fake/llvm", objs, store)
+
+            self.assertEqual(cg.call_count, 3)
+            self.assertEqual(cg.call_args[0][1], objs[1])
+            self.assertFalse(failures)
+            self.assertEqual(set(graphs[0]), {"_Za", "_Zb"})
+            store.close()
+
+    def test_analyze_objects_does_not_cache_failures(self):
+        with tempfile.TemporaryDirectory() as td:
+            obj = Path(td) / "a.o"
+            obj.write_bytes(b"bc")
+            store = ohos_callgraph.CallGraphStore(str(Path(td) / "cg.db"), "/fake/llvm")
+
+            with patch.object(ohos_callgraph, "extract_callgraph", return_value=({}, "opt failed")), \
+                    patch.object(ohos_callgraph, "extract_vtable_calls", return_value=({}, None)), \
+                    redirect_stderr(io.StringIO()):
+                _, _, failures = ohos_callgraph.analyze_objects("/fake/llvm", [str(obj)], store)
+
+            self.assertEqual(failures, [(str(obj), "opt", "opt failed")])
+            self.assertEqual(store.stale([str(obj)]), [str(obj)])
+            store.close()
+
+    def test_analyze_objects_drops_stale_rows_when_reextraction_fails(self):
+        with tempfile.TemporaryDirectory() as td:
+            obj = Path(td) / "a.o"
+            obj.write_bytes(b"bc")
+            store = ohos_callgraph.CallGraphStore(str(Path(td) / "cg.db"), "/fake/llvm")
+
+            with patch.object(ohos_callgraph, "extract_callgraph",
+                              return_value=({"_ZA": {("direct", "_ZOld")}}, None)), \
+                    patch.object(ohos_callgraph, "extract_vtable_calls", return_value=({}, None)), \
+                    redirect_stderr(io.StringIO()):
+                ohos_callgraph.analyze_objects("/fake/llvm", [str(obj)], store)
+
+            obj.write_bytes(b"bitcode")
+            with patch.object(ohos_callgraph, "extract_callgraph",
+                              return_value=({"_ZA": {("direct", "_ZNew")}}, None)), \
+                    patch.object(ohos_callgraph, "extract_vtable_calls",
+                                 return_value=({}, "llvm-dis failed")), \
+                    redirect_stderr(io.StringIO()):
+                graphs, _, failures = ohos_callgraph.analyze_objects("/fake/llvm", [str(obj)], store)
+
+            self.assertEqual(failures, [(str(obj), "llvm-dis", "llvm-dis failed")])
+            self.assertEqual(graphs[0]["_ZA"], {("direct", "_ZNew")})
+            self.assertEqual(store.load([str(obj)]), ({}, {}))
+            self.assertEqual(store.stale([str(obj)]), [str(obj)])
+            store.close()
+
+    def test_parallel_analysis_matches_serial(self):
+        objs = [f"/obj/{i}.o" for i in range(30)]
+
+        def fake_callgraph(llvm_bin, obj_file):
+            if obj_file.endswith("/7.o"):
+                return {}, "opt failed"
+            return {"_ZRoot": {("direct", "_Z" + os.path.basename(obj_file))}}, None
+
+        def fake_vtable(llvm_bin, obj_file):
+            return {"_ZRoot": {"_ZTS" + os.path.basename(obj_file)}}, None
+
+        with patch.object(ohos_callgraph, "extract_callgraph", side_effect=fake_callgraph), \
+                patch.object(ohos_callgraph, "extract_vtable_calls", side_effect=fake_vtable), \
+                redirect_stderr(io.StringIO()):
+            serial = ohos_callgraph.analyze_objects("/fake/llvm", objs, jobs=1)
+            parallel = ohos_callgraph.analyze_objects("/fake/llvm", objs, jobs=8)
+
+        self.assertEqual(serial, parallel)
+        self.assertEqual(len(parallel[0][0]["_ZRoot"]), 29)
+        self.assertEqual(parallel[2], [("/obj/7.o", "opt", "opt failed")])
+
+    def test_extract_vtable_calls_streams_llvm_dis_stdout(self):
+        with tempfile.TemporaryDirectory() as td:
+            tool = Path(td) / "llvm-dis"
+            tool.write_text(
+                "#!/bin/sh\n"
+                "[ \"$2\" = \"-\" ] || exit 2\n"
+                "cat <<'EOF'\n"
+                "define void @_ZRoot() {\n"
+                "  %t = call i1 @llvm.type.test(ptr %p, metadata !\"_ZTS5Iface\")\n"
+                "}\n"
+                "define void @_ZLeaf() {\n"
+                "}\n"
+                "EOF\n"
+            )
+            tool.chmod(0o755)
+
+            vtable, error = ohos_callgraph.extract_vtable_calls(td, "/tmp/a.o")
+
+        self.assertIsNone(error)
+        self.assertEqual(dict(vtable), {"_ZRoot": {"_ZTS5Iface"}})
+
+    def test_extract_vtable_calls_reports_tool_failure(self):
+        with tempfile.TemporaryDirectory() as td:
+            tool = Path(td) / "llvm-dis"
+            tool.write_text("#!/bin/sh\necho 'define void @_ZA() {'\necho 'bad bitcode' >&2\nexit 1\n")
+            tool.chmod(0o755)
+
+            vtable, error = ohos_callgraph.extract_vtable_calls(td, "/tmp/a.o")
+
+        self.assertFalse(vtable)
+        self.assertIn("bad bitcode", error)
+
+    def test_stream_lines_reports_timeout_and_missing_tool(self):
+        lines = []
+        result = ohos_callgraph.stream_lines(
+            ["sh", "-c", "echo first; exec sleep 5"], lines.append, timeout=0.5
+        )
+        self.assertTrue(result.timed_out)
+        self.assertEqual(lines, ["first\n"])
+
+        result = ohos_callgraph.stream_lines(["/nonexistent/llvm-dis"], lines.append)
+        self.assertTrue(result.missing_tool)
+
+    def test_demangling_is_batched_and_cached_across_trees(self):
+        calls = []
+
+        def fake_cxxfilt(cmd, input, **kwargs):
+            symbols = input.decode().split("\n")
+            calls.append(symbols)
+            out = "\n".join(f"{sym[2:]}()" for sym in symbols)
+            return subprocess.CompletedProcess(cmd, 0, stdout=out.encode(), stderr=b"")
+
+        graph = defaultdict(set)
+        graph["_ZRoot"] = {("direct", "_ZChild")}
+        vtable = {"_ZRoot": {"_ZTS5Iface"}, "_ZChild": {"_ZTS6Other"}}
+
+        with patch.dict(ohos_callgraph._DEMANGLE_CACHE, clear=True), \
+                patch.object(subprocess, "run", side_effect=fake_cxxfilt), \
+                redirect_stdout(io.StringIO()):
+            ohos_callgraph.build_call_tree("Root", [graph], [vtable], {}, "/llvm", max_depth=3)
+            ohos_callgraph.build_call_tree("Child", [graph], [vtable], {}, "/llvm", max_depth=3)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(
+            set(calls[0]), {"_ZRoot", "_ZChild", "_ZTS5Iface", "_ZTS6Other"}
+        )
+
+    def test_demangle_failures_are_not_cached(self):
+        with patch.dict(ohos_callgraph._DEMANGLE_CACHE, clear=True):
+            result = ohos_callgraph.demangle_batch("/nonexistent/llvm", ["_ZA"])
+
+            self.assertEqual(result, {"_ZA": "_ZA"})
+            self.assertEqual(ohos_callgraph._DEMANGLE_CACHE["/nonexistent/llvm"], {})
+
+    def _demangled_index(self, graph, vtable, names):
+        def fake_cxxfilt(cmd, input, **kwargs):
+            out = "\n".join(names.get(sym, sym) for sym in input.decode().split("\n"))
+            return subprocess.CompletedProcess(cmd, 0, stdout=out.encode(), stderr=b"")
+
+        cache = patch.dict(ohos_callgraph._DEMANGLE_CACHE, clear=True)
+        cache.start()
+        self.addCleanup(cache.stop)
+        with patch.object(subprocess, "run", side_effect=fake_cxxfilt):
+            return ohos_callgraph.CallGraphIndex([graph], [vtable], "/llvm")
+
+    def test_symbol_index_prefers_exact_names_over_substrings(self):
+        graph = {
+            "_ZN3Svc4InitEv": {("direct", "_ZN3Svc10InitConfigEv")},
+            "_ZN5Other4InitEv": set(),
+        }
+        index = self._demangled_index(graph, {}, {
+            "_ZN3Svc4InitEv": "Svc::Init()",
+            "_ZN3Svc10InitConfigEv": "Svc::InitConfig()",
+            "_ZN5Other4InitEv": "Other::Init()",
+        })
+
+        self.assertEqual([m for m, _ in index.find("Svc::Init")], ["_ZN3Svc4InitEv"])
+        self.assertEqual(len(index.find("Svc")), 2)
+        self.assertEqual(len(index.find("Init")), 3)
+        self.assertEqual(index.find("_ZN5Other4InitEv")[0][1], "Other::Init()")
+        self.assertEqual(index.find("Missing"), [])
+
+    def test_batch_queries_emit_forward_and_reverse_trees(self):
+        graph = {
+            "_ZA": {("direct", "_ZB")},
+            "_ZB": {("direct", "_ZC"), ("indirect", None)},
+        }
+        vtable = {"_ZB": {"_ZTS5Iface"}}
+        names = {"_ZA": "A()", "_ZB": "B()", "_ZC": "C()", "_ZTS5Iface": "Iface"}
+        index = self._demangled_index(graph, vtable, names)
+
+        results = ohos_callgraph.run_batch_queries(
+            ["B", "Nope"], index, {"Iface": {"so": "libiface.z.so"}}, "/llvm", max_depth=2
+        )
+
+        entry = results[0]
+        self.assertEqual(entry["root"]["symbol"], "_ZB")
+        forward = {(n["kind"], n["name"]) for n in entry["forward"]}
+        self.assertEqual(forward, {("direct", "C"), ("dlopen", "Iface")})
+        self.assertEqual([n["symbol"] for n in entry["reverse"]], ["_ZA"])
+        self.assertIsNone(results[1]["root"])
+
+        dot = ohos_callgraph.batch_to_dot(results)
+        self.assertIn('"_ZA" -> "_ZB";', dot)
+        self.assertIn('"_ZB" -> "_ZC";', dot)
+        self.assertIn('"_ZB" -> "dlopen:Iface" [style=dashed];', dot)
+
+    def test_main_requires_function_or_batch(self):
+        err = io.StringIO()
+        argv = ["ohos_callgraph.py", "--oh-root", "/x", "--repo", "r"]
+        with patch.object(sys, "argv", argv):
+            with redirect_stderr(err), self.assertRaises(SystemExit) as cm:
+                ohos_callgraph.main()
+
+        self.assertNotEqual(cm.exception.code, 0)
+        self.assertIn("--batch", err.getvalue())
+
+    def _write_dlopen_sources(self, root):
+        (root / "loader").mkdir()
+        (root / "impl").mkdir()
+        (root / "loader" / "loader.cpp").write_text(
+            'constexpr char LIB_FOO[] = "libfoo.z.so";\n'
+            'constexpr char LIB_BAR[] { "libbar.z.so" };\n'
+            "auto foo = LoadLibrary<IFoo>(handle, LIB_FOO);\n"
+            "auto bar = LoadLibrary<IBar>(handle, LIB_BAR);\n"
+        )
+        (root / "impl" / "foo_impl.cpp").write_text(
+            'extern "C" IFoo* CreateInstance() { return new FooImpl(); }\n'
+        )
+        (root / "impl" / "foo_impl.h").write_text(
+            'extern "C" IBar* CreateInstance();\n'
+        )
+
+    def test_discover_dlopen_map_scans_sources_in_one_pass(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td)
+            self._write_dlopen_sources(root)
+
+            registry = ohos_callgraph.discover_dlopen_map(str(root))
+
+        self.assertEqual(registry["IFoo"]["so"], "libfoo.z.so")
+        self.assertEqual(registry["IFoo"]["create_src"], str(root / "impl" / "foo_impl.cpp"))
+        self.assertEqual(registry["IBar"]["so"], "libbar.z.so")
+        self.assertEqual(registry["IBar"]["create_src"], "")
+
+    def test_discover_dlopen_map_rescans_only_changed_sources(self):
+        with tempfile.TemporaryDirectory() as td:
+            root = Path(td) / "src"
+            root.mkdir()
+            self._write_dlopen_sources(root)
+            store = ohos_callgraph.CallGraphStore(str(Path(td) / "cg.db"), "/fake/llvm")
+            scan = ohos_callgraph.scan_dlopen_source
+
+            with patch.object(ohos_callgraph, "scan_dlopen_source", side_effect=scan) as spy:
+                first = ohos_callgraph.discover_dlopen_map(str(root), store)
+                self.assertEqual(spy.call_count, 3)
+
+                second = ohos_callgraph.discover_dlopen_map(str(root), store)
+                self.assertEqual(spy.call_count, 3)
+                self.assertEqual(first, second)
+
+                loader = root / "loader" / "loader.cpp"
+                loader.write_text(loader.read_text().replace("libfoo", "libfoo2"))
+                os.unlink(root / "impl" / "foo_impl.cpp")
+                third = ohos_callgraph.discover_dlopen_map(str(root), store, jobs=4)
+
+            self.assertEqual(spy.call_count, 4)
+            self.assertEqual(third["IFoo"]["so"], "libfoo2.z.so")
+            self.assertEqual(third["IFoo"]["create_src"], "")
+            self.assertEqual(len(store.source_facts(str(root))), 2)
+            store.close()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -7,20 +7,7 @@
 import re
 import os
 
-
-def _extract_fuzzer_func_body(content, func_name, start_pos):
-    """从函数名后的 '{' 开始提取完整函数体"""
-    brace_count = 0
-    end = start_pos
-    for i in range(start_pos, len(content)):
-        if content[i] == "{":
-            brace_count += 1
-        elif content[i] == "}":
-            brace_count -= 1
-            if brace_count == 0:
-                end = i
-                break
-    return content[start_pos + 1 : end]
+from fuzzer_model import parse_fuzzer
 
 
 def check_unfuzzable_api(content):
@@ -32,13 +19,10 @@ def check_unfuzzable_api(content):
     2. 有 fdp. 使用，但只使用了选择器变量（如 tarPos）而没有实际的业务参数消费 → 提示
     """
     errors = []
-    pattern = re.compile(
-        r"\bvoid\s+(\w+)\s*\(\s*FuzzedDataProvider\s*&\s*\w+\s*\)\s*\{"
-    )
-    for m in pattern.finditer(content):
-        func_name = m.group(1)
-        start = m.end() - 1
-        body = _extract_fuzzer_func_body(content, func_name, start)
+    model = parse_fuzzer(content)
+    for func in model.fuzz_functions:
+        func_name = func.name
+        body = func.body
 
         # 1. 检查是否真正使用了 fdp 构造参数
         # 排除 (void)fdp; 这种仅压制编译器警告的用法
@@ -87,7 +71,7 @@ def check_unfuzzable_api(content):
         # - fdp.ConsumeRemainingBytes()
 
         # 查找所有 fdp.Consume 调用
-        consume_calls = re.findall(r"fdp\.(Consume\w+)(?:<[^>]+>)?\s*\(", body)
+        consume_calls = [call.method for call in model.consume_calls_in(func)]
 
         # 检查是否有选择器模式（如 tarPos = fdp.ConsumeIntegral<uint8_t>() % TARGET_SIZE）
         has_selector = bool(
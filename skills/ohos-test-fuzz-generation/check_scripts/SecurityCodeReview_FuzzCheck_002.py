@@ -8,118 +8,44 @@ import re
 import os
 from pathlib import Path
 
-
-def _resolve_header_path(header_str, search_dirs):
-    path = header_str.strip().strip('"').strip("'")
-    if os.path.isabs(path) and os.path.isfile(path):
-        return path
-    for base in search_dirs:
-        candidate = Path(base) / path
-        if candidate.is_file():
-            return str(candidate)
-        parts = Path(path).parts
-        for i in range(len(parts)):
-            candidate2 = Path(base) / Path(*parts[i:])
-            if candidate2.is_file():
-                return str(candidate2)
-    return None
+from fuzzer_model import parse_fuzzer
+from header_index import public_methods, resolve_header_path
 
 
 def parse_header_methods(header_path, target_class):
+    """目标类所有 public 段中的有参方法（头文件解析走共享索引，每个头文件只解析一次）"""
     if not header_path or not os.path.isfile(header_path):
         return []
-    content = Path(header_path).read_text(encoding="utf-8", errors="ignore")
-    content = re.sub(r"//[^\n]*", "", content)
-    content = re.sub(r"/\*.*?\*/", "", content, flags=re.DOTALL)
-
-    class_pattern = rf"\bclass\s+{re.escape(target_class)}\b.*?\{{"
-    m = re.search(class_pattern, content)
-    if not m:
-        return []
+    return [
+        (name, params, ret)
+        for name, params, ret, _ in public_methods(
+            header_path, target_class, checker=True
+        )
+        if params != "" and params.lower() != "void"
+    ]
 
-    start = m.end() - 1
-    brace_count = 0
-    end = start
-    for i in range(start, len(content)):
-        if content[i] == "{":
-            brace_count += 1
-        elif content[i] == "}":
-            brace_count -= 1
-            if brace_count == 0:
-                end = i
-                break
-
-    class_body = content[start : end + 1]
-
-    # 提取所有 public: 段（类可能有多个 public: 段）
-    pub_bodies = []
-    pos = 0
-    while pos < len(class_body):
-        pub_match = re.search(r"\bpublic\s*:", class_body[pos:])
-        if not pub_match:
-            break
-        pub_start = pos + pub_match.end()
-        next_access = re.search(r"\b(protected|private)\s*:", class_body[pub_start:])
-        if next_access:
-            pub_bodies.append(class_body[pub_start : pub_start + next_access.start()])
-            pos = pub_start + next_access.end()
-        else:
-            pub_bodies.append(class_body[pub_start:])
-            break
-
-    if not pub_bodies:
-        return []
 
-    methods = []
-    pattern = re.compile(
-        r"(?:virtual|static|explicit|constexpr|inline|consteval|constinit|\[\[.*?\]\]|\s)*"
-        r"(?P<ret>[~\w_][\w\s_:<>*,&.]*?)\s+"
-        r"(?P<name>\w+)\s*\(\s*(?P<params>[^)]*)\s*\)\s*"
-        r"(?:const\s*)?(?:override\s*)?(?:final\s*)?(?:noexcept\s*)?(?:=\s*0\s*)?;"
-    )
-    for pub_body in pub_bodies:
-        for match in pattern.finditer(pub_body):
-            name = match.group("name")
-            ret = match.group("ret").strip()
-            params = match.group("params").strip()
-            if (
-                name == target_class
-                or name.startswith("~")
-                or ret
-                in (
-                    "typedef",
-                    "using",
-                    "friend",
-                )
-            ):
-                continue
-            if not re.match(r"^[A-Za-z_]\w*$", name):
-                continue
-            if params == "" or params.lower() == "void":
-                continue
-            methods.append((name, params, ret))
-
-    seen = set()
-    unique = []
-    for name, params, ret in methods:
-        key = (name, params)
-        if key not in seen:
-            seen.add(key)
-            unique.append((name, params, ret))
-    return unique
+def header_search_dirs(filepath):
+    """被测头文件的搜索目录：fuzzer 所在目录、工作目录及其上两级、本技能所在仓库目录"""
+    return [
+        Path(filepath).parent,
+        Path.cwd(),
+        Path.cwd().parent,
+        Path.cwd().parent.parent,
+        Path(__file__).parent.parent.parent,
+        Path(__file__).parent.parent.parent.parent,
+    ]
 
 
-def check_missing_api_coverage(filepath, content, all_project_files=None):
+def find_target_headers(filepath, content):
     """
-    规则002: 检查目标类中所有有参public API是否都被FUZZ测试覆盖
+    推断被测目标类并解析其头文件路径
 
-    参数:
-        filepath: 当前检查的文件路径
-        content: 当前文件内容
-        all_project_files: 可选，项目中所有fuzzer文件的内容字典 {filepath: content}
-                            如果提供，会合并所有文件的覆盖率进行检查
+    返回: (target_class, header_candidates, resolved_headers)
+        target_class 为 None 表示无法推断目标类；
+        header_candidates 为 .cpp 中除自身 fuzzer 头文件外的 #include；
+        resolved_headers 为能在搜索目录中找到的头文件路径（与候选一一对应，找不到的跳过）
     """
-    errors = []
     class_match = (
         re.search(r"std::make_shared<(\w+)>", content)
         or re.search(r"std::shared_ptr<(\w+)>", content)
@@ -129,31 +55,45 @@ def check_missing_api_coverage(filepath, content, all_project_files=None):
         or re.search(r"(\w+)\*\s+g_\w+\s*=\s*nullptr", content)
     )
     if not class_match:
-        return errors
+        return None, [], []
     target_class = class_match.group(1)
 
     includes = re.findall(r'#include\s+"([^"]+\.h)"', content)
     fuzzer_h = os.path.basename(filepath).replace(".cpp", ".h")
     header_candidates = [inc for inc in includes if os.path.basename(inc) != fuzzer_h]
     if not header_candidates:
-        return errors
+        return target_class, [], []
 
-    search_dirs = [
-        Path(filepath).parent,
-        Path.cwd(),
-        Path.cwd().parent,
-        Path.cwd().parent.parent,
-        Path(__file__).parent.parent.parent,
-        Path(__file__).parent.parent.parent.parent,
-    ]
-
-    all_header_methods = []
-    header_found = False
+    search_dirs = header_search_dirs(filepath)
+    resolved_headers = []
     for hc in header_candidates:
-        resolved = _resolve_header_path(hc, search_dirs)
+        resolved = resolve_header_path(hc, search_dirs)
         if resolved and os.path.isfile(resolved):
-            header_found = True
-            all_header_methods.extend(parse_header_methods(resolved, target_class))
+            resolved_headers.append(resolved)
+    return target_class, header_candidates, resolved_headers
+
+
+def check_missing_api_coverage(filepath, content, all_project_files=None):
+    """
+    规则002: 检查目标类中所有有参public API是否都被FUZZ测试覆盖
+
+    参数:
+        filepath: 当前检查的文件路径
+        content: 当前文件内容
+        all_project_files: 可选，项目中所有fuzzer文件的内容字典 {filepath: content}
+                            如果提供，会合并所有文件的覆盖率进行检查
+    """
+    errors = []
+    target_class, header_candidates, resolved_headers = find_target_headers(
+        filepath, content
+    )
+    if not target_class or not header_candidates:
+        return errors
+
+    header_found = bool(resolved_headers)
+    all_header_methods = []
+    for resolved in resolved_headers:
+        all_header_methods.extend(parse_header_methods(resolved, target_class))
 
     # 收集所有被fuzz测试覆盖的API方法名
     covered = set()
@@ -168,10 +108,10 @@ def check_missing_api_coverage(filepath, content, all_project_files=None):
         if Path(file_path).parent != Path(filepath).parent and not all_project_files:
             continue
 
+        model = parse_fuzzer(file_content)
+
         # 模式1: DoXXX 函数名推断 (DoSetConfig -> SetConfig)
-        do_funcs = set(
-            re.findall(r"\bvoid\s+(\w+)\s*\(\s*FuzzedDataProvider", file_content)
-        )
+        do_funcs = set(model.fuzz_func_names)
         for do_name in do_funcs:
             if do_name.startswith("Do") and len(do_name) > 2:
                 covered.add(do_name[2:])
@@ -179,7 +119,7 @@ def check_missing_api_coverage(filepath, content, all_project_files=None):
                 covered.add(do_name)
 
         # 模式2: 从函数体内提取 g_instance->Method(...) 和 Class::Method(...) 调用
-        arrow_calls = re.findall(r"(?:g_\w+|\w+)\s*->\s*(\w+)\s*\(", file_content)
+        arrow_calls = [call.method for call in model.arrow_calls]
         static_calls = re.findall(
             rf"{re.escape(target_class)}::(\w+)\s*\(", file_content
         )
@@ -200,9 +140,9 @@ def check_missing_api_coverage(filepath, content, all_project_files=None):
     if not header_found:
         if len(covered) <= 1:
             # 获取当前文件的方法调用
-            current_arrow_calls = re.findall(
-                r"(?:g_\w+|\w+)\s*->\s*(\w+)\s*\(", content
-            )
+            current_arrow_calls = [
+                call.method for call in parse_fuzzer(content).arrow_calls
+            ]
             current_static_calls = re.findall(
                 rf"{re.escape(target_class)}::(\w+)\s*\(", content
             )
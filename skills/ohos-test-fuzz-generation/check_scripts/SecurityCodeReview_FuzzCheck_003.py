@@ -7,20 +7,7 @@
 import re
 import os
 
-
-def _extract_fuzzer_func_body(content, func_name, start_pos):
-    """从函数名后的 '{' 开始提取完整函数体"""
-    brace_count = 0
-    end = start_pos
-    for i in range(start_pos, len(content)):
-        if content[i] == "{":
-            brace_count += 1
-        elif content[i] == "}":
-            brace_count -= 1
-            if brace_count == 0:
-                end = i
-                break
-    return content[start_pos + 1 : end]
+from fuzzer_model import parse_fuzzer
 
 
 def check_fuzzed_data_usage(content):
@@ -29,10 +16,11 @@ def check_fuzzed_data_usage(content):
     检查所有接收 FuzzedDataProvider 的函数中是否使用 fdp.ConsumeXxx 提取数据
     """
     errors = []
+    model = parse_fuzzer(content)
 
     # 1. 检查文件级别是否有 fdp.Consume
-    has_fdp_consume = re.search(r"fdp\.Consume", content)
-    has_llvm = re.search(r"LLVMFuzzerTestOneInput", content)
+    has_fdp_consume = "fdp.Consume" in content
+    has_llvm = "LLVMFuzzerTestOneInput" in content
 
     if not has_fdp_consume and has_llvm:
         errors.append(
@@ -42,13 +30,9 @@ def check_fuzzed_data_usage(content):
         return errors
 
     # 2. 检查所有接收 FuzzedDataProvider 参数的函数是否使用了 fdp.Consume
-    fdp_func_pattern = re.compile(
-        r"\bvoid\s+(\w+)\s*\(\s*FuzzedDataProvider\s*&\s*\w+\s*\)\s*\{"
-    )
-    for func_match in fdp_func_pattern.finditer(content):
-        func_name = func_match.group(1)
-        start = func_match.end() - 1
-        body = _extract_fuzzer_func_body(content, func_name, start)
+    for func in model.fuzz_functions:
+        func_name = func.name
+        body = func.body
 
         if not re.search(r"fdp\.", body):
             # 检查是否有智能指针构造（sptr 或 std::shared_ptr 的 new/make_shared）
@@ -67,13 +51,8 @@ def check_fuzzed_data_usage(content):
             )
 
     # 3. 检查 LLVMFuzzerTestOneInput 函数内部是否使用了 fdp.Consume
-    llvm_match = re.search(
-        r"extern\s+\"C\"\s+int\s+LLVMFuzzerTestOneInput\s*\([^)]*\)\s*\{",
-        content,
-    )
-    if llvm_match:
-        start = llvm_match.end() - 1
-        body = _extract_fuzzer_func_body(content, "LLVMFuzzerTestOneInput", start)
+    if model.entry:
+        body = model.entry.body
 
         if not re.search(r"fdp\.Consume", body):
             if re.search(r"FuzzedDataProvider\s+\w+", body):
@@ -83,13 +62,9 @@ def check_fuzzed_data_usage(content):
 
     # 4. 检查API调用参数中是否存在固定值（字面量数字、字符串、bool）
     #    即：有fdp使用，但调用API时部分参数仍用固定值
-    all_func_pattern = re.compile(
-        r"\b(?:void|extern\s+\"C\"\s+int)\s+(\w+)\s*\([^)]*\)\s*\{"
-    )
-    for m in all_func_pattern.finditer(content):
-        func_name = m.group(1)
-        start = m.end() - 1
-        body = _extract_fuzzer_func_body(content, func_name, start)
+    for func in model.functions:
+        func_name = func.name
+        body = func.body
         if not re.search(r"fdp\.Consume", body):
             continue
 
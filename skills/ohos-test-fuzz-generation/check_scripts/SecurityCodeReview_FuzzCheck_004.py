@@ -7,20 +7,7 @@
 import re
 import os
 
-
-def _extract_fuzzer_func_body(content, func_name, start_pos):
-    """从函数名后的 '{' 开始提取完整函数体"""
-    brace_count = 0
-    end = start_pos
-    for i in range(start_pos, len(content)):
-        if content[i] == "{":
-            brace_count += 1
-        elif content[i] == "}":
-            brace_count -= 1
-            if brace_count == 0:
-                end = i
-                break
-    return content[start_pos + 1 : end]
+from fuzzer_model import parse_fuzzer
 
 
 def check_reused_data(content):
@@ -29,12 +16,9 @@ def check_reused_data(content):
     """
     errors = []
 
-    pattern = re.compile(r"\b(?:void|extern\s+\"C\"\s+int)\s+(\w+)\s*\([^)]*\)\s*\{")
-
-    for m in pattern.finditer(content):
-        func_name = m.group(1)
-        start = m.end() - 1
-        body = _extract_fuzzer_func_body(content, func_name, start)
+    for func in parse_fuzzer(content).functions:
+        func_name = func.name
+        body = func.body
 
         if not re.search(r"fdp\.", body):
             continue
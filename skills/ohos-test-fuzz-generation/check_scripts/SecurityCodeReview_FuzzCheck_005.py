@@ -7,6 +7,8 @@
 import re
 import os
 
+from fuzzer_model import parse_fuzzer
+
 
 def _get_target_class(content):
     """从代码中推断被测试的目标类名"""
@@ -19,22 +21,6 @@ def _get_target_class(content):
     return m.group(1) if m else None
 
 
-def _extract_fuzzer_func_body(content, func_name, start_pos):
-    """提取函数体（匹配大括号）"""
-    brace_count = 0
-    body_start = -1
-    for i in range(start_pos, len(content)):
-        if content[i] == "{":
-            brace_count += 1
-            if brace_count == 1:
-                body_start = i + 1
-        elif content[i] == "}":
-            brace_count -= 1
-            if brace_count == 0:
-                return content[body_start:i]
-    return ""
-
-
 def check_complex_params(content):
     """
     规则005: 检查复杂参数是否合理构造
@@ -133,14 +119,11 @@ def check_complex_params(content):
 
     # 4. 检查结构体/类默认构造（无字段填充）
     # 按函数逐个检查，排除输出参数
-    func_pattern = re.compile(
-        r"\bvoid\s+(\w+)\s*\(\s*FuzzedDataProvider\s*&\s*\w+\s*\)\s*\{"
-    )
+    fuzz_functions = parse_fuzzer(content).fuzz_functions
 
-    for func_match in func_pattern.finditer(content):
-        func_name = func_match.group(1)
-        start = func_match.end() - 1
-        body = _extract_fuzzer_func_body(content, func_name, start)
+    for func in fuzz_functions:
+        func_name = func.name
+        body = func.body
 
         # 查找函数体内的结构体/类声明
         # 匹配模式: TypeName varName; （大驼峰命名）
@@ -203,10 +186,9 @@ def check_complex_params(content):
 
     # 5. 检查空容器构造（排除通过赋值初始化的容器、作为API参数的容器和输出参数）
     # 按函数逐个检查
-    for func_match in func_pattern.finditer(content):
-        func_name = func_match.group(1)
-        start = func_match.end() - 1
-        body = _extract_fuzzer_func_body(content, func_name, start)
+    for func in fuzz_functions:
+        func_name = func.name
+        body = func.body
 
         # 查找函数体内的容器声明
         empty_containers = re.findall(
@@ -7,6 +7,8 @@
 import re
 import os
 
+from fuzzer_model import parse_fuzzer
+
 
 def check_target_size(content):
     """
@@ -32,9 +34,7 @@ def check_target_size(content):
 
     # 2. 检查串行调用的测试函数数量（接收FuzzedDataProvider参数的函数调用）
     serial_calls = re.findall(r"\b(\w+)\s*\(\s*\w+\s*\)", content)
-    fdp_func_names = set(
-        re.findall(r"\bvoid\s+(\w+)\s*\(\s*FuzzedDataProvider", content)
-    )
+    fdp_func_names = set(parse_fuzzer(content).fuzz_func_names)
     test_calls = [c for c in serial_calls if c in fdp_func_names]
     unique_test_calls = list(dict.fromkeys(test_calls))
     if len(unique_test_calls) > 10:
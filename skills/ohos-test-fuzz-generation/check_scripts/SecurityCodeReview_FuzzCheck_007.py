@@ -7,6 +7,8 @@
 import re
 import os
 
+from fuzzer_model import parse_fuzzer
+
 
 def check_ipc_pattern(content):
     """
@@ -14,6 +16,8 @@ def check_ipc_pattern(content):
     跨进程调用无法被fuzz引擎监控，应改为直接调用stub的OnRemoteRequest
     """
     errors = []
+    # 注释中的示例代码不参与匹配，统一使用模型中去除注释后的源码
+    content = parse_fuzzer(content).code
 
     # 已经通过 OnRemoteRequest 测试，不需要报错
     if "OnRemoteRequest" in content:
@@ -7,6 +7,8 @@
 import re
 import os
 
+from fuzzer_model import parse_fuzzer
+
 
 def check_buffer_overflow(content):
     """
@@ -17,6 +19,8 @@ def check_buffer_overflow(content):
     - 构造合理性问题：未初始化指针、未释放资源
     """
     errors = []
+    # 注释中的示例代码不参与匹配，统一使用模型中去除注释后的源码
+    content = parse_fuzzer(content).code
     # 1) 检测是否使用 data/size 进行 memcpy/memset 等可能堆溢出的操作
     dangerous_funcs = ["memcpy", "memset", "memmove", "strcpy", "strncpy"]
     for func in dangerous_funcs:
@@ -7,21 +7,7 @@
 import re
 import os
 
-
-def _extract_func_body(content, start_pos):
-    """提取函数体"""
-    brace_count = 0
-    body_start = -1
-    for i in range(start_pos, len(content)):
-        if content[i] == "{":
-            brace_count += 1
-            if brace_count == 1:
-                body_start = i + 1
-        elif content[i] == "}":
-            brace_count -= 1
-            if brace_count == 0:
-                return content[body_start:i]
-    return ""
+from fuzzer_model import parse_fuzzer
 
 
 def check_size_as_fuzz_data(content):
@@ -36,17 +22,15 @@ def check_size_as_fuzz_data(content):
     """
     errors = []
 
-    if not re.search(r"LLVMFuzzerTestOneInput", content):
+    if "LLVMFuzzerTestOneInput" not in content:
         return errors
 
     # 检查LLVMFuzzerTestOneInput函数体
-    func_match = re.search(
-        r"extern\s+\"C\"\s+int\s+LLVMFuzzerTestOneInput\s*\([^)]*\)\s*\{", content
-    )
-    if not func_match:
+    entry = parse_fuzzer(content).entry
+    if not entry:
         return errors
 
-    func_body = _extract_func_body(content, func_match.end() - 1)
+    func_body = entry.body
 
     # 1. 检查将size直接传给被测API
     # 匹配: g_instance->Method(..., size, ...) 或 g_instance->Method(size)
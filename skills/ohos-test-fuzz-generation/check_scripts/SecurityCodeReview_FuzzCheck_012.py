@@ -7,6 +7,8 @@
 import re
 import os
 
+from fuzzer_model import parse_fuzzer
+
 
 def check_branch_coverage(content):
     """
@@ -21,28 +23,9 @@ def check_branch_coverage(content):
     # 1. 检测是否使用了固定值作为参数（排除小数值和输出参数初始化）
     # 匹配: Type var = value; ... API(var)
     # 排除: 输出参数初始化（如 uint32_t width = 0;）
-    func_pattern = re.compile(
-        r"\bvoid\s+(\w+)\s*\(\s*FuzzedDataProvider\s*&\s*\w+\s*\)\s*\{"
-    )
-
-    for func_match in func_pattern.finditer(content):
-        func_name = func_match.group(1)
-        start = func_match.end() - 1
-
-        # 提取函数体
-        brace_count = 0
-        body_start = -1
-        body = ""
-        for i in range(start, len(content)):
-            if content[i] == "{":
-                brace_count += 1
-                if brace_count == 1:
-                    body_start = i + 1
-            elif content[i] == "}":
-                brace_count -= 1
-                if brace_count == 0:
-                    body = content[body_start:i]
-                    break
+    for func in parse_fuzzer(content).fuzz_functions:
+        func_name = func.name
+        body = func.body
 
         if not body:
             continue
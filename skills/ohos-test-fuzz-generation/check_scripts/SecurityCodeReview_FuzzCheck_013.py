@@ -7,6 +7,8 @@
 import re
 import os
 
+from fuzzer_model import parse_fuzzer
+
 _NON_ENUM_TYPES = {
     "int8_t",
     "uint8_t",
@@ -58,14 +60,8 @@ def check_enum_range(content):
     核心原则: 使用 uint8_t 而非大整数类型，不要按业务上限取模
     """
     errors = []
-    lines = content.split("\n")
-    code_lines = []
-    for line in lines:
-        stripped = line.strip()
-        if stripped.startswith("//") or stripped.startswith("/*"):
-            continue
-        code_lines.append(line)
-    code_content = "\n".join(code_lines)
+    # 注释中的示例代码不参与匹配（含行尾注释与多行块注释）
+    code_content = parse_fuzzer(content).code
 
     enum_casts_64_direct = re.findall(
         r"static_cast\<(\w+)\>\s*\(\s*fdp\.ConsumeIntegral\<(uint64_t|int64_t)\>\s*\(",
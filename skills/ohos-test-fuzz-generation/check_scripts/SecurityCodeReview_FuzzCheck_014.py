@@ -7,21 +7,7 @@ fuzz测试应使用变异数据，除非业务必需（API版本号、Magic Numb
 import re
 import os
 
-
-def _extract_func_body(content, start_pos):
-    """提取函数体"""
-    brace_count = 0
-    body_start = -1
-    for i in range(start_pos, len(content)):
-        if content[i] == "{":
-            brace_count += 1
-            if brace_count == 1:
-                body_start = i + 1
-        elif content[i] == "}":
-            brace_count -= 1
-            if brace_count == 0:
-                return content[body_start:i]
-    return ""
+from fuzzer_model import parse_fuzzer
 
 
 def check_fixed_params(content):
@@ -76,13 +62,11 @@ def check_fixed_params(content):
     }
 
     # 找到所有DoXXX函数定义
-    func_pattern = re.compile(
-        r"\bvoid\s+(Do\w+)\s*\(\s*FuzzedDataProvider\s*&\s*\w+\s*\)\s*\{"
-    )
-
-    for func_match in func_pattern.finditer(content):
-        func_name = func_match.group(1)
-        func_body = _extract_func_body(content, func_match.end() - 1)
+    for func in parse_fuzzer(content).fuzz_functions:
+        if not func.name.startswith("Do"):
+            continue
+        func_name = func.name
+        func_body = func.body
 
         if not func_body:
             continue
@@ -7,6 +7,8 @@
 import re
 import os
 
+from fuzzer_model import parse_fuzzer
+
 
 def check_type_mismatch(content):
     """
@@ -18,6 +20,8 @@ def check_type_mismatch(content):
     - 指针与整数混用
     """
     errors = []
+    # 注释中的示例代码不参与匹配，统一使用模型中去除注释后的源码
+    content = parse_fuzzer(content).code
 
     # 1. 检查 data 强转为 char*
     if re.search(r"char\s*\*\s*\w+\s*=\s*\(\s*char\s*\*\s*\)\s*data", content):
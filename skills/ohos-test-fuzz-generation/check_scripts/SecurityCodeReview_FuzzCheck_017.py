@@ -7,6 +7,8 @@
 import re
 import os
 
+from fuzzer_model import parse_fuzzer
+
 
 def check_random_usage(content):
     """
@@ -14,6 +16,8 @@ def check_random_usage(content):
     这些函数不可重现且不受fuzz引擎控制
     """
     errors = []
+    # 注释中的示例代码不参与匹配，统一使用模型中去除注释后的源码
+    content = parse_fuzzer(content).code
 
     # 1. 检查C标准库随机函数
     c_random_funcs = [
@@ -7,6 +7,8 @@
 import re
 import os
 
+from fuzzer_model import parse_fuzzer
+
 
 def check_global_initialization(content):
     """
@@ -18,29 +20,17 @@ def check_global_initialization(content):
     3. 检查全局指针是否在 LLVMFuzzerInitialize 中被赋值为有效对象
     """
     errors = []
+    model = parse_fuzzer(content)
 
     # 1. 查找全局指针声明
-    global_ptr_pattern = re.compile(
-        r"^(\w+(?:\s*::\s*\w+)*)\s*\*\s*(g_\w+)\s*=\s*nullptr\s*;", re.MULTILINE
-    )
-
-    global_ptrs = []
-    for match in global_ptr_pattern.finditer(content):
-        ptr_type = match.group(1).strip()
-        ptr_name = match.group(2)
-        global_ptrs.append((ptr_type, ptr_name))
+    global_ptrs = model.global_ptrs
 
     if not global_ptrs:
         # 没有全局指针，无需检查
         return errors
 
     # 2. 检查是否存在 LLVMFuzzerInitialize 函数
-    init_match = re.search(
-        r'extern\s+"C"\s+int\s+LLVMFuzzerInitialize\s*\(\s*int\*\s*\w+\s*,\s*char\*\*\*\s*\w+\s*\)',
-        content,
-    )
-
-    if not init_match:
+    if not model.has_init:
         errors.append(
             "规则019[高危]: 发现全局指针但未找到 LLVMFuzzerInitialize 函数，"
             "全局指针可能未初始化，建议添加初始化函数"
@@ -48,28 +38,11 @@ def check_global_initialization(content):
         return errors
 
     # 3. 提取 LLVMFuzzerInitialize 函数体
-    init_start = init_match.end()
-    brace_count = 0
-    init_body_start = None
-    init_body_end = None
-
-    for i in range(init_start, len(content)):
-        if content[i] == "{":
-            if brace_count == 0:
-                init_body_start = i + 1
-            brace_count += 1
-        elif content[i] == "}":
-            brace_count -= 1
-            if brace_count == 0:
-                init_body_end = i
-                break
-
-    if init_body_start is None or init_body_end is None:
+    init_body = model.init_body
+    if init_body is None:
         errors.append("规则019[高危]: 无法解析 LLVMFuzzerInitialize 函数体")
         return errors
 
-    init_body = content[init_body_start:init_body_end]
-
     # 4. 检查每个全局指针是否在初始化函数中被赋值
     for ptr_type, ptr_name in global_ptrs:
         # 检查是否在初始化函数中被赋值为有效对象
@@ -8,23 +8,27 @@ import os
 import re
 
 
-def check_project_xml(filepath):
+def check_project_xml(filepath, content=None):
     """
     规则C: 检查project.xml格式
     - 必须以 <?xml 声明开头
     - 根元素必须是 <fuzz_config>
     - 必须包含 <fuzztest> 子元素
     - 必须包含 max_len, max_total_time, rss_limit_mb 配置项
+
+    参数:
+        content: 可选，已读取的文件内容（目录扫描时传入，避免重复读取）
     """
     errors = []
-    if not os.path.exists(filepath):
-        return errors
+    if content is None:
+        if not os.path.exists(filepath):
+            return errors
 
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
-    except (IOError, UnicodeDecodeError):
-        return [f"规则C: 无法读取 {filepath}"]
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                content = f.read()
+        except (IOError, UnicodeDecodeError):
+            return [f"规则C: 无法读取 {filepath}"]
 
     if not content.strip().startswith('<?xml version="1.0" encoding="utf-8"?>'):
         errors.append(
@@ -27,7 +27,7 @@ def check_fuzzer_name_format(name):
     return bool(re.match(r"^[A-Z][a-zA-Z0-9]*_fuzzer$", base_name))
 
 
-def check_directory_consistency(filepath):
+def check_directory_consistency(filepath, content=None):
     """
     规则D: 检查文件命名一致性
     - .cpp/.h 文件名应与目录名一致
@@ -35,6 +35,9 @@ def check_directory_consistency(filepath):
     - 头文件中FUZZ_PROJECT_NAME应与目录名一致
 
     注意: BUILD.gn中ohos_fuzztest目标名格式由规则G检查，不在本规则范围内
+
+    参数:
+        content: 可选，已读取的文件内容（目录扫描时传入，避免重复读取）
     """
     errors = []
     filename = os.path.basename(filepath)
@@ -58,7 +61,8 @@ def check_directory_consistency(filepath):
 
     # 检查头文件中的FUZZ_PROJECT_NAME
     if filename.endswith(".h"):
-        content = read_file(filepath) or ""
+        if content is None:
+            content = read_file(filepath) or ""
         fuzz_project_match = re.search(
             r'#define\s+FUZZ_PROJECT_NAME\s+"([^"]+)"', content
         )
@@ -1,23 +1,22 @@
 #!/usr/bin/env python3
 """
 FUZZ检查工具基础模块
-提供共享的辅助函数
+提供共享的辅助函数，函数体定位统一由 fuzzer_model 预解析模型完成
 """
 
-import re
+import os
+import sys
+
+# 与规则脚本、tools/ 使用同一种导入方式（目录加入 sys.path 后按模块名导入），
+# 保证 fuzzer_model 只有一份模块实例、一份解析缓存
+_check_scripts_dir = os.path.dirname(os.path.abspath(__file__))
+if _check_scripts_dir not in sys.path:
+    sys.path.insert(0, _check_scripts_dir)
+
+from fuzzer_model import parse_fuzzer
 
 
 def _extract_fuzzer_func_body(content, func_name, start_pos):
-    """提取函数体（匹配大括号）"""
-    brace_count = 0
-    body_start = -1
-    for i in range(start_pos, len(content)):
-        if content[i] == "{":
-            brace_count += 1
-            if brace_count == 1:
-                body_start = i + 1
-        elif content[i] == "}":
-            brace_count -= 1
-            if brace_count == 0:
-                return content[body_start:i]
-    return ""
+    """提取函数体（匹配大括号），start_pos 为函数体 '{' 之前或所在位置"""
+    body = parse_fuzzer(content).body_after(start_pos)
+    return body if body is not None else ""
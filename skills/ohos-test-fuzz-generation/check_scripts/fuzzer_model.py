@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+FUZZ源文件预解析模型
+每个 .cpp 只做一次预处理（大括号配对、函数定位、fdp.Consume 调用点、全局指针、API 调用、去注释源码），
+规则脚本与 tools/fuzz_check.py 通过 parse_fuzzer(content) 查询同一份模型，不再各自重复扫描原文
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# 接收 FuzzedDataProvider 的测试函数: void DoXxx(FuzzedDataProvider& fdp) {
+FUZZ_FUNC_PATTERN = re.compile(
+    r"\bvoid\s+(\w+)\s*\(\s*FuzzedDataProvider\s*&\s*\w+\s*\)\s*\{"
+)
+# 测试函数名（不要求完整签名，用于覆盖率/数量统计）
+FUZZ_FUNC_NAME_PATTERN = re.compile(r"\bvoid\s+(\w+)\s*\(\s*FuzzedDataProvider")
+# 所有 void / extern "C" int 函数定义
+FUNC_PATTERN = re.compile(r"\b(?:void|extern\s+\"C\"\s+int)\s+(\w+)\s*\([^)]*\)\s*\{")
+# fuzz 入口函数
+ENTRY_PATTERN = re.compile(
+    r"extern\s+\"C\"\s+int\s+(LLVMFuzzerTestOneInput)\s*\([^)]*\)\s*\{"
+)
+# fuzz 初始化函数（只匹配签名，函数体从其后第一个 '{' 开始）
+INIT_PATTERN = re.compile(
+    r'extern\s+"C"\s+int\s+LLVMFuzzerInitialize\s*\(\s*int\*\s*\w+\s*,\s*char\*\*\*\s*\w+\s*\)'
+)
+CONSUME_PATTERN = re.compile(r"fdp\.(Consume\w+)(?:<([^>]+)>)?\s*\(")
+GLOBAL_PTR_PATTERN = re.compile(
+    r"^(\w+(?:\s*::\s*\w+)*)\s*\*\s*(g_\w+)\s*=\s*nullptr\s*;", re.MULTILINE
+)
+ARROW_CALL_PATTERN = re.compile(r"(\w+)\s*->\s*(\w+)\s*\(")
+# 字符串字面量优先匹配，避免把 "http://..." 之类当作注释
+COMMENT_PATTERN = re.compile(r'("(?:\\.|[^"\\\n])*")|//[^\n]*|/\*.*?\*/', re.DOTALL)
+
+# name: 函数名, start: 定义起始位置, brace: 函数体 '{' 位置, body: 函数体文本（不含外层大括号）
+FuncSpan = namedtuple("FuncSpan", ["name", "start", "brace", "body"])
+ConsumeCall = namedtuple("ConsumeCall", ["method", "template", "pos"])
+ArrowCall = namedtuple("ArrowCall", ["obj", "method", "pos"])
+GlobalPtr = namedtuple("GlobalPtr", ["type", "name"])
+
+
+def _strip_comment(match):
+    if match.group(1):
+        return match.group(1)
+    return "\n" * match.group().count("\n")
+
+
+def _match_braces(content):
+    """一次遍历完成大括号配对，返回 {左括号位置: 匹配的右括号位置}"""
+    pairs = {}
+    stack = []
+    for m in re.finditer(r"[{}]", content):
+        if m.group() == "{":
+            stack.append(m.start())
+        elif stack:
+            pairs[stack.pop()] = m.start()
+    return pairs
+
+
+class FuzzerModel:
+    """单个fuzzer源文件的预解析结果，构造后只读，可被多条规则共享"""
+
+    def __init__(self, content):
+        self.content = content
+        self._pairs = _match_braces(content)
+        self._code = None
+
+        self.functions = self._find_functions(FUNC_PATTERN)
+        self.fuzz_functions = self._find_functions(FUZZ_FUNC_PATTERN)
+        entries = self._find_functions(ENTRY_PATTERN)
+        self.entry = entries[0] if entries else None
+
+        init_match = INIT_PATTERN.search(content)
+        self.has_init = init_match is not None
+        self.init_body = self.body_after(init_match.end()) if init_match else None
+
+        self.fuzz_func_names = FUZZ_FUNC_NAME_PATTERN.findall(content)
+        self.consume_calls = [
+            ConsumeCall(m.group(1), m.group(2), m.start())
+            for m in CONSUME_PATTERN.finditer(content)
+        ]
+        self.arrow_calls = [
+            ArrowCall(m.group(1), m.group(2), m.start())
+            for m in ARROW_CALL_PATTERN.finditer(content)
+        ]
+        self.global_ptrs = [
+            GlobalPtr(m.group(1).strip(), m.group(2))
+            for m in GLOBAL_PTR_PATTERN.finditer(content)
+        ]
+
+    def _find_functions(self, pattern):
+        spans = []
+        for m in pattern.finditer(self.content):
+            brace = m.end() - 1
+            spans.append(FuncSpan(m.group(1), m.start(), brace, self.body_at(brace)))
+        return spans
+
+    @property
+    def code(self):
+        """去除注释后的源码（首次访问时计算，块注释保留换行以维持行号）"""
+        if self._code is None:
+            self._code = COMMENT_PATTERN.sub(_strip_comment, self.content)
+        return self._code
+
+    def body_at(self, brace_pos):
+        """返回 brace_pos 处 '{' 对应的块内容，括号不匹配时返回空串"""
+        end = self._pairs.get(brace_pos)
+        if end is None:
+            return ""
+        return self.content[brace_pos + 1 : end]
+
+    def body_after(self, pos):
+        """返回 pos 之后第一个 '{' 开始的块内容，括号不匹配时返回 None"""
+        brace = self.content.find("{", pos)
+        if brace < 0 or brace not in self._pairs:
+            return None
+        return self.body_at(brace)
+
+    def consume_calls_in(self, span):
+        """返回位于指定函数体内的 fdp.Consume 调用点"""
+        end = span.brace + len(span.body) + 1
+        return [call for call in self.consume_calls if span.brace < call.pos < end]
+
+
+@lru_cache(maxsize=16)
+def parse_fuzzer(content):
+    """解析fuzzer源文件；同一份内容在一次检查中只解析一次，后续规则直接命中缓存"""
+    return FuzzerModel(content)
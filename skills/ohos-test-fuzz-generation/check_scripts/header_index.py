@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+头文件解析索引
+fuzz_generator、fuzz_check 规则002 与 header_parser 共用同一份索引：
+头文件按 (路径, mtime, size) 只读取、去注释一次，类级查询结果（public 方法、Stub 类名、
+RefBase 继承、IPC code 数量）按文件记忆化；FUZZ_INCLUDE_ROOTS 显式配置的 include 根目录
+一次遍历建立文件名→相对路径后缀索引并先于逐级探测查询，其他搜索目录（工作目录及其上级等）
+仍按后缀逐个探测；设置 FUZZ_HEADER_INDEX 后查询结果与后缀索引持久化到该 JSON 文件
+（环境变量说明见 ENV_HELP）
+"""
+
+import os
+import re
+import json
+import time
+import atexit
+import hashlib
+import inspect
+from pathlib import Path
+
+# 持久化索引文件（为空时仅在进程内记忆化）
+HEADER_INDEX_FILE = os.environ.get("FUZZ_HEADER_INDEX", "")
+# 持久化格式版本；实际索引版本为 格式版本 + 扫描正则/扫描函数哈希（见文件末尾 INDEX_VERSION）
+INDEX_FORMAT = 1
+# 持久化的后缀索引有效期（秒），过期后重新遍历目录；未命中时每个进程最多重新遍历一次
+INCLUDE_INDEX_TTL = int(os.environ.get("FUZZ_INCLUDE_INDEX_TTL", "3600"))
+# 建立后缀索引的文件类型，其他扩展名仍按后缀逐个探测
+HEADER_SUFFIXES = (".h", ".hh", ".hpp", ".hxx", ".inl", ".inc")
+
+# 方法声明：可选 virtual/static/explicit/constexpr/inline 修饰，返回类型，方法名，参数列表，可选后缀，分号
+# 例子: virtual void Foo(int a) const = 0;
+# 生成器版本：返回类型允许以 :: 开头（如 ::std::string）
+METHOD_PATTERN = re.compile(
+    r"(?:virtual|static|explicit|constexpr|inline|consteval|constinit|\[\[.*?\]\]|\s)*"
+    r"(?P<ret>[~\w_:][\w\s_:<>,*&.]*?)\s+"
+    r"(?P<name>\w+)\s*\(\s*(?P<params>[^)]*)\s*\)\s*"
+    r"(?:const\s*)?(?:override\s*)?(?:final\s*)?(?:noexcept\s*)?(?:=\s*0\s*)?;"
+)
+# 检查器（规则002、fuzz_check）版本：保持检查器原有的返回类型首字符 [~\w_]，检查结果不受生成器调整影响
+CHECKER_METHOD_PATTERN = re.compile(
+    r"(?:virtual|static|explicit|constexpr|inline|consteval|constinit|\[\[.*?\]\]|\s)*"
+    r"(?P<ret>[~\w_][\w\s_:<>*,&.]*?)\s+"
+    r"(?P<name>\w+)\s*\(\s*(?P<params>[^)]*)\s*\)\s*"
+    r"(?:const\s*)?(?:override\s*)?(?:final\s*)?(?:noexcept\s*)?(?:=\s*0\s*)?;"
+)
+IPC_INDICATORS = [
+    r"OnRemoteRequest",
+    r"MessageParcel",
+    r"IRemoteStub",
+    r"IRemoteBroker",
+    r"IRemoteProxy",
+    r"DECLARE_INTERFACE_DESCRIPTOR",
+]
+
+
+def strip_comments(content):
+    """移除单行和多行注释"""
+    content = re.sub(r"//[^\n]*", "", content)
+    return re.sub(r"/\*.*?\*/", "", content, flags=re.DOTALL)
+
+
+def _probe_suffixes(base, path, start=0):
+    """逐个尝试 base 下 path 的各级后缀（去掉可能的前缀，例如 foundation/graphic/...）"""
+    parts = Path(path).parts
+    for i in range(start, len(parts)):
+        candidate = Path(base) / Path(*parts[i:])
+        if candidate.is_file():
+            return str(candidate)
+    return None
+
+
+def _include_roots(value):
+    """解析 FUZZ_INCLUDE_ROOTS（os.pathsep 分隔）；/ 与 $HOME 范围过大，不建立索引"""
+    excluded = {os.path.abspath(os.sep), os.path.abspath(os.path.expanduser("~"))}
+    roots = []
+    for item in value.split(os.pathsep):
+        if not item.strip():
+            continue
+        root = os.path.abspath(os.path.expanduser(item.strip()))
+        if root in excluded:
+            print(f"[WARN] 忽略 include 根目录 {root}：不对 / 或 $HOME 建立后缀索引")
+        elif root not in roots:
+            roots.append(root)
+    return roots
+
+
+# 建立后缀索引的 include 根目录（如 OpenHarmony 源码根目录）
+INCLUDE_ROOTS = _include_roots(os.environ.get("FUZZ_INCLUDE_ROOTS", ""))
+
+# 供 fuzz_generator / fuzz_check 的 --help 展示的环境变量说明
+ENV_HELP = """
+头文件解析环境变量:
+  FUZZ_INCLUDE_ROOTS      include 根目录（如 OpenHarmony 源码根目录，多个用 : 分隔，Windows 用 ;），
+                          一次遍历建立文件名后缀索引，先于逐级探测查询；不可为 / 或 $HOME；
+                          未设置时只在搜索目录（fuzzer 目录、工作目录及其上级）逐级探测
+  FUZZ_HEADER_INDEX       持久化头文件索引的 JSON 文件（解析结果与后缀索引跨进程复用）
+  FUZZ_INCLUDE_INDEX_TTL  持久化后缀索引的有效期，单位秒（默认 3600）
+"""
+
+# 进程内只记忆化解析成功的查询（命中的文件已删除时重新解析）；
+# 未找到的查询每次重新解析，运行期间新增的头文件随即可见
+_RESOLVED = {}
+_RESOLVED_MAX = 4096
+
+
+def _resolve(path, search_dirs):
+    """
+    解析顺序：搜索目录下的完整路径 → include 根目录（完整路径、后缀索引）→ 搜索目录逐级后缀探测
+    """
+    if os.path.isabs(path) and os.path.isfile(path):
+        return path
+    for base in search_dirs:
+        candidate = Path(base) / path
+        if candidate.is_file():
+            return str(candidate)
+    parts = Path(path).parts
+    indexed = path.endswith(HEADER_SUFFIXES) and not ("." in parts or ".." in parts)
+    for root in INCLUDE_ROOTS:
+        candidate = Path(root) / path
+        if candidate.is_file():
+            return str(candidate)
+        if indexed:
+            found = get_index().find_suffix(root, parts)
+        else:
+            found = _probe_suffixes(root, path)
+        if found:
+            return found
+    for base in search_dirs:
+        if base in INCLUDE_ROOTS:
+            continue
+        found = _probe_suffixes(base, path, start=1)
+        if found:
+            return found
+    return None
+
+
+def clear_resolve_cache():
+    """清空进程内的解析记忆（基准测试冷启动用）"""
+    _RESOLVED.clear()
+
+
+def resolve_header_path(header_str, search_dirs, fresh=False):
+    """
+    header_str 可能是带引号的路径，如 "rosen/xxx.h"
+    在 search_dirs 及 INCLUDE_ROOTS 中查找实际文件，找不到返回 None（同一进程内解析成功的查询只解析一次）；
+    fresh 为 True 时不使用进程内记忆，用于校验历史结果
+    """
+    path = header_str.strip().strip('"').strip("'")
+    search_dirs = tuple(str(d) for d in search_dirs)
+    key = (path, search_dirs)
+    if not fresh:
+        cached = _RESOLVED.get(key)
+        if cached and os.path.isfile(cached):
+            return cached
+    found = _resolve(path, search_dirs)
+    if found:
+        if len(_RESOLVED) >= _RESOLVED_MAX:
+            _RESOLVED.clear()
+        _RESOLVED[key] = found
+    return found
+
+
+class HeaderIndex:
+    """头文件解析索引：{绝对路径: {"stamp": [mtime_ns, size], "queries": {查询名: 结果}}}"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.include_dirs = {}
+        self._fresh_dirs = set()
+        self._sources = {}
+        self._dirty = False
+        if path:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == INDEX_VERSION:
+            self.entries = data.get("headers", {})
+            self.include_dirs = data.get("include_dirs", {})
+
+    def save(self):
+        """原子写回索引文件（未配置持久化或无新增查询时跳过）"""
+        if not self.path or not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "version": INDEX_VERSION,
+                        "headers": self.entries,
+                        "include_dirs": self.include_dirs,
+                    },
+                    f,
+                    ensure_ascii=False,
+                )
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"[WARN] 头文件索引写入失败: {e}")
+
+    def _entry(self, header_path):
+        """返回 (绝对路径, 索引项)；文件已修改时丢弃旧查询结果，文件不存在返回 (路径, None)"""
+        key = os.path.abspath(header_path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            return key, None
+        stamp = [st.st_mtime_ns, st.st_size]
+        entry = self.entries.get(key)
+        if entry is None or entry.get("stamp") != stamp:
+            entry = {"stamp": stamp, "queries": {}}
+            self.entries[key] = entry
+            self._sources.pop(key, None)
+        return key, entry
+
+    def source(self, header_path):
+        """去注释后的头文件内容（每个文件版本只读取一次），文件不可读返回空串"""
+        key, entry = self._entry(header_path)
+        if entry is None:
+            return ""
+        cached = self._sources.get(key)
+        if cached is None or cached[0] != entry["stamp"]:
+            try:
+                content = Path(key).read_text(encoding="utf-8", errors="ignore")
+            except OSError:
+                content = ""
+            cached = (entry["stamp"], strip_comments(content))
+            self._sources[key] = cached
+        return cached[1]
+
+    def query(self, header_path, name, compute):
+        """
+        记忆化的头文件查询
+
+        参数:
+            name: 查询名（含类名等参数，如 "methods:Foo"）；本模块以外的解析器需在查询名中
+                  带上自身版本（如 source_digest(解析器类)），INDEX_VERSION 只覆盖本模块的扫描逻辑
+            compute: 无参函数，未命中时调用，结果须可 JSON 序列化
+        """
+        key, entry = self._entry(header_path)
+        if entry is None:
+            return compute()
+        queries = entry["queries"]
+        if name not in queries:
+            queries[name] = compute()
+            self._dirty = True
+        return queries[name]
+
+    def _build_include_dir(self, base):
+        """遍历一次 base，建立 {文件名: [相对路径]}（跳过 . 开头的目录，如 .git/.repo）"""
+        files = {}
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            rel_dir = os.path.relpath(dirpath, base)
+            for name in filenames:
+                if name.endswith(HEADER_SUFFIXES):
+                    rel = name if rel_dir == "." else Path(rel_dir, name).as_posix()
+                    files.setdefault(name, []).append(rel)
+        self.include_dirs[base] = {"built": time.time(), "files": files}
+        self._fresh_dirs.add(base)
+        self._dirty = True
+        return files
+
+    def include_files(self, base):
+        """base 目录的后缀索引：本进程首次使用时加载持久化结果，不存在或已过期则重新遍历"""
+        base = os.path.abspath(base)
+        entry = self.include_dirs.get(base)
+        if base in self._fresh_dirs:
+            return entry["files"]
+        if entry is not None and time.time() - entry.get("built", 0) < INCLUDE_INDEX_TTL:
+            return entry["files"]
+        return self._build_include_dir(base)
+
+    def find_suffix(self, base, parts):
+        """
+        在 base 下查找与 include 路径 parts 的最长后缀匹配的文件，等价于按后缀从长到短逐个 stat
+
+        使用的是持久化索引（本进程未遍历过）时，未命中或命中的文件已被删除，
+        都重新遍历 base 后再查一次，新增的头文件不必等到 TTL 过期
+        """
+        if not os.path.isdir(base):
+            return None
+        base = os.path.abspath(base)
+        for _ in range(2):
+            best = None
+            for rel in self.include_files(base).get(parts[-1], ()):
+                rel_parts = tuple(rel.split("/"))
+                n = len(rel_parts)
+                if n <= len(parts) and tuple(parts[-n:]) == rel_parts:
+                    if best is None or n > len(best):
+                        best = rel_parts
+            if best is not None:
+                candidate = Path(base, *best)
+                if candidate.is_file():
+                    return str(candidate)
+            if base in self._fresh_dirs:
+                return None
+            self._build_include_dir(base)
+        return None
+
+    def snapshot_include_dirs(self):
+        """遍历全部 INCLUDE_ROOTS（本进程已遍历过的跳过），返回可下发给子进程的后缀索引"""
+        for root in INCLUDE_ROOTS:
+            if root not in self._fresh_dirs and os.path.isdir(root):
+                self._build_include_dir(root)
+        return {root: self.include_dirs[root] for root in INCLUDE_ROOTS if root in self._fresh_dirs}
+
+    def adopt_include_dirs(self, snapshot):
+        """采用父进程建立的后缀索引，视为本进程已遍历，不再重复遍历"""
+        self.include_dirs.update(snapshot)
+        self._fresh_dirs.update(snapshot)
+
+
+_INDEX = None
+
+
+def get_index():
+    """进程内共享的头文件索引（配置了 FUZZ_HEADER_INDEX 时退出前自动写回）"""
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = HeaderIndex(HEADER_INDEX_FILE or None)
+        if _INDEX.path:
+            atexit.register(_INDEX.save)
+    return _INDEX
+
+
+def warm_include_index():
+    """进程池启动前在主进程建立 INCLUDE_ROOTS 的后缀索引，返回值作为 init_worker 的参数"""
+    return get_index().snapshot_include_dirs()
+
+
+def init_worker(snapshot):
+    """进程池 initializer：worker 直接使用主进程建立的后缀索引"""
+    get_index().adopt_include_dirs(snapshot)
+
+
+def _class_body(content, target_class):
+    """返回 class target_class {...} 的类体（含外层大括号），未找到返回 None"""
+    m = re.search(rf"\bclass\s+{re.escape(target_class)}\b.*?\{{", content)
+    if not m:
+        return None
+    start = m.end() - 1  # 指向 {
+    depth = 0
+    end = start
+    for i in range(start, len(content)):
+        if content[i] == "{":
+            depth += 1
+        elif content[i] == "}":
+            depth -= 1
+            if depth == 0:
+                end = i
+                break
+    return content[start : end + 1]
+
+
+def _public_sections(class_body):
+    """按出现顺序提取所有 public: 段（到下一个 protected/private 为止）"""
+    bodies = []
+    pos = 0
+    while pos < len(class_body):
+        pub_match = re.search(r"\bpublic\s*:", class_body[pos:])
+        if not pub_match:
+            break
+        pub_start = pos + pub_match.end()
+        next_access = re.search(r"\b(protected|private)\s*:", class_body[pub_start:])
+        if next_access:
+            bodies.append(class_body[pub_start : pub_start + next_access.start()])
+            pos = pub_start + next_access.end()
+        else:
+            bodies.append(class_body[pub_start:])
+            break
+    return bodies
+
+
+def _scan_public_methods(content, target_class, pattern=METHOD_PATTERN):
+    methods = []
+    seen = set()
+    body = _class_body(content, target_class)
+    if body is None:
+        return methods
+    for section_no, section in enumerate(_public_sections(body)):
+        for match in pattern.finditer(section):
+            name = match.group("name")
+            ret = match.group("ret").strip()
+            params = match.group("params").strip()
+            # 排除构造/析构函数、typedef/using/friend 及宏
+            if name == target_class or name.startswith("~"):
+                continue
+            if ret in ("typedef", "using", "friend"):
+                continue
+            if not re.match(r"^[A-Za-z_]\w*$", name):
+                continue
+            # 去重，保留第一次出现的
+            if (name, params) in seen:
+                continue
+            seen.add((name, params))
+            methods.append([name, params, ret, section_no])
+    return methods
+
+
+def public_methods(header_path, target_class, checker=False):
+    """
+    target_class 所有 public 段中声明的方法（含无参方法，按 (方法名, 参数) 去重）
+
+    checker 为 True 时使用检查器的方法声明正则（CHECKER_METHOD_PATTERN）
+    返回: [(method_name, params_str, return_type, section_no)]，section_no 为所在 public 段序号（0起始）
+    """
+    index = get_index()
+    pattern = CHECKER_METHOD_PATTERN if checker else METHOD_PATTERN
+    kind = "checker_methods" if checker else "methods"
+    methods = index.query(
+        header_path,
+        f"{kind}:{target_class}",
+        lambda: _scan_public_methods(index.source(header_path), target_class, pattern),
+    )
+    return [tuple(m) for m in methods]
+
+
+def _scan_refbase(content, target_class):
+    # 匹配 class XXX : public RefBase 或 class XXX : public XXX, public RefBase
+    refbase_pattern = (
+        rf"\bclass\s+{re.escape(target_class)}\b[^;]*?:\s*public\s+\w*RefBase\b"
+    )
+    if re.search(refbase_pattern, content):
+        return True
+    # 简化处理：检查 class 声明中是否有 RefBase
+    m = re.search(rf"\bclass\s+{re.escape(target_class)}\b[^;]*?\{{", content)
+    return bool(m and "RefBase" in m.group(0))
+
+
+def inherits_refbase(header_path, target_class):
+    """目标类声明中是否继承 RefBase"""
+    index = get_index()
+    return index.query(
+        header_path,
+        f"refbase:{target_class}",
+        lambda: _scan_refbase(index.source(header_path), target_class),
+    )
+
+
+def _scan_stub_class(content, target_class):
+    patterns = [
+        rf"\bclass\s+(\w*{re.escape(target_class)}\w*Stub)\b",
+        rf"\bclass\s+(RSI{re.escape(target_class)}\w*Stub)\b",
+        rf"\bclass\s+(\w*Stub)\b[^;]*?\b{re.escape(target_class)}\b",
+    ]
+    for pat in patterns:
+        m = re.search(pat, content)
+        if m:
+            return m.group(1)
+    for prefix in ["RSI", "RS"]:
+        candidate = f"{prefix}{target_class}Stub"
+        if re.search(rf"\bclass\s+{re.escape(candidate)}\b", content):
+            return candidate
+    return f"{target_class}Stub"
+
+
+def stub_class_name(header_path, target_class):
+    """头文件中 target_class 对应的 Stub 类名，找不到时返回 {target_class}Stub"""
+    index = get_index()
+    return index.query(
+        header_path,
+        f"stub:{target_class}",
+        lambda: _scan_stub_class(index.source(header_path), target_class),
+    )
+
+
+def _scan_ipc(content):
+    m = re.search(r"enum\s*\{([^}]+)\}\s*;", content, re.DOTALL)
+    code_count = 0
+    if m:
+        code_count = len(
+            [
+                item.strip()
+                for item in m.group(1).split(",")
+                if item.strip() and not item.strip().startswith("//")
+            ]
+        )
+    return {
+        "code_count": code_count,
+        "indicators": sum(
+            1 for indicator in IPC_INDICATORS if re.search(indicator, content)
+        ),
+        "remote_broker": bool(
+            re.search(r"class\s+\w+\s*:\s*public\s+IRemoteBroker", content)
+        ),
+    }
+
+
+def ipc_summary(header_path):
+    """
+    头文件的 IPC 特征
+
+    返回: {"code_count": 首个匿名 enum 的 code 数量, "indicators": 命中的 IPC 特征数,
+           "remote_broker": 是否有类直接继承 IRemoteBroker}
+    """
+    index = get_index()
+    return index.query(header_path, "ipc", lambda: _scan_ipc(index.source(header_path)))
+
+
+def source_digest(*objects):
+    """函数/类源码的短哈希，作为持久化查询结果的版本（调用方解析逻辑变化后旧结果不再命中）"""
+    digest = hashlib.sha1()
+    for obj in objects:
+        digest.update(inspect.getsource(obj).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def _scanner_version():
+    """格式版本 + 扫描正则与扫描函数源码的哈希：解析逻辑变化后持久化的查询结果自动失效"""
+    digest = hashlib.sha1()
+    for pattern in (METHOD_PATTERN, CHECKER_METHOD_PATTERN):
+        digest.update(pattern.pattern.encode("utf-8"))
+    digest.update("\n".join(IPC_INDICATORS).encode("utf-8"))
+    digest.update(
+        source_digest(
+            strip_comments,
+            _class_body,
+            _public_sections,
+            _scan_public_methods,
+            _scan_refbase,
+            _scan_stub_class,
+            _scan_ipc,
+        ).encode("utf-8")
+    )
+    return f"{INDEX_FORMAT}-{digest.hexdigest()[:12]}"
+
+
+INDEX_VERSION = _scanner_version()
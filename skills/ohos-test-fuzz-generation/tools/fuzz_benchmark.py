@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FUZZ工具链性能基准
+在确定性生成的合成头文件 / fuzzer 工程上，按 10/100/1000 个文件规模测量：
+  - 头文件解析（冷启动，共享头文件索引清空后）
+  - fuzzer 代码生成与语义化种子生成
+  - 26 条规则逐条耗时（fuzzer 预解析模型单独计时）
+  - 整目录检查（串行无缓存、结果缓存首轮、结果缓存命中）
+结果输出为 JSON，可用 --baseline 与历史结果对比，任一指标超过阈值即返回非零退出码
+
+用法:
+    python3 tools/fuzz_benchmark.py -o bench.json
+    python3 tools/fuzz_benchmark.py --scales 10,100 -o new.json --baseline bench.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import statistics
+from pathlib import Path
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
+
+import fuzz_check
+import fuzz_generator
+import header_index
+from fuzzer_model import parse_fuzzer
+
+# Windows兼容性：强制UTF-8编码
+if sys.platform == "win32":
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
+    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8")
+    os.environ["PYTHONIOENCODING"] = "utf-8"
+
+RESULT_VERSION = 1
+DEFAULT_SCALES = "10,100,1000"
+# 合成数据随机种子：相同规模每次生成完全相同的文件
+CORPUS_SEED = 20260101
+
+PARAM_TYPES = [
+    ("int32_t", "id"),
+    ("uint32_t", "width"),
+    ("uint64_t", "screenId"),
+    ("bool", "enable"),
+    ("float", "ratio"),
+    ("double", "scale"),
+    ("const std::string&", "name"),
+    ("int16_t", "offset"),
+    ("uint8_t", "level"),
+    ("ScreenId", "displayId"),
+]
+RETURN_TYPES = ["void", "bool", "int32_t", "uint32_t"]
+METHOD_VERBS = ["Set", "Update", "Apply", "Register", "Notify", "Query", "Load"]
+METHOD_NOUNS = ["Mode", "Config", "Power", "Buffer", "Layer", "Rotation", "Color"]
+
+
+def _synthetic_header(index, rng):
+    """生成一个带注释、枚举、private 段的合成服务类头文件，返回 (类名, 头文件内容)"""
+    class_name = f"Bench{index}Service"
+    guard = f"BENCH_{index}_SERVICE_H"
+    lines = [
+        "/*",
+        " * Copyright (c) 2026 Huawei Device Co., Ltd.",
+        " */",
+        f"#ifndef {guard}",
+        f"#define {guard}",
+        "",
+        "#include <cstdint>",
+        "#include <string>",
+        "",
+        "namespace OHOS {",
+        "namespace Rosen {",
+        "",
+        f"class {class_name} {{",
+        "public:",
+        f"    {class_name}() = default;",
+        f"    ~{class_name}() = default;",
+        "",
+    ]
+    used = set()
+    for _ in range(rng.randint(4, 10)):
+        name = rng.choice(METHOD_VERBS) + rng.choice(METHOD_NOUNS)
+        if name in used:
+            continue
+        used.add(name)
+        picked = rng.sample(PARAM_TYPES, rng.randint(1, 3))
+        params = ", ".join(
+            f"{ptype} {pname}{k}" for k, (ptype, pname) in enumerate(picked)
+        )
+        lines.append(f"    // {name} 的说明注释")
+        lines.append(f"    {rng.choice(RETURN_TYPES)} {name}({params});")
+    lines += [
+        "    int32_t GetState() const;",
+        "",
+        "private:",
+        "    void Reset(int32_t reason);",
+        "    int32_t state_ = 0;",
+        "};",
+        "",
+        "} // namespace Rosen",
+        "} // namespace OHOS",
+        f"#endif // {guard}",
+        "",
+    ]
+    return class_name, "\n".join(lines)
+
+
+def build_corpus(root, scale):
+    """
+    在 root 下生成 scale 个合成头文件（include/）及对应 fuzzer 工程（fuzzers/）
+
+    返回: [(类名, 头文件路径)]
+    """
+    rng = random.Random(CORPUS_SEED + scale)
+    include_dir = Path(root) / "include"
+    include_dir.mkdir(parents=True, exist_ok=True)
+    targets = []
+    for i in range(scale):
+        class_name, content = _synthetic_header(i, rng)
+        header = include_dir / f"bench_{i}_service.h"
+        header.write_text(content, encoding="utf-8")
+        targets.append((class_name, str(header)))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for class_name, header in targets:
+            _generate_fuzzer(root, class_name, header)
+    return targets
+
+
+def _generate_fuzzer(root, class_name, header):
+    """按生成器默认配置生成 fuzzer 工程文件（不含种子和 Verify）"""
+    name = f"{class_name}_fuzzer"
+    methods = fuzz_generator.parse_header_methods(header, class_name)
+    cpp, _ = fuzz_generator.generate_fuzzer_cpp(
+        name,
+        "Rosen",
+        class_name,
+        f'"{os.path.basename(header)}"',
+        methods,
+        fuzz_generator.INIT_MODE_NONE,
+        header_path=header,
+    )
+    fuzzer_dir = Path(root) / "fuzzers" / name
+    fuzzer_dir.mkdir(parents=True, exist_ok=True)
+    files = {
+        f"{name}.cpp": cpp,
+        f"{name}.h": fuzz_generator.generate_fuzzer_h(name),
+        "BUILD.gn": fuzz_generator.generate_build_gn(
+            name,
+            "graphic_2d/graphic_2d",
+            "foundation/graphic/graphic_2d/rosen/test/render_service/fuzztest",
+            "foundation/graphic/graphic_2d/rosen/modules/render_service_client/core",
+            "foundation/graphic/graphic_2d/rosen/modules/render_service_base/include",
+            "foundation/graphic/graphic_2d/rosen/modules/render_service_client",
+            "librender_service_client",
+        ),
+        "project.xml": fuzz_generator.generate_project_xml(),
+    }
+    for filename, content in files.items():
+        (fuzzer_dir / filename).write_text(content, encoding="utf-8")
+    return methods
+
+
+def _reset_caches():
+    """清空进程内记忆化，保证每轮都是冷启动"""
+    header_index._INDEX = None
+    header_index.clear_resolve_cache()
+    parse_fuzzer.cache_clear()
+
+
+def _measure(func, repeat):
+    """执行 repeat 轮，返回 {"median", "min", "runs"}（秒）"""
+    runs = []
+    for _ in range(repeat):
+        _reset_caches()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            runs.append(time.perf_counter() - start)
+    return {
+        "median": statistics.median(runs),
+        "min": min(runs),
+        "runs": [round(r, 6) for r in runs],
+    }
+
+
+def _rule_costs(fuzzers_dir, repeat):
+    """逐条规则计时：每条规则在所有适用文件上的总耗时（fuzzer 模型解析单独记为 model）"""
+    files = []
+    for target in fuzz_check._collect_check_targets(str(fuzzers_dir)):
+        content = fuzz_check.read_file(target)
+        if content is not None:
+            files.append((target, content))
+
+    totals = {}
+    for _ in range(repeat):
+        _reset_caches()
+        round_costs = {}
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for target, content in files:
+                if target.endswith(".cpp"):
+                    parse_fuzzer(content)
+            round_costs["model"] = time.perf_counter() - start
+            for target, content in files:
+                for rule_id, run in fuzz_check._file_rules(target, content):
+                    start = time.perf_counter()
+                    run()
+                    elapsed = time.perf_counter() - start
+                    round_costs[rule_id] = round_costs.get(rule_id, 0.0) + elapsed
+        for rule_id, cost in round_costs.items():
+            totals.setdefault(rule_id, []).append(cost)
+
+    return {
+        f"rule.{rule_id}": {
+            "median": statistics.median(runs),
+            "min": min(runs),
+            "runs": [round(r, 6) for r in runs],
+        }
+        for rule_id, runs in sorted(totals.items())
+    }
+
+
+def run_scale(scale, repeat, workdir):
+    """在指定规模下执行全部基准，返回 {"files": 文件数, "timings": {指标: 统计}}"""
+    root = Path(workdir) / f"scale_{scale}"
+    if root.exists():
+        shutil.rmtree(root)
+    targets = build_corpus(root, scale)
+    fuzzers_dir = root / "fuzzers"
+    include_dir = root / "include"
+    timings = {}
+
+    def parse_headers():
+        for class_name, header in targets:
+            fuzz_generator.parse_header_methods(header, class_name)
+
+    def generate_fuzzers():
+        out = root / "gen"
+        for class_name, header in targets:
+            _generate_fuzzer(out, class_name, header)
+
+    def generate_seeds():
+        out = root / "seeds"
+        for i, (class_name, header) in enumerate(targets):
+            methods = fuzz_generator.parse_header_methods(header, class_name)
+            fuzz_generator.generate_semantic_seeds(methods, out / str(i))
+
+    def check_serial():
+        fuzz_check.check_directory(str(fuzzers_dir), jobs=1)
+
+    cache_file = root / "result_cache.json"
+
+    def check_cache_cold():
+        if cache_file.exists():
+            cache_file.unlink()
+        cache = fuzz_check.ResultCache(str(cache_file))
+        fuzz_check.check_directory(str(fuzzers_dir), jobs=1, cache=cache)
+        cache.save()
+
+    def check_cache_warm():
+        cache = fuzz_check.ResultCache(str(cache_file))
+        fuzz_check.check_directory(str(fuzzers_dir), jobs=1, cache=cache)
+
+    # 规则002按 include 解析目标头文件，工作目录切到合成头文件目录
+    cwd = os.getcwd()
+    os.chdir(include_dir)
+    try:
+        timings["header_parse"] = _measure(parse_headers, repeat)
+        timings["fuzzer_generate"] = _measure(generate_fuzzers, repeat)
+        timings["seed_generate"] = _measure(generate_seeds, repeat)
+        timings.update(_rule_costs(fuzzers_dir, repeat))
+        timings["check_directory"] = _measure(check_serial, repeat)
+        timings["check_directory_cache_cold"] = _measure(check_cache_cold, repeat)
+        check_cache_cold()
+        timings["check_directory_cache_warm"] = _measure(check_cache_warm, repeat)
+    finally:
+        os.chdir(cwd)
+
+    file_count = len(fuzz_check._collect_check_targets(str(fuzzers_dir)))
+    return {"headers": scale, "files": file_count, "timings": timings}
+
+
+def compare(current, baseline, threshold, min_delta):
+    """
+    对比两次基准结果（按中位数），返回 (对比行, 回归列表)
+
+    回归判定: 当前/基线 > 1 + threshold 且绝对差值超过 min_delta 秒（过滤计时噪声）
+    """
+    rows = []
+    regressions = []
+    for scale, result in current["scales"].items():
+        base = baseline.get("scales", {}).get(scale)
+        if not base:
+            continue
+        for metric, stat in result["timings"].items():
+            old = base["timings"].get(metric)
+            if not old:
+                continue
+            new_t, old_t = stat["median"], old["median"]
+            ratio = new_t / old_t if old_t > 0 else float("inf")
+            regressed = ratio > 1 + threshold and new_t - old_t > min_delta
+            rows.append((scale, metric, old_t, new_t, ratio, regressed))
+            if regressed:
+                regressions.append(
+                    f"scale={scale} {metric}: {old_t:.4f}s → {new_t:.4f}s (x{ratio:.2f})"
+                )
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="FUZZ工具链性能基准（头文件解析 / 生成 / 种子 / 逐规则 / 整目录检查）",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例:
+  python3 fuzz_benchmark.py -o bench.json
+  python3 fuzz_benchmark.py --scales 10,100 --repeat 5 -o new.json --baseline bench.json
+        """,
+    )
+    parser.add_argument(
+        "--scales",
+        default=DEFAULT_SCALES,
+        help=f"合成数据规模（头文件/fuzzer 工程数），逗号分隔 (默认: {DEFAULT_SCALES})",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复轮数，取中位数 (默认: 3)")
+    parser.add_argument("-o", "--output", help="结果输出 JSON 文件（默认仅打印）")
+    parser.add_argument("--baseline", help="历史结果 JSON，用于对比并检测回归")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="回归阈值：中位数变慢超过该比例视为回归 (默认: 0.2)",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=0.005,
+        help="回归判定的最小绝对差值（秒），过滤计时噪声 (默认: 0.005)",
+    )
+    parser.add_argument("--workdir", help="合成数据目录（默认: 临时目录，结束后删除）")
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    workdir = args.workdir or tempfile.mkdtemp(prefix="fuzz_bench_")
+    # 结果缓存、头文件索引均使用基准自身的文件，不读写用户缓存，也不遍历用户配置的 include 根目录
+    os.environ.pop("FUZZ_HEADER_INDEX", None)
+    header_index.HEADER_INDEX_FILE = ""
+    header_index.INCLUDE_ROOTS = []
+
+    result = {
+        "version": RESULT_VERSION,
+        "tool_version": fuzz_check.TOOL_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "repeat": args.repeat,
+        "scales": {},
+    }
+    try:
+        for scale in scales:
+            print(f"[INFO] 规模 {scale}: 生成合成数据并计时...")
+            scale_result = run_scale(scale, args.repeat, workdir)
+            result["scales"][str(scale)] = scale_result
+            print(f"  文件数: {scale_result['files']}")
+            for metric, stat in scale_result["timings"].items():
+                print(f"  {metric:32s} {stat['median'] * 1000:10.2f} ms")
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n结果已保存: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows, regressions = compare(result, baseline, args.threshold, args.min_delta)
+        print("\n与基线对比（中位数）:")
+        for scale, metric, old_t, new_t, ratio, regressed in rows:
+            mark = "  [REGRESSION]" if regressed else ""
+            print(
+                f"  {scale:>5s} {metric:32s} {old_t * 1000:10.2f} ms → "
+                f"{new_t * 1000:10.2f} ms  x{ratio:.2f}{mark}"
+            )
+        if regressions:
+            print(f"\n[FAIL] 发现 {len(regressions)} 项性能回归:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("\n[OK] 未发现性能回归")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,12 +16,17 @@ v2.1 - 优化Windows兼容性、减少误报、增强检测能力
 import re
 import sys
 import os
+import json
+import time
+import hashlib
 import argparse
 import platform
+from collections import namedtuple
+from functools import partial
 from pathlib import Path
 
-# Windows兼容性：强制UTF-8编码
-if sys.platform == "win32":
+# Windows兼容性：强制UTF-8编码（仅命令行运行时；被 fuzz_generator 等导入时不替换调用方的输出流）
+if sys.platform == "win32" and __name__ == "__main__":
     import io
 
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
@@ -33,9 +38,17 @@ check_scripts_dir = os.path.join(os.path.dirname(__file__), "..", "check_scripts
 if check_scripts_dir not in sys.path:
     sys.path.insert(0, check_scripts_dir)
 
+# 头文件解析索引（与 fuzz_generator、header_parser 共用）
+from header_index import ENV_HELP, init_worker, public_methods, resolve_header_path
+from header_index import warm_include_index
+
+# fuzzer 源文件预解析模型（与独立规则脚本共用同一份解析缓存）
+from fuzzer_model import parse_fuzzer
+
 try:
     from SecurityCodeReview_FuzzCheck_001 import check_unfuzzable_api as check_001
     from SecurityCodeReview_FuzzCheck_002 import check_missing_api_coverage as check_002
+    from SecurityCodeReview_FuzzCheck_002 import find_target_headers, header_search_dirs
     from SecurityCodeReview_FuzzCheck_003 import check_fuzzed_data_usage as check_003
     from SecurityCodeReview_FuzzCheck_004 import check_reused_data as check_004
     from SecurityCodeReview_FuzzCheck_005 import check_complex_params as check_005
@@ -71,9 +84,27 @@ except ImportError as e:
     print("[WARN] 将使用内联实现作为降级方案")
     USE_INDEPENDENT_SCRIPTS = False
 
+TOOL_VERSION = "2.2"
+
 DEFAULT_MODULE_PREFIX = "//foundation/[模块类别]/[模块名]"
 MODULE_PREFIX = os.environ.get("FUZZ_MODULE_PREFIX", DEFAULT_MODULE_PREFIX)
 
+# 检查结果缓存（--no-cache 关闭）
+DEFAULT_CACHE_FILE = os.path.join(
+    os.path.expanduser("~"), ".cache", "ohos_fuzz_check", "results.json"
+)
+CACHE_FILE = os.environ.get("FUZZ_CHECK_CACHE", DEFAULT_CACHE_FILE)
+CACHE_MAX_ENTRIES = int(os.environ.get("FUZZ_CHECK_CACHE_MAX_ENTRIES", "20000"))
+# 结果依赖文件内容以外状态（corpus/ 目录、文件创建时间）的规则，命中缓存时仍实时执行
+VOLATILE_RULES = {"008"}
+
+# 结构化诊断（供 check_file 等可导入接口返回）
+# rule: 规则编号（如 "002"、"F"）；severity: 高危/中危，文件格式规则为 None；
+# line: 诊断对象所在行（1起始）：函数级诊断为函数定义行，调用级诊断为调用行，无法确定时为 None；
+# message: 原始诊断文本
+Diagnostic = namedtuple("Diagnostic", ["file", "rule", "severity", "line", "message"])
+DIAGNOSTIC_PATTERN = re.compile(r"规则([0-9]{3}|[A-G])(?:\[([^\]]+)\])?")
+
 # 非枚举类型（typedef/alias，虽用大驼峰但不需要 uint8_t 限制）
 NON_ENUM_TYPES = {
     "ScreenId",
@@ -99,108 +130,26 @@ def read_file(filepath):
 
 
 def _resolve_header_path(header_str, search_dirs):
-    path = header_str.strip().strip('"').strip("'")
-    if os.path.isabs(path) and os.path.isfile(path):
-        return path
-    for base in search_dirs:
-        candidate = Path(base) / path
-        if candidate.is_file():
-            return str(candidate)
-        parts = Path(path).parts
-        for i in range(len(parts)):
-            candidate2 = Path(base) / Path(*parts[i:])
-            if candidate2.is_file():
-                return str(candidate2)
-    return None
+    return resolve_header_path(header_str, search_dirs)
 
 
 def parse_header_methods(header_path, target_class):
+    """目标类第一个 public 段中的有参方法（头文件解析走共享索引）"""
     if not header_path or not os.path.isfile(header_path):
         return []
-    content = Path(header_path).read_text(encoding="utf-8", errors="ignore")
-    content = re.sub(r"//[^\n]*", "", content)
-    content = re.sub(r"/\*.*?\*/", "", content, flags=re.DOTALL)
-
-    class_pattern = rf"\bclass\s+{re.escape(target_class)}\b.*?\{{"
-    m = re.search(class_pattern, content)
-    if not m:
-        return []
-
-    start = m.end() - 1
-    brace_count = 0
-    end = start
-    for i in range(start, len(content)):
-        if content[i] == "{":
-            brace_count += 1
-        elif content[i] == "}":
-            brace_count -= 1
-            if brace_count == 0:
-                end = i
-                break
-
-    class_body = content[start : end + 1]
-    pub_match = re.search(r"\bpublic\s*:", class_body)
-    if not pub_match:
-        return []
-
-    pub_start = pub_match.end()
-    next_access = re.search(r"\b(protected|private)\s*:", class_body[pub_start:])
-    if next_access:
-        pub_body = class_body[pub_start : pub_start + next_access.start()]
-    else:
-        pub_body = class_body[pub_start:]
-
-    methods = []
-    pattern = re.compile(
-        r"(?:virtual|static|explicit|constexpr|inline|consteval|constinit|\[\[.*?\]\]|\s)*"
-        r"(?P<ret>[~\w_][\w\s_:<>*,&.]*?)\s+"
-        r"(?P<name>\w+)\s*\(\s*(?P<params>[^)]*)\s*\)\s*"
-        r"(?:const\s*)?(?:override\s*)?(?:final\s*)?(?:noexcept\s*)?(?:=\s*0\s*)?;"
-    )
-    for match in pattern.finditer(pub_body):
-        name = match.group("name")
-        ret = match.group("ret").strip()
-        params = match.group("params").strip()
-        if (
-            name == target_class
-            or name.startswith("~")
-            or ret
-            in (
-                "typedef",
-                "using",
-                "friend",
-            )
-        ):
-            continue
-        if not re.match(r"^[A-Za-z_]\w*$", name):
-            continue
-        if params == "" or params.lower() == "void":
-            continue
-        methods.append((name, params, ret))
-
-    seen = set()
-    unique = []
-    for name, params, ret in methods:
-        key = (name, params)
-        if key not in seen:
-            seen.add(key)
-            unique.append((name, params, ret))
-    return unique
+    return [
+        (name, params, ret)
+        for name, params, ret, section_no in public_methods(
+            header_path, target_class, checker=True
+        )
+        if section_no == 0 and params != "" and params.lower() != "void"
+    ]
 
 
 def _extract_fuzzer_func_body(content, func_name, start_pos):
-    """从函数名后的 '{' 开始提取完整函数体"""
-    brace_count = 0
-    end = start_pos
-    for i in range(start_pos, len(content)):
-        if content[i] == "{":
-            brace_count += 1
-        elif content[i] == "}":
-            brace_count -= 1
-            if brace_count == 0:
-                end = i
-                break
-    return content[start_pos + 1 : end]
+    """从函数名后的 '{' 开始提取完整函数体（大括号配对由 fuzzer_model 一次性完成）"""
+    body = parse_fuzzer(content).body_after(start_pos)
+    return body if body is not None else ""
 
 
 def check_unfuzzable_api(content):
@@ -354,8 +303,69 @@ def check_missing_api_coverage(filepath, content):
     return errors
 
 
-def check_fuzz_file(filepath):
-    content = read_file(filepath)
+def _file_rules(filepath, content):
+    """
+    按报告顺序列出适用于该文件的独立规则脚本
+
+    返回: [(规则号, 无参检查函数)]，规则号用于结果缓存按规则拆分存储
+    """
+    basename = os.path.basename(filepath)
+    dirname = os.path.basename(os.path.dirname(filepath))
+    rules = []
+
+    # 文件格式规则 (A-G)
+    if basename.endswith((".cpp", ".h")):
+        rules.append(("F", partial(check_F, filepath, content)))  # 规则F: 版权头
+    if basename.endswith(".cpp"):
+        # 规则E: .cpp头文件完整性（仅.cpp文件）
+        rules.append(("E", partial(check_E, basename, content)))
+    if basename.endswith(".h"):
+        # 规则A: 头文件格式（仅.h文件）
+        rules.append(("A", partial(check_A, basename, dirname, content)))
+    if basename == "BUILD.gn":
+        rules.append(("B", partial(check_B, content)))  # 规则B: BUILD.gn规范
+        rules.append(("G", partial(check_G, filepath, content)))  # 规则G: 目标命名
+    if basename == "project.xml":
+        rules.append(("C", partial(check_C, filepath, content)))  # 规则C: project.xml规范
+    rules.append(("D", partial(check_D, filepath, content)))  # 规则D: 目录/文件一致性
+
+    # 代码安全规则 (001-019)
+    if basename.endswith(".cpp"):
+        rules.extend(
+            [
+                ("001", partial(check_001, content)),  # 规则001: FUZZ适用性
+                ("002", partial(check_002, filepath, content, [])),  # 规则002: API覆盖
+                ("003", partial(check_003, content)),  # 规则003: 变异数据使用
+                ("004", partial(check_004, content)),  # 规则004: 变异数据复用
+                ("005", partial(check_005, content)),  # 规则005: 复杂参数构造
+                ("006", partial(check_006, content)),  # 规则006: 接口数量
+                ("007", partial(check_007, content)),  # 规则007: IPC接口
+                ("008", partial(check_008, filepath, content)),  # 规则008: 复杂函数
+                ("009", partial(check_009, content)),  # 规则009: Driver安全性
+                ("010", partial(check_010, content)),  # 规则010: size误用
+                ("011", partial(check_011, content)),  # 规则011: 安全准入
+                ("012", partial(check_012, content)),  # 规则012: 分支覆盖
+                ("013", partial(check_013, content)),  # 规则013: 枚举值构造
+                ("014", partial(check_014, content)),  # 规则014: 固定参数
+                ("015", partial(check_015, content)),  # 规则015: 中间产物
+                ("016", partial(check_016, content)),  # 规则016: 类型匹配
+                ("017", partial(check_017, content)),  # 规则017: 随机函数
+                ("018", partial(check_018, content)),  # 规则018: data指针
+                ("019", partial(check_019, content)),  # 规则019: 全局变量初始化
+            ]
+        )
+    return rules
+
+
+def check_fuzz_file(filepath, content=None):
+    """
+    对单个文件执行全部适用规则
+
+    参数:
+        content: 可选，已读取的文件内容；目录扫描时由调用方传入，保证每个文件只读取一次
+    """
+    if content is None:
+        content = read_file(filepath)
     if content is None:
         return [f"错误: 无法读取文件 {filepath}"]
 
@@ -364,58 +374,18 @@ def check_fuzz_file(filepath):
 
     if USE_INDEPENDENT_SCRIPTS:
         # 所有26条规则统一通过独立脚本执行
-        dirname = os.path.basename(os.path.dirname(filepath))
-        filename = os.path.basename(filepath)
-
-        # 文件格式规则 (A-G)
-        if basename.endswith((".cpp", ".h")):
-            errors.extend(check_F(filepath, content))  # 规则F: 版权头
-        if basename.endswith(".cpp"):
-            errors.extend(
-                check_E(filename, content)
-            )  # 规则E: .cpp头文件完整性（仅.cpp文件）
-        if basename.endswith(".h"):
-            errors.extend(
-                check_A(filename, dirname, content)
-            )  # 规则A: 头文件格式（仅.h文件）
-        if basename == "BUILD.gn":
-            errors.extend(check_B(content))  # 规则B: BUILD.gn规范
-            errors.extend(check_G(filepath, content))  # 规则G: 目标命名
-        if basename == "project.xml":
-            errors.extend(check_C(filepath))  # 规则C: project.xml规范
-        errors.extend(check_D(filepath))  # 规则D: 目录/文件一致性
-
-        # 代码安全规则 (001-019)
-        if basename.endswith(".cpp"):
-            errors.extend(check_001(content))  # 规则001: FUZZ适用性
-            errors.extend(check_002(filepath, content, []))  # 规则002: API覆盖
-            errors.extend(check_003(content))  # 规则003: 变异数据使用
-            errors.extend(check_004(content))  # 规则004: 变异数据复用
-            errors.extend(check_005(content))  # 规则005: 复杂参数构造
-            errors.extend(check_006(content))  # 规则006: 接口数量
-            errors.extend(check_007(content))  # 规则007: IPC接口
-            errors.extend(check_008(filepath, content))  # 规则008: 复杂函数
-            errors.extend(check_009(content))  # 规则009: Driver安全性
-            errors.extend(check_010(content))  # 规则010: size误用
-            errors.extend(check_011(content))  # 规则011: 安全准入
-            errors.extend(check_012(content))  # 规则012: 分支覆盖
-            errors.extend(check_013(content))  # 规则013: 枚举值构造
-            errors.extend(check_014(content))  # 规则014: 固定参数
-            errors.extend(check_015(content))  # 规则015: 中间产物
-            errors.extend(check_016(content))  # 规则016: 类型匹配
-            errors.extend(check_017(content))  # 规则017: 随机函数
-            errors.extend(check_018(content))  # 规则018: data指针
-            errors.extend(check_019(content))  # 规则019: 全局变量初始化
+        for _, run_rule in _file_rules(filepath, content):
+            errors.extend(run_rule())
     else:
         # 降级方案：使用内联实现
         if basename.endswith((".cpp", ".h")):
             errors.extend(check_copyright(filepath, content))
             errors.extend(check_file_format_rules(filepath, content))
-        errors.extend(check_directory_consistency(filepath))
+        errors.extend(check_directory_consistency(filepath, content))
         if basename == "BUILD.gn":
-            errors.extend(check_build_gn_target_name(filepath))
+            errors.extend(check_build_gn_target_name(filepath, content))
         if basename == "project.xml":
-            errors.extend(check_project_xml(filepath))
+            errors.extend(check_project_xml(filepath, content))
         if basename.endswith(".cpp"):
             errors.extend(check_unfuzzable_api(content))
             errors.extend(check_missing_api_coverage(filepath, content))
@@ -2714,7 +2684,7 @@ def is_seed_format_valid(file_ext, api_types):
     return True
 
 
-def check_directory_consistency(filepath):
+def check_directory_consistency(filepath, content=None):
     """
     规则D: 检查文件命名一致性
     - .cpp/.h 文件名应与目录名一致
@@ -2750,7 +2720,8 @@ def check_directory_consistency(filepath):
 
     # 检查头文件中的FUZZ_PROJECT_NAME是否与目录名一致
     if filename.endswith(".h"):
-        content = read_file(filepath) or ""
+        if content is None:
+            content = read_file(filepath) or ""
         fuzz_project_match = re.search(
             r'#define\s+FUZZ_PROJECT_NAME\s+"([^"]+)"', content
         )
@@ -2793,7 +2764,7 @@ def check_fuzztest_target_name_format(target_name):
     return True, None
 
 
-def check_build_gn_target_name(filepath):
+def check_build_gn_target_name(filepath, content=None):
     """
     规则G: 检查 BUILD.gn 中 ohos_fuzztest 目标名格式
     - 目标名必须以 FuzzTest 结尾
@@ -2806,7 +2777,8 @@ def check_build_gn_target_name(filepath):
     if filename != "BUILD.gn":
         return errors
 
-    content = read_file(filepath) or ""
+    if content is None:
+        content = read_file(filepath) or ""
 
     # 检查 ohos_fuzztest 目标名
     target_matches = re.findall(r'ohos_fuzztest\("([^"]+)"\)', content)
@@ -2830,14 +2802,15 @@ def check_build_gn_target_name(filepath):
     return errors
 
 
-def check_project_xml(filepath):
+def check_project_xml(filepath, content=None):
     errors = []
-    if not os.path.exists(filepath):
-        return errors
-
-    content = read_file(filepath)
     if content is None:
-        return [f"规则C: 无法读取 {filepath}"]
+        if not os.path.exists(filepath):
+            return errors
+
+        content = read_file(filepath)
+        if content is None:
+            return [f"规则C: 无法读取 {filepath}"]
 
     # 检查XML声明，允许前导空白字符和BOM
     content_stripped = content.lstrip("\ufeff\t\n\r ")
@@ -2899,60 +2872,460 @@ def check_copyright(filepath, content):
     return errors
 
 
-def check_directory(directory):
-    all_errors = {}
-    checked_files = 0
-    all_cpp_contents = {}  # 收集所有cpp文件内容用于项目级检查
+# 函数定义：行首返回类型（排除 return/else 等关键字与赋值），参数列表后到 '{' 之间不含 ';'
+DEFINITION_TEMPLATE = (
+    r"^[ \t]*(?:(?!(?:return|else|throw|new|delete|case)\b)[\w:<>,]+[\s*&]+)+"
+    r"(?:\w+::)*(?P<name>{name})\s*\([^;{{}}]*\)[^;{{}}]*\{{"
+)
+# 诊断主体是某个函数（「函数 Xxx() 中」「Xxx() 中」「Xxx() 函数」）：定位该函数的定义
+SUBJECT_FUNC_PATTERN = re.compile(
+    r"^规则\w+(?:\[[^\]]+\])?:\s*(?:函数\s*)?(\w+)\(\)\s*(?:中|函数)"
+)
+# 诊断对象是调用点（「调用 Xxx()」「传给 Xxx()」「发现 Xxx() 操作」）：调用点唯一时定位该调用
+CALL_SITE_PATTERN = re.compile(r"(?:调用|传给)\s*(\w+)\(\)|发现\s*(\w+)\(\)\s*操作")
+
+
+def _locate_line(message, content):
+    """
+    定位诊断对象所在行（1起始）
+
+    只处理能确定诊断对象的两类消息：以函数为主体的诊断返回函数定义行，
+    针对某个调用的诊断返回该调用所在行（同名调用不止一处时无法确定，返回 None）；
+    其他诊断（如 fdp.ConsumeXxx() 这类示例写法）不猜测，返回 None
+    """
+    if not content:
+        return None
+    code = parse_fuzzer(content).code
+    m = SUBJECT_FUNC_PATTERN.search(message)
+    if m:
+        pattern = DEFINITION_TEMPLATE.format(name=re.escape(m.group(1)))
+        definition = re.search(pattern, code, re.MULTILINE)
+        return code.count("\n", 0, definition.start()) + 1 if definition else None
+    m = CALL_SITE_PATTERN.search(message)
+    if not m:
+        return None
+    name = re.escape(m.group(1) or m.group(2))
+    definitions = {
+        d.start("name")
+        for d in re.finditer(DEFINITION_TEMPLATE.format(name=name), code, re.MULTILINE)
+    }
+    calls = [
+        c.start()
+        for c in re.finditer(rf"\b{name}\s*\(", code)
+        if c.start() not in definitions
+    ]
+    if len(calls) != 1:
+        return None
+    return code.count("\n", 0, calls[0]) + 1
+
+
+def parse_diagnostic(filepath, error, content=None):
+    """将规则脚本返回的诊断文本转换为 Diagnostic"""
+    m = DIAGNOSTIC_PATTERN.search(error)
+    rule = m.group(1) if m else None
+    severity = m.group(2) if m else None
+    return Diagnostic(filepath, rule, severity, _locate_line(error, content), error)
+
+
+def _apply_expected_methods(errors, content, expected):
+    """批量模式：用预期覆盖的方法集合替换规则002的结果"""
+    errors = [e for e in errors if "规则002" not in e]
+    # 重新检查：当前文件应该覆盖的预期方法
+    if content:
+        do_funcs = set(re.findall(r"\bvoid\s+(\w+)\s*\(\s*FuzzedDataProvider", content))
+        covered = set()
+        for do_name in do_funcs:
+            if do_name.startswith("Do") and len(do_name) > 2:
+                covered.add(do_name[2:])
+            else:
+                covered.add(do_name)
+        missing = expected - covered
+        if missing:
+            errors.append(
+                f"规则002[高危]: 预期覆盖的 {len(expected)} 个接口中有 {len(missing)} 个未覆盖: "
+                f"{', '.join(sorted(missing))}"
+            )
+    return errors
 
+
+def check_file(filepath, content=None, expected_methods=None, rules=None, cache=None):
+    """
+    可导入的单文件检查接口，返回结构化诊断
+
+    fuzz_generator 的 Verify 阶段直接在进程内调用本函数，规则模块只在导入时加载一次。
+
+    参数:
+        content: 可选，已读取的文件内容
+        expected_methods: 可选，预期覆盖的方法名集合；设置后规则002按该集合重新判定（批量模式）
+        rules: 可选，只保留指定规则编号的诊断（如 ["001", "F"]）
+        cache: 可选 ResultCache
+    返回: [Diagnostic]，为空表示检查通过
+    """
+    if content is None:
+        content = read_file(filepath)
+    if cache and content is not None:
+        cache_key = os.path.abspath(filepath)
+        errors, new_entry = _check_with_cache(
+            filepath, content, cache.files.get(cache_key)
+        )
+        cache.files[cache_key] = new_entry
+    else:
+        errors = check_fuzz_file(filepath, content)
+
+    if expected_methods is not None and errors:
+        errors = _apply_expected_methods(errors, content, set(expected_methods))
+
+    if rules and errors:
+        errors = [e for e in errors if any(f"规则{r}" in e for r in rules)]
+
+    return [parse_diagnostic(filepath, e, content) for e in errors]
+
+
+def _collect_check_targets(directory):
+    """按 os.walk 顺序收集待检查文件，串行与并行模式共用同一顺序以保证输出一致"""
+    targets = []
     for root, dirs, files in os.walk(directory):
         for file in files:
             if file.endswith((".cpp", ".h")) or file in ("BUILD.gn", "project.xml"):
-                filepath = os.path.join(root, file)
-                checked_files += 1
-                try:
-                    errors = check_fuzz_file(filepath)
-                    if errors:
-                        all_errors[filepath] = errors
-
-                    # 收集cpp文件内容
-                    if file.endswith(".cpp"):
-                        content = read_file(filepath)
-                        if content:
-                            all_cpp_contents[filepath] = content
-
-                except Exception as e:
-                    all_errors[filepath] = [f"检查异常: {str(e)}"]
-
-    # 项目级规则002检查：合并所有文件的覆盖率
-    if all_cpp_contents:
-        # 按目录分组（同一项目）
+                targets.append(os.path.join(root, file))
+    return targets
+
+
+def _content_hash(content):
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def _ruleset_version():
+    """规则集版本：工具及 check_scripts/ 全部源码的摘要，任何规则改动都会使缓存整体失效"""
+    digest = hashlib.sha1(TOOL_VERSION.encode("utf-8"))
+    sources = [os.path.abspath(__file__)] + [
+        os.path.join(check_scripts_dir, name)
+        for name in sorted(os.listdir(check_scripts_dir))
+        if name.endswith(".py")
+    ]
+    for source in sources:
+        with open(source, "rb") as f:
+            digest.update(os.path.basename(source).encode("utf-8"))
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _file_fingerprint(path):
+    """返回依赖文件指纹 [路径, mtime_ns, size, sha1]，文件不可读时返回 None"""
+    try:
+        st = os.stat(path)
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+    return [path, st.st_mtime_ns, st.st_size, digest]
+
+
+# 非 .cpp 文件不依赖被测头文件
+_NO_DEPS = {"file": "", "files": [], "unresolved": [], "search_dirs": []}
+
+
+def _deps_unchanged(deps):
+    """
+    校验规则002依赖：
+    - 已解析头文件 mtime/size 未变直接视为有效，否则比对内容哈希
+    - 搜索目录需与当前一致（工作目录变化会改变解析结果）
+    - 当时未解析到的候选头文件重新探测，现在能找到则失效
+    """
+    for path, mtime_ns, size, digest in deps["files"]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if st.st_mtime_ns == mtime_ns and st.st_size == size:
+            continue
+        fingerprint = _file_fingerprint(path)
+        if fingerprint is None or fingerprint[3] != digest:
+            return False
+    if not deps["file"]:
+        return True
+    search_dirs = deps["search_dirs"]
+    if [str(d) for d in header_search_dirs(deps["file"])] != search_dirs:
+        return False
+    return not any(
+        resolve_header_path(header, search_dirs, fresh=True)
+        for header in deps["unresolved"]
+    )
+
+
+def _header_deps(filepath, content):
+    """
+    规则002的依赖：{"file": fuzzer 路径, "files": 已解析被测头文件指纹,
+    "unresolved": 未解析到的候选头文件, "search_dirs": 解析时使用的搜索目录}
+    """
+    _, header_candidates, _ = find_target_headers(filepath, content)
+    search_dirs = [str(d) for d in header_search_dirs(filepath)]
+    deps = {"file": filepath, "files": [], "unresolved": [], "search_dirs": search_dirs}
+    for header in dict.fromkeys(header_candidates):
+        resolved = resolve_header_path(header, search_dirs)
+        fingerprint = _file_fingerprint(resolved) if resolved else None
+        if fingerprint is None:
+            deps["unresolved"].append(header)
+        elif fingerprint not in deps["files"]:
+            deps["files"].append(fingerprint)
+    return deps
+
+
+class ResultCache:
+    """
+    检查结果持久化缓存（JSON 文件）
+
+    - 单文件结果以绝对路径为索引，按 内容哈希 + 工作目录 + 依赖头文件指纹 判定有效
+    - 项目级规则002结果以项目目录为索引，按 成员文件内容 + 目标头文件指纹 判定有效
+    - 规则集变化时整体失效；条目数超过 max_entries 时淘汰最久未使用的条目
+    """
+
+    def __init__(self, path=CACHE_FILE, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.ruleset = _ruleset_version()
+        self.files = {}
+        self.projects = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("ruleset") != self.ruleset:
+            return
+        self.files = data.get("files", {})
+        self.projects = data.get("projects", {})
+
+    def _evict(self, entries):
+        overflow = len(entries) - self.max_entries
+        if overflow > 0:
+            for key in sorted(entries, key=lambda k: entries[k]["used"])[:overflow]:
+                del entries[key]
+
+    def save(self):
+        self._evict(self.files)
+        self._evict(self.projects)
+        data = {"ruleset": self.ruleset, "files": self.files, "projects": self.projects}
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[WARN] 无法写入检查缓存 {self.path}: {e}")
+
+
+def _check_with_cache(filepath, content, entry):
+    """
+    带缓存的单文件检查：命中时复用各规则的历史结果，易变规则（VOLATILE_RULES）始终实时执行
+
+    返回: (errors, 新缓存条目)
+    """
+    sha = _content_hash(content)
+    cwd = os.getcwd()
+    cached = None
+    if (
+        entry
+        and entry["sha"] == sha
+        and entry["cwd"] == cwd
+        and _deps_unchanged(entry["deps"])
+    ):
+        cached = entry["results"]
+
+    errors = []
+    results = {}
+    for rule, run_rule in _file_rules(filepath, content):
+        if cached is not None and rule in cached:
+            rule_errors = cached[rule]
+        else:
+            rule_errors = run_rule()
+        if rule not in VOLATILE_RULES:
+            results[rule] = rule_errors
+        errors.extend(rule_errors)
+
+    deps = entry["deps"] if cached is not None else _NO_DEPS
+    if cached is None and filepath.endswith(".cpp"):
+        deps = _header_deps(filepath, content)
+    new_entry = {
+        "sha": sha,
+        "cwd": cwd,
+        "deps": deps,
+        "results": results,
+        "used": time.time(),
+    }
+    return errors, new_entry
+
+
+def _scan_file(filepath, use_cache=False, entry=None):
+    """
+    单文件扫描单元（可在子进程中执行）：文件只读取一次，交给全部适用规则
+
+    参数:
+        use_cache: 是否启用结果缓存；entry 为该文件已有的缓存条目（可为 None）
+    返回: (filepath, errors, cpp_content, new_entry)，cpp_content 仅 .cpp 文件有值，
+          供项目级规则002复用；new_entry 为需要写回缓存的条目（未启用缓存时为 None）
+    """
+    new_entry = None
+    try:
+        content = read_file(filepath)
+        if use_cache and content is not None:
+            errors, new_entry = _check_with_cache(filepath, content, entry)
+        else:
+            errors = check_fuzz_file(filepath, content)
+    except Exception as e:
+        return filepath, [f"检查异常: {str(e)}"], None, None
+    cpp_content = content if filepath.endswith(".cpp") and content else None
+    return filepath, errors, cpp_content, new_entry
+
+
+def _check_project_coverage(first_file, project_files, collect_deps=False):
+    """
+    项目级规则002：合并同一目录下所有 .cpp 的覆盖情况，以第一个文件为代表
+
+    返回: (errors, deps)，collect_deps 为 True 时 deps 为目标头文件指纹，否则为 None；
+          检查失败时 errors 为 None（保留各文件自身的规则002结果）
+    """
+    try:
+        if USE_INDEPENDENT_SCRIPTS:
+            errors = check_002(
+                first_file,
+                project_files[first_file],
+                all_project_files=project_files,
+            )
+        else:
+            errors = check_missing_api_coverage(first_file, project_files[first_file])
+    except Exception:
+        return None, None  # 项目级检查失败不影响其他检查，也不写入缓存
+    deps = None
+    if collect_deps:
+        deps = _header_deps(first_file, project_files[first_file])
+    return errors, deps
+
+
+def _project_key(project_files):
+    digest = hashlib.sha1()
+    for filepath, content in project_files.items():
+        digest.update(os.path.abspath(filepath).encode("utf-8"))
+        digest.update(_content_hash(content).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def check_directory(directory, jobs=1, cache=None):
+    """
+    检查目录下所有fuzzer文件
+
+    参数:
+        jobs: 并行进程数，1 为串行；>1 时按文件分发到进程池，结果按 os.walk 顺序合并，
+              输出与串行模式完全一致
+        cache: 可选 ResultCache；未变化的文件直接复用历史结果，
+               项目级规则002只对成员文件或目标头文件有变化的目录重新计算
+    """
+    all_errors = {}
+    targets = _collect_check_targets(directory)
+    checked_files = len(targets)
+    use_cache = cache is not None
+    cache_keys = [os.path.abspath(t) for t in targets]
+    entries = [cache.files.get(key) if use_cache else None for key in cache_keys]
+
+    pool = None
+    if jobs > 1 and checked_files > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        # 后缀索引在主进程建立一次，随 initializer 下发，worker 不再各自遍历 include 根目录
+        pool = ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=init_worker,
+            initargs=(warm_include_index(),),
+        )
+
+    try:
+        scan_args = (targets, [use_cache] * checked_files, entries)
+        if pool:
+            chunksize = max(1, checked_files // (jobs * 4))
+            results = pool.map(_scan_file, *scan_args, chunksize=chunksize)
+        else:
+            results = map(_scan_file, *scan_args)
+
+        # 收集所有cpp文件内容用于项目级检查，按目录分组（同一项目）
         project_groups = {}
-        for filepath, content in all_cpp_contents.items():
-            dir_path = os.path.dirname(filepath)
-            if dir_path not in project_groups:
-                project_groups[dir_path] = {}
-            project_groups[dir_path][filepath] = content
-
-        # 对每个项目进行规则002检查
-        for project_dir, project_files in project_groups.items():
-            # 选择第一个文件作为代表进行项目级检查
-            first_file = list(project_files.keys())[0]
-            first_content = project_files[first_file]
-
-            try:
-                project_errors = check_missing_api_coverage(
-                    first_file, first_content, all_project_files=project_files
-                )
-                if project_errors:
-                    # 将项目级错误添加到第一个文件
-                    if first_file not in all_errors:
-                        all_errors[first_file] = []
-                    # 去重：避免重复添加相同的错误
-                    for error in project_errors:
-                        if error not in all_errors[first_file]:
-                            all_errors[first_file].append(error)
-            except Exception as e:
-                pass  # 项目级检查失败不影响其他检查
+        for cache_key, (filepath, errors, cpp_content, new_entry) in zip(
+            cache_keys, results
+        ):
+            if errors:
+                all_errors[filepath] = errors
+            if cpp_content:
+                dir_path = os.path.dirname(filepath)
+                project_groups.setdefault(dir_path, {})[filepath] = cpp_content
+            if new_entry:
+                cache.files[cache_key] = new_entry
+
+        # 项目级规则002检查：合并所有文件的覆盖率，选择第一个文件作为代表
+        project_errors = {}
+        pending = []
+        cwd = os.getcwd()
+        for dir_path, project_files in project_groups.items():
+            first_file = next(iter(project_files))
+            if use_cache:
+                key = os.path.abspath(dir_path)
+                entry = cache.projects.get(key)
+                members = _project_key(project_files)
+                if (
+                    entry
+                    and entry["members"] == members
+                    and entry["cwd"] == cwd
+                    and _deps_unchanged(entry["deps"])
+                ):
+                    entry["used"] = time.time()
+                    project_errors[first_file] = entry["errors"]
+                    continue
+                pending.append((first_file, project_files, key, members))
+            else:
+                pending.append((first_file, project_files, None, None))
+
+        first_files = [item[0] for item in pending]
+        groups = [item[1] for item in pending]
+        collect = [use_cache] * len(pending)
+        if pool and len(pending) > 1:
+            pending_results = pool.map(_check_project_coverage, first_files, groups, collect)
+        else:
+            pending_results = map(_check_project_coverage, first_files, groups, collect)
+
+        for (first_file, _, key, members), (errors, deps) in zip(
+            pending, pending_results
+        ):
+            project_errors[first_file] = errors
+            if use_cache and deps is not None:
+                cache.projects[key] = {
+                    "members": members,
+                    "cwd": cwd,
+                    "deps": deps,
+                    "errors": errors,
+                    "used": time.time(),
+                }
+
+        for project_files in project_groups.values():
+            first_file = next(iter(project_files))
+            errors = project_errors.get(first_file)
+            if errors is None:
+                continue
+            # 项目级合并覆盖率取代组内各文件单独计算的规则002结果，只报告在第一个文件上
+            for filepath in project_files:
+                file_errors = [
+                    e for e in all_errors.get(filepath, []) if "规则002" not in e
+                ]
+                if filepath == first_file:
+                    file_errors.extend(errors)
+                if file_errors:
+                    all_errors[filepath] = file_errors
+                else:
+                    all_errors.pop(filepath, None)
+    finally:
+        if pool:
+            pool.shutdown()
 
     return all_errors, checked_files
 
@@ -3144,16 +3517,25 @@ def main():
   # 检查特定规则
   python3 fuzz_check.py path/to/fuzztest/ --rule 001,003,005
 
+  # 多进程并行检查大目录（0 表示使用全部CPU核）
+  python3 fuzz_check.py path/to/fuzztest/ --jobs 8
+
+  # 忽略结果缓存，强制全量检查（默认按文件内容哈希复用未变化文件的结果）
+  python3 fuzz_check.py path/to/fuzztest/ --no-cache
+
   # 自动修复问题（支持规则 017/019/F）
   python3 fuzz_check.py path/to/XxxXxx_fuzzer.cpp --fix
   python3 fuzz_check.py path/to/XxxXxx_fuzzer.cpp --fix --rules 017,F
   python3 fuzz_check.py path/to/XxxXxx_fuzzer.cpp --fix --dry-run
-        """,
+        """
+        + ENV_HELP,
     )
     parser.add_argument("path", help="要检查的 .cpp/.h 文件或目录路径")
     parser.add_argument("-o", "--output", help="输出报告文件路径")
     parser.add_argument("-v", "--verbose", action="store_true", help="显示详细输出")
-    parser.add_argument("--version", action="version", version="%(prog)s 2.2")
+    parser.add_argument(
+        "--version", action="version", version=f"%(prog)s {TOOL_VERSION}"
+    )
     parser.add_argument("--rule", help="只检查指定规则（逗号分隔，如 001,003,005）")
     parser.add_argument(
         "--fix", action="store_true", help="自动修复可修复的规则问题（017/019/F）"
@@ -3162,6 +3544,21 @@ def main():
     parser.add_argument(
         "--dry-run", action="store_true", help="预览修复，不实际修改文件"
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="目录检查的并行进程数（默认1为串行，0表示使用全部CPU核）",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="禁用检查结果缓存，强制重新执行全部规则"
+    )
+    parser.add_argument(
+        "--cache-file",
+        default=CACHE_FILE,
+        help=f"检查结果缓存文件路径（默认 {CACHE_FILE}，可用环境变量 FUZZ_CHECK_CACHE 指定）",
+    )
     parser.add_argument(
         "--expected-methods",
         help="批量模式：逗号分隔的预期覆盖方法列表（用于规则002）",
@@ -3193,39 +3590,24 @@ def main():
             print("未发现需要修复的问题")
         sys.exit(0)
 
+    cache = None
+    if not args.no_cache and USE_INDEPENDENT_SCRIPTS:
+        cache = ResultCache(args.cache_file)
+
     if os.path.isfile(args.path):
         try:
-            errors = check_fuzz_file(args.path)
-
-            # 批量模式：只有设置 expected-methods 时才过滤规则002
-            if args.expected_methods and errors:
-                expected = set(
+            expected = None
+            if args.expected_methods:
+                expected = [
                     m.strip() for m in args.expected_methods.split(",") if m.strip()
-                )
-                errors = [e for e in errors if "规则002" not in e]
-                # 重新检查：当前文件应该覆盖的预期方法
-                content = read_file(args.path)
-                if content:
-                    do_funcs = set(
-                        re.findall(r"\bvoid\s+(\w+)\s*\(\s*FuzzedDataProvider", content)
-                    )
-                    covered = set()
-                    for do_name in do_funcs:
-                        if do_name.startswith("Do") and len(do_name) > 2:
-                            covered.add(do_name[2:])
-                        else:
-                            covered.add(do_name)
-                    missing = expected - covered
-                    if missing:
-                        errors.append(
-                            f"规则002[高危]: 预期覆盖的 {len(expected)} 个接口中有 {len(missing)} 个未覆盖: "
-                            f"{', '.join(sorted(missing))}"
-                        )
-
-            # 如果指定了规则，过滤结果
-            if args.rule and errors:
-                rule_nums = args.rule.split(",")
-                errors = [e for e in errors if any(f"规则{r}" in e for r in rule_nums)]
+                ]
+            rules = args.rule.split(",") if args.rule else None
+            diagnostics = check_file(
+                args.path, expected_methods=expected, rules=rules, cache=cache
+            )
+            if cache:
+                cache.save()
+            errors = [d.message for d in diagnostics]
 
             if errors:
                 print(f"文件 '{args.path}' 发现 {len(errors)} 个问题:")
@@ -3241,7 +3623,12 @@ def main():
 
     elif os.path.isdir(args.path):
         try:
-            all_errors, checked_files = check_directory(args.path)
+            jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+            all_errors, checked_files = check_directory(
+                args.path, jobs=jobs, cache=cache
+            )
+            if cache:
+                cache.save()
 
             # 如果指定了规则，过滤结果
             if args.rule and all_errors:
@@ -6,10 +6,12 @@ FUZZ测试用例快速生成工具
 支持自动从头文件解析 public 有参方法
 """
 
+import io
 import os
 import re
 import sys
 import argparse
+import contextlib
 import json
 from datetime import datetime
 from pathlib import Path
@@ -64,20 +66,7 @@ def _extract_ipc_code_count(header_path_str, target_class):
     resolved = _resolve_header_path(header_path_str, search_dirs)
     if not resolved or not os.path.isfile(resolved):
         return 0
-    content = Path(resolved).read_text(encoding="utf-8", errors="ignore")
-    content = re.sub(r"//[^\n]*", "", content)
-    content = re.sub(r"/\*.*?\*/", "", content, flags=re.DOTALL)
-    pattern = r"enum\s*\{([^}]+)\}\s*;"
-    m = re.search(pattern, content, re.DOTALL)
-    if not m:
-        return 0
-    body = m.group(1)
-    items = [
-        item.strip()
-        for item in body.split(",")
-        if item.strip() and not item.strip().startswith("//")
-    ]
-    return len(items)
+    return header_index.ipc_summary(resolved)["code_count"]
 
 
 # Fix Windows console encoding
@@ -88,6 +77,12 @@ if sys.platform == "win32":
         locale._getdefaultlocale = lambda *args: ["en_US", "utf8"]
 
 
+# 头文件解析索引（与 fuzz_check 规则002、header_parser 共用，每个头文件只解析一次）
+check_scripts_dir = os.path.join(os.path.dirname(__file__), "..", "check_scripts")
+if check_scripts_dir not in sys.path:
+    sys.path.insert(0, check_scripts_dir)
+import header_index
+
 # 导入增强版头文件解析器
 try:
     from header_parser import parse_header_methods_enhanced
@@ -97,6 +92,15 @@ except ImportError:
     USE_ENHANCED_PARSER = False
     parse_header_methods_enhanced = None
 
+# 种子精简（写盘前去重 + 按 FuzzedDataProvider 消费结果归并）
+from seed_generator import CorpusDistiller, FuzzedDataProvider
+
+# 导入规范检查工具（Verify 阶段在进程内调用，26条规则模块只加载一次）
+try:
+    import fuzz_check
+except ImportError:
+    fuzz_check = None
+
 TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
 
 INIT_MODE_SINGLETON = "singleton"
@@ -259,12 +263,19 @@ COMPLEX_TYPE_MAP = {
 }
 
 
+# 模板内容缓存（批量模式下由主进程加载一次，通过进程池 initializer 下发给各 worker）
+_TEMPLATE_CACHE = {}
+
+
 def read_template(template_name):
+    if template_name in _TEMPLATE_CACHE:
+        return _TEMPLATE_CACHE[template_name]
     template_path = TEMPLATE_DIR / template_name
     if not template_path.exists():
         print(f"错误: 模板文件不存在: {template_path}")
         sys.exit(1)
-    return template_path.read_text(encoding="utf-8")
+    _TEMPLATE_CACHE[template_name] = template_path.read_text(encoding="utf-8")
+    return _TEMPLATE_CACHE[template_name]
 
 
 def _snake_case_const(name):
@@ -282,22 +293,10 @@ def _do_func_name(name):
 def _resolve_header_path(header_str, search_dirs):
     """
     header_str 可能是带引号的路径，如 "rosen/xxx.h"
-    尝试在 search_dirs 中查找实际文件
+    尝试在 search_dirs 中查找实际文件，找不到时原样返回去引号后的路径
     """
-    path = header_str.strip().strip('"').strip("'")
-    if os.path.isabs(path) and os.path.isfile(path):
-        return path
-    for base in search_dirs:
-        candidate = Path(base) / path
-        if candidate.is_file():
-            return str(candidate)
-        # 去掉可能的前缀，例如 foundation/graphic/...
-        parts = Path(path).parts
-        for i in range(len(parts)):
-            candidate2 = Path(base) / Path(*parts[i:])
-            if candidate2.is_file():
-                return str(candidate2)
-    return path
+    resolved = header_index.resolve_header_path(header_str, search_dirs)
+    return resolved or header_str.strip().strip('"').strip("'")
 
 
 def parse_header_methods(header_path_str, target_class, include_no_params=False):
@@ -330,72 +329,12 @@ def parse_header_methods(header_path_str, target_class, include_no_params=False)
         except Exception as e:
             print(f"[WARN] 增强版解析器失败: {e}，尝试旧版解析器...")
 
-    # 回退到旧版解析器
-    content = Path(resolved).read_text(encoding="utf-8", errors="ignore")
-
-    # 移除单行和多行注释
-    content = re.sub(r"//[^\n]*", "", content)
-    content = re.sub(r"/\*.*?\*/", "", content, flags=re.DOTALL)
-
-    # 找到类定义 body
-    class_pattern = rf"\bclass\s+{re.escape(target_class)}\b.*?\{{"
-    m = re.search(class_pattern, content)
-    if not m:
-        return []
-
-    start = m.end() - 1  # 指向 {
-    brace_count = 0
-    end = start
-    for i in range(start, len(content)):
-        if content[i] == "{":
-            brace_count += 1
-        elif content[i] == "}":
-            brace_count -= 1
-            if brace_count == 0:
-                end = i
-                break
-
-    class_body = content[start : end + 1]
-
-    # 找到 public: 区域
-    pub_match = re.search(r"\bpublic\s*:", class_body)
-    if not pub_match:
-        return []
-
-    pub_start = pub_match.end()
-    # public 区域到 protected/private/} 结束
-    next_access = re.search(r"\b(protected|private)\s*:", class_body[pub_start:])
-    if next_access:
-        pub_body = class_body[pub_start : pub_start + next_access.start()]
-    else:
-        pub_body = class_body[pub_start:]
-
+    # 回退到旧版解析器：只取第一个 public 段
     methods = []
-    # 匹配方法签名：可选 virtual/static/explicit/constexpr/inline，返回类型，方法名，参数列表，可选 const/override/final/noexcept，分号
-    # 例子: virtual void Foo(int a) const = 0;
-    pattern = re.compile(
-        r"(?:virtual|static|explicit|constexpr|inline|consteval|constinit|\[\[.*?\]\]|\s)*"  # 修饰符
-        r"(?P<ret>[~\w_:][\w\s_:<>,*&.]*?)\s+"  # 返回类型（尽量非贪婪）
-        r"(?P<name>\w+)\s*\(\s*(?P<params>[^)]*)\s*\)\s*"  # 方法名和参数
-        r"(?:const\s*)?(?:override\s*)?(?:final\s*)?(?:noexcept\s*)?(?:=\s*0\s*)?;"  # 后缀和分号
-    )
-
-    for match in pattern.finditer(pub_body):
-        name = match.group("name")
-        ret = match.group("ret").strip()
-        params = match.group("params").strip()
-
-        # 排除构造函数
-        if name == target_class:
-            continue
-        # 排除析构函数
-        if name.startswith("~"):
-            continue
-        # 排除宏或 typedef
-        if ret in ("typedef", "using", "friend"):
-            continue
-        # 排除纯属性宏（返回类型包含宏且方法名像宏）
-        if not re.match(r"^[A-Za-z_]\w*$", name):
+    for name, params, ret, section_no in header_index.public_methods(
+        resolved, target_class
+    ):
+        if section_no != 0:
             continue
         # 排除无参方法（除非 include_no_params=True）
         if not include_no_params and (params == "" or params.lower() == "void"):
@@ -408,16 +347,7 @@ def parse_header_methods(header_path_str, target_class, include_no_params=False)
 
         methods.append((name, params, ret))
 
-    # 去重，保留第一次出现的
-    seen = set()
-    unique_methods = []
-    for name, params, ret in methods:
-        key = (name, params)
-        if key not in seen:
-            seen.add(key)
-            unique_methods.append((name, params, ret))
-
-    return unique_methods
+    return methods
 
 
 def _clean_type(raw_type):
@@ -757,9 +687,7 @@ public:
 }};"""
 
     try:
-        content = Path(interface_header).read_text(encoding="utf-8", errors="ignore")
-        content = re.sub(r"//[^\n]*", "", content)
-        content = re.sub(r"/\*.*?\*/", "", content, flags=re.DOTALL)
+        content = header_index.get_index().source(interface_header)
 
         # 查找类定义
         class_pattern = rf"\bclass\s+{re.escape(interface_name)}\b.*?\{{"
@@ -864,27 +792,7 @@ def _detect_refbase_subclass(header_path_str, target_class):
     if not resolved or not os.path.isfile(resolved):
         return False
 
-    content = Path(resolved).read_text(encoding="utf-8", errors="ignore")
-    content = re.sub(r"//[^\n]*", "", content)
-    content = re.sub(r"/\*.*?\*/", "", content, flags=re.DOTALL)
-
-    # 匹配 class XXX : public RefBase 或 class XXX : public XXX, public RefBase
-    refbase_pattern = (
-        rf"\bclass\s+{re.escape(target_class)}\b[^;]*?:\s*public\s+\w*RefBase\b"
-    )
-    if re.search(refbase_pattern, content):
-        return True
-
-    # 也检查是否继承自其他类，但最终继承链中包含 RefBase
-    # 简化处理：检查 class 声明中是否有 RefBase
-    class_pattern = rf"\bclass\s+{re.escape(target_class)}\b[^;]*?\{{"
-    m = re.search(class_pattern, content)
-    if m:
-        class_decl = content[m.start() : m.end()]
-        if "RefBase" in class_decl:
-            return True
-
-    return False
+    return header_index.inherits_refbase(resolved, target_class)
 
 
 def _find_stub_class_name(header_path_str, target_class):
@@ -903,27 +811,7 @@ def _find_stub_class_name(header_path_str, target_class):
     if not resolved or not os.path.isfile(resolved):
         return None
 
-    content = Path(resolved).read_text(encoding="utf-8", errors="ignore")
-    content = re.sub(r"//[^\n]*", "", content)
-    content = re.sub(r"/\*.*?\*/", "", content, flags=re.DOTALL)
-
-    patterns = [
-        rf"\bclass\s+(\w*{re.escape(target_class)}\w*Stub)\b",
-        rf"\bclass\s+(RSI{re.escape(target_class)}\w*Stub)\b",
-        rf"\bclass\s+(\w*Stub)\b[^;]*?\b{re.escape(target_class)}\b",
-    ]
-    for pat in patterns:
-        m = re.search(pat, content)
-        if m:
-            return m.group(1)
-
-    common_prefixes = ["RSI", "RS"]
-    for prefix in common_prefixes:
-        candidate = f"{prefix}{target_class}Stub"
-        if re.search(rf"\bclass\s+{re.escape(candidate)}\b", content):
-            return candidate
-
-    return f"{target_class}Stub"
+    return header_index.stub_class_name(resolved, target_class)
 
 
 def _detect_ipc_stub(header_path_str, target_class):
@@ -942,26 +830,9 @@ def _detect_ipc_stub(header_path_str, target_class):
     if not resolved or not os.path.isfile(resolved):
         return (False, None)
 
-    content = Path(resolved).read_text(encoding="utf-8", errors="ignore")
-    content = re.sub(r"//[^\n]*", "", content)
-    content = re.sub(r"/\*.*?\*/", "", content, flags=re.DOTALL)
-
-    ipc_indicators = [
-        r"OnRemoteRequest",
-        r"MessageParcel",
-        r"IRemoteStub",
-        r"IRemoteBroker",
-        r"IRemoteProxy",
-        r"DECLARE_INTERFACE_DESCRIPTOR",
-    ]
-    indicator_count = 0
-    for indicator in ipc_indicators:
-        if re.search(indicator, content):
-            indicator_count += 1
-
-    inherits_remote_broker = bool(
-        re.search(r"class\s+\w+\s*:\s*public\s+IRemoteBroker", content)
-    )
+    ipc = header_index.ipc_summary(resolved)
+    indicator_count = ipc["indicators"]
+    inherits_remote_broker = ipc["remote_broker"]
 
     stub_class_name = _find_stub_class_name(header_path_str, target_class)
 
@@ -1630,32 +1501,55 @@ def _has_type_in_params(params, target_types):
     return False
 
 
-def _deduplicate_seeds(generated_files, corpus_dir):
-    """按内容 hash 去重，保留文件名最短的"""
-    import hashlib
+FDP_CALL_PATTERN = re.compile(r"fdp\.(Consume\w+)(?:<([^>]+)>)?\(([^)]*)\)")
 
-    hashes = {}
-    unique_files = []
-    removed = 0
 
-    for filepath in generated_files:
-        if not os.path.isfile(filepath):
-            continue
-        data = open(filepath, "rb").read()
-        h = hashlib.md5(data).hexdigest()
-        if h in hashes:
-            os.remove(filepath)
-            removed += 1
-        else:
-            hashes[h] = filepath
-            unique_files.append(filepath)
+def _fdp_consume_plan(methods):
+    """
+    按 generate_fuzzer_cpp 生成的代码，列出每个 DoXxx 函数依次调用的 fdp.Consume
 
-    if removed > 0:
-        print(f"[INFO] 种子去重: 移除 {removed} 个重复文件")
-    return unique_files
+    返回: [[(方法名, 模板参数, 实参)] 或 None]，None 表示包含循环等无法静态展开的消费
+    """
+    plans = []
+    for _, params, _ in methods:
+        consumers, _, _ = generate_param_consumer(params, include_output_params=True)
+        plan = []
+        for _, _, consumer in consumers:
+            if "for (" in consumer:
+                plan = None
+                break
+            plan.extend(FDP_CALL_PATTERN.findall(consumer))
+        plans.append(plan)
+    return plans
 
 
-def generate_semantic_seeds(methods, corpus_dir):
+def _fdp_pattern(methods):
+    """
+    返回种子的消费模式函数：按 LLVMFuzzerTestOneInput 的 tarPos 选择器和 DoXxx 的参数消费顺序
+    解码种子，结果相同的种子在 fuzzer 中执行完全相同的调用（剩余未消费字节不影响执行）
+    """
+    plans = _fdp_consume_plan(methods)
+    target_size = len(methods)
+
+    def pattern(data):
+        fdp = FuzzedDataProvider(data)
+        tar_pos = fdp.consume_integral("uint8_t") % target_size
+        key = [tar_pos]
+        plan = plans[tar_pos]
+        try:
+            if plan is None:
+                raise ValueError("循环消费")
+            for method, template, arg in plan:
+                key.append(fdp.consume(method, template, arg))
+        except ValueError:
+            # 无法精确解码时保守处理：保留剩余原始字节，只归并完全等价的种子
+            key.append(data[fdp.start : fdp.end])
+        return tuple(key)
+
+    return pattern
+
+
+def generate_semantic_seeds(methods, corpus_dir, fdp_layout=True):
     """
     根据方法列表生成语义化的种子文件。
 
@@ -1663,12 +1557,12 @@ def generate_semantic_seeds(methods, corpus_dir):
     1. 按参数类型签名分组，相同签名的方法共享种子
     2. 只生成与方法参数类型相关的边界值/特殊值
     3. 笛卡尔积按分组限制，而非全局
-    4. 最终按内容 hash 去重
+    4. 写盘前按内容 hash 去重；fdp_layout=True（generate_fuzzer_cpp 生成的 fuzzer）时
+       再按 FuzzedDataProvider 消费结果归并，解码出相同调用和参数的种子只保留一个
     """
-    import struct
-
-    corpus_dir = Path(corpus_dir)
-    corpus_dir.mkdir(parents=True, exist_ok=True)
+    corpus = CorpusDistiller(
+        corpus_dir, pattern=_fdp_pattern(methods) if fdp_layout and methods else None
+    )
     generated_files = []
 
     # 按参数签名分组
@@ -1692,10 +1586,9 @@ def generate_semantic_seeds(methods, corpus_dir):
                 param_list = _parse_params(params)
                 for param_type in param_list:
                     _append_param_seed(seed_data, param_type)
-            seed_path = corpus_dir / f"seed_{idx}_{name}"
-            with open(seed_path, "wb") as f:
-                f.write(bytes(seed_data))
-            generated_files.append(str(seed_path))
+            seed_path, written = corpus.add(f"seed_{idx}_{name}", bytes(seed_data))
+            if written:
+                generated_files.append(str(seed_path))
 
         # 边界值种子：按分组生成（组内共享）
         boundary_data = bytearray()
@@ -1705,10 +1598,9 @@ def generate_semantic_seeds(methods, corpus_dir):
             for param_type in param_list:
                 cleaned_type = _clean_type(param_type)
                 _append_boundary_value(boundary_data, cleaned_type)
-        seed_path = corpus_dir / f"boundary_{rep_name}"
-        with open(seed_path, "wb") as f:
-            f.write(bytes(boundary_data))
-        generated_files.append(str(seed_path))
+        seed_path, written = corpus.add(f"boundary_{rep_name}", bytes(boundary_data))
+        if written:
+            generated_files.append(str(seed_path))
 
         # 特殊值种子：按分组生成（组内共享）
         special_data = bytearray()
@@ -1718,10 +1610,9 @@ def generate_semantic_seeds(methods, corpus_dir):
             for param_type in param_list:
                 cleaned_type = _clean_type(param_type)
                 _append_special_value(special_data, cleaned_type)
-        seed_path = corpus_dir / f"special_{rep_name}"
-        with open(seed_path, "wb") as f:
-            f.write(bytes(special_data))
-        generated_files.append(str(seed_path))
+        seed_path, written = corpus.add(f"special_{rep_name}", bytes(special_data))
+        if written:
+            generated_files.append(str(seed_path))
 
     # 生成通用边界值种子（仅包含方法实际使用的类型）
     all_used_types = set()
@@ -1731,16 +1622,14 @@ def generate_semantic_seeds(methods, corpus_dir):
                 all_used_types.add(_clean_type(p))
 
     # 只为实际使用的类型生成全局边界值
-    global_boundary = _generate_global_boundary_seeds(all_used_types, corpus_dir)
+    global_boundary = _generate_global_boundary_seeds(all_used_types, corpus)
     generated_files.extend(global_boundary)
 
     # 生成业务场景种子
-    biz_seeds = _generate_biz_seeds(methods, corpus_dir)
+    biz_seeds = _generate_biz_seeds(methods, corpus)
     generated_files.extend(biz_seeds)
 
-    # 去重
-    generated_files = _deduplicate_seeds(generated_files, corpus_dir)
-
+    print(f"[INFO] {corpus.summary()}")
     return generated_files
 
 
@@ -1828,10 +1717,11 @@ def _append_special_value(seed_data, cleaned_type):
         seed_data.extend([0x00])
 
 
-def _generate_global_boundary_seeds(used_types, corpus_dir):
+def _generate_global_boundary_seeds(used_types, corpus):
     """
     只为实际使用的类型生成全局边界值种子。
     不再为所有类型生成全量边界值。
+    corpus 为 CorpusDistiller，重复或消费结果相同的种子不写盘。
     """
     generated_files = []
 
@@ -1863,30 +1753,27 @@ def _generate_global_boundary_seeds(used_types, corpus_dir):
         seed_data.append(0)
         for t in sorted(used_types & int_types):
             _append_boundary_value(seed_data, t)
-        seed_path = corpus_dir / "boundary_int_min"
-        with open(seed_path, "wb") as f:
-            f.write(bytes(seed_data))
-        generated_files.append(str(seed_path))
+        seed_path, written = corpus.add("boundary_int_min", bytes(seed_data))
+        if written:
+            generated_files.append(str(seed_path))
 
     if has_uint:
         seed_data = bytearray()
         seed_data.append(0)
         for t in sorted(used_types & uint_types):
             _append_boundary_value(seed_data, t)
-        seed_path = corpus_dir / "boundary_uint_max"
-        with open(seed_path, "wb") as f:
-            f.write(bytes(seed_data))
-        generated_files.append(str(seed_path))
+        seed_path, written = corpus.add("boundary_uint_max", bytes(seed_data))
+        if written:
+            generated_files.append(str(seed_path))
 
     if has_float:
         seed_data = bytearray()
         seed_data.append(0)
         for t in sorted(used_types & float_types):
             _append_boundary_value(seed_data, t)
-        seed_path = corpus_dir / "boundary_float_max"
-        with open(seed_path, "wb") as f:
-            f.write(bytes(seed_data))
-        generated_files.append(str(seed_path))
+        seed_path, written = corpus.add("boundary_float_max", bytes(seed_data))
+        if written:
+            generated_files.append(str(seed_path))
 
         # float/double 特殊值（NaN, Inf）仅在有浮点类型时生成
         for fname, values in [
@@ -1899,35 +1786,33 @@ def _generate_global_boundary_seeds(used_types, corpus_dir):
                 seed_data = bytearray()
                 seed_data.append(0)
                 seed_data.extend(values)
-                seed_path = corpus_dir / fname
-                with open(seed_path, "wb") as f:
-                    f.write(bytes(seed_data))
-                generated_files.append(str(seed_path))
+                seed_path, written = corpus.add(fname, bytes(seed_data))
+                if written:
+                    generated_files.append(str(seed_path))
             elif "double" in fname and "double" in used_types:
                 seed_data = bytearray()
                 seed_data.append(0)
                 seed_data.extend(values)
-                seed_path = corpus_dir / fname
-                with open(seed_path, "wb") as f:
-                    f.write(bytes(seed_data))
-                generated_files.append(str(seed_path))
+                seed_path, written = corpus.add(fname, bytes(seed_data))
+                if written:
+                    generated_files.append(str(seed_path))
 
     if has_string:
         seed_data = bytearray()
         seed_data.append(0)
         seed_data.append(0)
-        seed_path = corpus_dir / "boundary_empty_string"
-        with open(seed_path, "wb") as f:
-            f.write(bytes(seed_data))
-        generated_files.append(str(seed_path))
+        seed_path, written = corpus.add("boundary_empty_string", bytes(seed_data))
+        if written:
+            generated_files.append(str(seed_path))
 
     return generated_files
 
 
-def _generate_biz_seeds(methods, corpus_dir):
+def _generate_biz_seeds(methods, corpus):
     """
     生成业务场景种子（仅针对有业务含义的方法）。
     根据方法名推断业务场景，避免无意义的笛卡尔积。
+    corpus 为 CorpusDistiller，重复或消费结果相同的种子不写盘。
     """
     generated_files = []
 
@@ -1955,10 +1840,9 @@ def _generate_biz_seeds(methods, corpus_dir):
                 param_list = _parse_params(params)
                 for param_type in param_list:
                     _append_param_seed(seed_data, param_type)
-            seed_path = corpus_dir / f"biz_{scenario}_{idx}"
-            with open(seed_path, "wb") as f:
-                f.write(bytes(seed_data))
-            generated_files.append(str(seed_path))
+            seed_path, written = corpus.add(f"biz_{scenario}_{idx}", bytes(seed_data))
+            if written:
+                generated_files.append(str(seed_path))
 
     return generated_files
 
@@ -2199,37 +2083,48 @@ def generate_structured_corpus(corpus_dir, corpus_type, repo):
         return []
 
 
-def run_verify_loop(cpp_file, check_script, max_rounds=3, extra_args=None):
-    import subprocess
+def run_verify_loop(cpp_file, max_rounds=3, expected_methods=None):
+    """
+    Stage 5 规范审查：在进程内调用 fuzz_check.check_file，不再为每轮检查启动子进程
 
+    参数:
+        expected_methods: 可选，批量拆分模式下当前 fuzzer 应覆盖的方法名列表（用于规则002）
+    返回: (轮次, 问题数, error_history)
+    """
     error_history = []
     total_errors = 0
 
     for round_num in range(1, max_rounds + 1):
         print(f"\n  [Verify Round {round_num}/{max_rounds}]")
 
-        cmd = [sys.executable, str(check_script), str(cpp_file)]
-        if extra_args:
-            cmd.extend(extra_args)
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-        )
+        try:
+            diagnostics = fuzz_check.check_file(
+                str(cpp_file), expected_methods=expected_methods
+            )
+        except Exception as e:
+            diagnostics = [
+                fuzz_check.Diagnostic(str(cpp_file), None, None, None, f"检查异常: {e}")
+            ]
 
-        if result.returncode == 0:
+        if not diagnostics:
             print(f"  [OK] 规范检查通过")
             # 记录通过状态
             error_history.append(
-                {"round": round_num, "errors": "", "count": 0, "status": "passed"}
+                {
+                    "round": round_num,
+                    "errors": "",
+                    "count": 0,
+                    "status": "passed",
+                    "diagnostics": [],
+                }
             )
             return (round_num, 0, error_history)
 
-        errors = result.stdout.strip()
-        error_count = len(errors.split("\n")) if errors else 0
+        error_count = len(diagnostics)
         total_errors = error_count
+        errors = "\n".join(
+            f"{i}. {d.message}" for i, d in enumerate(diagnostics, 1)
+        )
 
         error_history.append(
             {
@@ -2237,13 +2132,13 @@ def run_verify_loop(cpp_file, check_script, max_rounds=3, extra_args=None):
                 "errors": errors,
                 "count": error_count,
                 "status": "failed",
+                "diagnostics": [d._asdict() for d in diagnostics],
             }
         )
 
         print(f"  发现 {error_count} 个问题")
-        if errors:
-            for line in errors.split("\n")[:10]:
-                print(f"    {line}")
+        for line in errors.split("\n")[:10]:
+            print(f"    {line}")
 
         if round_num < max_rounds:
             print(f"  → 需要人工修复后继续检查")
@@ -2622,181 +2517,41 @@ def generate_compliance_report(
     return report_content
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="FUZZ测试用例快速生成工具",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-示例:
-  # 自动从头文件提取 public 方法并生成
-  python3 fuzz_generator.py -n SetScreenInfo_fuzzer -N Rosen -c RSInterfaces \
-      -H "rosen/modules/render_service_client/core/ui/rs_ui_director.h" \
-      --init-mode singleton -p ./test/fuzztest/
-
-    # 命令行生成（工厂模式）
-  python3 fuzz_generator.py -n RSTransitionEffect_fuzzer -N Rosen -c RSTransitionEffect \
-      -H "animation/rs_transition_effect.h" \
-      --init-mode factory -p ./test/fuzztest/
-        """,
-    )
-
-    parser.add_argument(
-        "-n", "--name", required=True, help="fuzzer名称（如：SetScreenInfo_fuzzer）"
-    )
-    parser.add_argument(
-        "-N", "--namespace", required=True, help="命名空间（如：Rosen）"
-    )
-    parser.add_argument(
-        "-c",
-        "--class",
-        dest="target_class",
-        required=True,
-        help="目标类名（如：RSInterfaces）",
-    )
-    parser.add_argument(
-        "-H",
-        "--header",
-        required=True,
-        help="目标头文件路径（如：rosen/.../rs_interfaces.h）",
-    )
-    parser.add_argument("-p", "--path", default="./", help="输出路径（默认：当前目录）")
-    parser.add_argument("-i", "--interactive", action="store_true", help="交互式模式")
-    parser.add_argument(
-        "--init-mode",
-        default=INIT_MODE_NONE,
-        choices=VALID_INIT_MODES,
-        help="初始化模式: singleton(单例), factory(工厂), none(按需创建, 默认)",
-    )
-    parser.add_argument(
-        "--module-path", default="graphic_2d/graphic_2d", help="module_output_path"
-    )
-    parser.add_argument(
-        "--full-path",
-        default="foundation/graphic/graphic_2d/rosen/test/render_service/fuzztest",
-        help="fuzz_config_file完整路径",
-    )
-    parser.add_argument(
-        "--include1",
-        default="foundation/graphic/graphic_2d/rosen/modules/render_service_client/core",
-        help="include_dirs路径1",
-    )
-    parser.add_argument(
-        "--include2",
-        default="foundation/graphic/graphic_2d/rosen/modules/render_service_base/include",
-        help="include_dirs路径2",
-    )
-    parser.add_argument(
-        "--dep-path",
-        default="foundation/graphic/graphic_2d/rosen/modules/render_service_client",
-        help="deps路径",
-    )
-    parser.add_argument(
-        "--dep-target", default="librender_service_client", help="deps目标名"
-    )
-    parser.add_argument(
-        "--corpus-type",
-        default="auto",
-        choices=[
-            "gltf",
-            "shader",
-            "systemgraph",
-            "postprocess",
-            "rscommand",
-            "ipc",
-            "auto",
-        ],
-        help="corpus类型，自动生成对应的结构化种子 (默认: auto自动选择)",
-    )
-    parser.add_argument(
-        "--repo",
-        default="graphic_2d",
-        choices=["graphic_2d", "graphic_3d"],
-        help="目标仓库，用于选择corpus生成器 (默认: graphic_2d)",
-    )
-    parser.add_argument(
-        "--max-fix-rounds",
-        default=3,
-        type=int,
-        help="Verify阶段自动修复的最大轮数 (默认: 3)",
-    )
-    parser.add_argument("--version", action="version", version="%(prog)s 2.0")
-
-    args = parser.parse_args()
-
-    # 只要显式指定了 -i，就进入交互式；否则按命令行参数处理
-    if args.interactive:
-        print("=" * 60)
-        print("FUZZ测试用例快速生成工具")
-        print("=" * 60)
-        print()
-
-        args.name = input("1. fuzzer名称（如：SetScreenInfo_fuzzer）: ").strip()
-        if not args.name:
-            print("错误: fuzzer名称不能为空")
-            sys.exit(1)
-
-        args.namespace = input("2. 命名空间（如：Rosen）: ").strip()
-        if not args.namespace:
-            print("错误: 命名空间不能为空")
-            sys.exit(1)
-
-        args.target_class = input("3. 目标类名（如：RSInterfaces）: ").strip()
-        if not args.target_class:
-            print("错误: 目标类名不能为空")
-            sys.exit(1)
-
-        args.header = input(
-            "4. 目标头文件路径（如：rosen/.../rs_interfaces.h）: "
-        ).strip()
-        if not args.header:
-            args.header = f"path/to/{args.target_class.lower()}.h"
-
-        print()
-        print("  初始化模式:")
-        print("    singleton - 通过 GetInstance() 获取全局单例")
-        print("    factory   - 通过 Create() 工厂方法创建实例")
-        print("    none      - 无全局实例，DoXXX中按需创建（默认）")
-        init_input = (
-            input("5. 初始化模式（singleton/factory/none，默认：none）: ")
-            .strip()
-            .lower()
-        )
-        if init_input in VALID_INIT_MODES:
-            args.init_mode = init_input
-        else:
-            args.init_mode = INIT_MODE_NONE
-
-        args.path = input(f"6. 输出路径（默认：{args.path}）: ").strip() or args.path
-
-        print()
-        print("生成配置：")
-        print(f"  fuzzer名称:    {args.name}")
-        print(f"  命名空间:      {args.namespace}")
-        print(f"  目标类:        {args.target_class}")
-        print(f"  头文件:        {args.header}")
-        print(f"  初始化模式:    {args.init_mode}")
-        print(f"  输出路径:      {args.path}")
-        print()
+def _fuzzer_result(name, fuzzer_dir, methods, error_history, report_file):
+    """单个 fuzzer 的生成结果摘要（批量模式汇总报告使用）"""
+    last = error_history[-1] if error_history else None
+    return {
+        "name": name,
+        "dir": str(fuzzer_dir),
+        "methods": len(methods),
+        "status": last["status"] if last else "unchecked",
+        "errors": last["count"] if last else None,
+        "report": str(report_file),
+    }
 
-        confirm = input("确认生成？(y/n): ").strip().lower()
-        if confirm != "y":
-            print("已取消")
-            return
 
-    valid, msg = validate_fuzzer_name(args.name)
-    if not valid:
-        print(f"错误: {msg}")
-        sys.exit(1)
+def generate_fuzzers(args, methods=None, ipc_info=None):
+    """
+    为一个目标类生成 fuzzer 工程（方法数超过 10 个时自动拆分），并执行 Verify 审查与合规报告
 
+    参数:
+        args: 命令行参数，或批量清单条目合并后的同名属性对象
+        methods: 可选，预先解析的 public 方法列表（批量模式由主进程解析一次后传入）
+        ipc_info: 可选，预先检测的 (is_ipc_stub, stub_class_name)
+    返回: 每个生成的 fuzzer 一项摘要的列表
+    """
     header_include = f'"{args.header.strip().strip(chr(34)).strip(chr(39))}"'
 
-    # 自动解析头文件中的 public 方法
+    # 自动解析头文件中的 public 方法（批量模式下由主进程预先解析后传入）
     # IPC stub 模式需要包含无参方法（OnRemoteRequest 需要覆盖所有接口）
-    is_ipc_stub, stub_class_name = _detect_ipc_stub(args.header, args.target_class)
-    include_no_params = bool(is_ipc_stub)
-    methods = parse_header_methods(
-        args.header, args.target_class, include_no_params=include_no_params
-    )
+    if ipc_info is None:
+        ipc_info = _detect_ipc_stub(args.header, args.target_class)
+    is_ipc_stub, stub_class_name = ipc_info
+    if methods is None:
+        methods = parse_header_methods(
+            args.header, args.target_class, include_no_params=bool(is_ipc_stub)
+        )
+    results = []
     if not methods:
         print("警告: 未能从头文件中解析出 public 方法，将生成仅含 2 个占位方法的骨架")
         methods = [
@@ -2895,7 +2650,9 @@ def main():
 
             # 生成语义化种子
             print(f"\n    生成语义化种子...")
-            seed_files = generate_semantic_seeds(batch_methods, batch_corpus_dir)
+            seed_files = generate_semantic_seeds(
+                batch_methods, batch_corpus_dir, fdp_layout=not is_ipc_stub
+            )
             for seed_file in seed_files:
                 print(f"    生成种子: {seed_file}")
 
@@ -2905,19 +2662,17 @@ def main():
             print(f"  检查文件: {cpp_file}")
             print("  " + "-" * 60)
 
-            check_script = Path(__file__).parent / "fuzz_check.py"
             error_history = []
 
-            if check_script.exists():
+            if fuzz_check is not None:
                 batch_method_names = [m[0] for m in batch_methods]
                 pass_rounds, total_errors, error_history = run_verify_loop(
                     cpp_file,
-                    check_script,
                     args.max_fix_rounds,
-                    extra_args=["--expected-methods", ",".join(batch_method_names)],
+                    expected_methods=batch_method_names,
                 )
             else:
-                print(f"  检查工具未找到: {check_script}")
+                print("  检查工具未找到: fuzz_check.py")
 
             # Stage 6 - Review (合规报告)
             print(f"\n  [Stage 6 - Review 合规报告]")
@@ -2936,6 +2691,15 @@ def main():
                 corpus_files=seed_files if "seed_files" in locals() else None,
                 manual_verify_types=batch_manual_verify_types,
             )
+            results.append(
+                _fuzzer_result(
+                    batch_fuzzer_name,
+                    batch_fuzzer_dir,
+                    batch_methods,
+                    error_history,
+                    report_file,
+                )
+            )
 
             print()
     else:
@@ -3007,7 +2771,9 @@ def main():
 
         if not corpus_files:
             print(f"  使用内置简单种子...")
-            seed_files = generate_semantic_seeds(methods, corpus_dir)
+            seed_files = generate_semantic_seeds(
+                methods, corpus_dir, fdp_layout=not is_ipc_stub
+            )
             for seed_file in seed_files:
                 print(f"    生成种子: {seed_file}")
         else:
@@ -3025,15 +2791,14 @@ def main():
         print(f"  检查文件: {cpp_file}")
         print("-" * 60)
 
-        check_script = Path(__file__).parent / "fuzz_check.py"
         error_history = []
 
-        if check_script.exists():
+        if fuzz_check is not None:
             pass_rounds, total_errors, error_history = run_verify_loop(
-                cpp_file, check_script, args.max_fix_rounds
+                cpp_file, args.max_fix_rounds
             )
         else:
-            print(f"  检查工具未找到: {check_script}")
+            print("  检查工具未找到: fuzz_check.py")
 
         # Stage 6 - Review (合规报告)
         print(f"\n  [Stage 6 - Review 合规报告]")
@@ -3058,6 +2823,9 @@ def main():
             corpus_files=all_seed_files if all_seed_files else None,
             manual_verify_types=single_manual_verify_types,
         )
+        results.append(
+            _fuzzer_result(args.name, fuzzer_dir, methods, error_history, report_file)
+        )
 
         print()
         print("下一步：")
@@ -3069,6 +2837,432 @@ def main():
         )
         print()
 
+    return results
+
+
+# 批量清单条目可覆盖的命令行参数（清单键名 -> args 属性名）
+MANIFEST_FIELDS = {
+    "name": "name",
+    "namespace": "namespace",
+    "class": "target_class",
+    "header": "header",
+    "init_mode": "init_mode",
+    "path": "path",
+    "module_path": "module_path",
+    "full_path": "full_path",
+    "include1": "include1",
+    "include2": "include2",
+    "dep_path": "dep_path",
+    "dep_target": "dep_target",
+    "corpus_type": "corpus_type",
+    "repo": "repo",
+}
+BATCH_REPORT_NAME = "FUZZ批量生成汇总报告.md"
+
+
+def load_manifest(manifest_path, defaults):
+    """
+    读取批量生成清单（JSON 数组），每项必须包含 header、class、namespace，
+    可选 init_mode、name（默认 {class}_fuzzer，不可重复）及其他 MANIFEST_FIELDS 中的参数，未指定的取命令行参数
+
+    返回: (entries, errors)，entries 为每项合并后的 argparse.Namespace，errors 为无效条目的说明
+    """
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    if not isinstance(items, list):
+        raise ValueError("清单格式错误: 顶层应为 JSON 数组")
+
+    entries = []
+    errors = []
+    seen_names = {}
+    for idx, item in enumerate(items, 1):
+        if not isinstance(item, dict):
+            errors.append(f"第 {idx} 项不是 JSON 对象")
+            continue
+        missing = [key for key in ("header", "class", "namespace") if not item.get(key)]
+        if missing:
+            errors.append(f"第 {idx} 项缺少字段: {', '.join(missing)}")
+            continue
+        unknown = sorted(set(item) - set(MANIFEST_FIELDS))
+        if unknown:
+            errors.append(f"第 {idx} 项包含未知字段: {', '.join(unknown)}")
+            continue
+
+        entry = argparse.Namespace(**vars(defaults))
+        for key, attr in MANIFEST_FIELDS.items():
+            if key in item:
+                setattr(entry, attr, item[key])
+        if "name" not in item:
+            entry.name = f"{entry.target_class}_fuzzer"
+        if entry.init_mode not in VALID_INIT_MODES:
+            errors.append(f"第 {idx} 项 init_mode 无效: {entry.init_mode}")
+            continue
+        valid, msg = validate_fuzzer_name(entry.name)
+        if not valid:
+            errors.append(f"第 {idx} 项: {msg}")
+            continue
+        # 同名 fuzzer 会输出到同一目录并互相覆盖
+        if entry.name in seen_names:
+            errors.append(
+                f"第 {idx} 项 name 与第 {seen_names[entry.name]} 项重复: {entry.name}"
+            )
+            continue
+        seen_names[entry.name] = idx
+        entries.append(entry)
+    return entries, errors
+
+
+def _init_batch_worker(templates, include_index):
+    """批量模式 worker 初始化：直接使用主进程加载好的模板与 include 后缀索引"""
+    _TEMPLATE_CACHE.update(templates)
+    header_index.init_worker(include_index)
+
+
+def _generate_batch_entry(job):
+    """批量模式单个清单条目：输出先缓存，由主进程按清单顺序统一打印，避免多进程输出交错"""
+    entry, methods, ipc_info = job
+    log = io.StringIO()
+    results = []
+    error = None
+    with contextlib.redirect_stdout(log):
+        try:
+            results = generate_fuzzers(entry, methods, ipc_info)
+        except (Exception, SystemExit) as e:
+            error = f"{type(e).__name__}: {e}"
+    return log.getvalue(), results, error
+
+
+def write_batch_report(entries, outcomes, errors, report_file):
+    """生成批量模式汇总报告（Markdown），列出每个 fuzzer 的规范检查结果和单项报告位置"""
+    from datetime import datetime
+
+    fuzzer_count = sum(len(results) for results, _ in outcomes)
+    passed = sum(
+        1 for results, _ in outcomes for r in results if r["status"] == "passed"
+    )
+    failed_entries = sum(1 for _, error in outcomes if error)
+
+    lines = ["# FUZZ批量生成汇总报告", ""]
+    lines.append(f"- **生成时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    lines.append(f"- **清单条目数**: {len(entries) + len(errors)}")
+    lines.append(f"- **生成 fuzzer 数**: {fuzzer_count}")
+    lines.append(f"- **规范检查通过**: {passed}/{fuzzer_count}")
+    if failed_entries or errors:
+        lines.append(f"- **失败条目数**: {failed_entries + len(errors)}")
+    lines.append("")
+
+    lines.append("## 一、生成结果")
+    lines.append("")
+    lines.append("| 序号 | 目标类 | Fuzzer | 接口数 | 规范检查 | 剩余问题 | 单项报告 |")
+    lines.append("|------|--------|--------|--------|----------|----------|----------|")
+    idx = 0
+    for entry, (results, error) in zip(entries, outcomes):
+        if error:
+            idx += 1
+            lines.append(
+                f"| {idx} | `{entry.target_class}` | `{entry.name}` | - | 生成失败 | {error} | - |"
+            )
+            continue
+        for r in results:
+            idx += 1
+            status = {"passed": "通过", "failed": "未通过"}.get(r["status"], "未检查")
+            remaining = "-" if r["errors"] is None else r["errors"]
+            lines.append(
+                f"| {idx} | `{entry.target_class}` | `{r['name']}` | {r['methods']} | "
+                f"{status} | {remaining} | `{r['report']}` |"
+            )
+    lines.append("")
+
+    if errors:
+        lines.append("## 二、无效清单条目")
+        lines.append("")
+        for msg in errors:
+            lines.append(f"- {msg}")
+        lines.append("")
+
+    Path(report_file).parent.mkdir(parents=True, exist_ok=True)
+    Path(report_file).write_text("\n".join(lines), encoding="utf-8")
+    return report_file
+
+
+def run_batch(args):
+    """
+    批量模式：按清单为多个目标类生成 fuzzer
+
+    - 模板只加载一次，通过进程池 initializer 下发
+    - 每个 (头文件, 类) 只在主进程解析一次，解析结果随任务传给 worker
+    - 各条目并行生成并执行 Verify，最后输出一份汇总报告
+    """
+    try:
+        entries, errors = load_manifest(args.manifest, args)
+    except (OSError, ValueError) as e:
+        print(f"错误: 无法读取清单 {args.manifest}: {e}")
+        sys.exit(1)
+    for msg in errors:
+        print(f"[WARN] 跳过无效清单条目: {msg}")
+    if not entries:
+        print("错误: 清单中没有有效条目")
+        sys.exit(1)
+
+    templates = {
+        f.name: read_template(f.name) for f in TEMPLATE_DIR.iterdir() if f.is_file()
+    }
+
+    parsed = {}
+    jobs = []
+    for entry in entries:
+        key = (entry.header, entry.target_class)
+        if key not in parsed:
+            ipc_info = _detect_ipc_stub(entry.header, entry.target_class)
+            methods = parse_header_methods(
+                entry.header, entry.target_class, include_no_params=bool(ipc_info[0])
+            )
+            parsed[key] = (methods, ipc_info)
+        jobs.append((entry,) + parsed[key])
+
+    workers = args.jobs or os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+    print(f"批量生成 {len(jobs)} 个目标类（{workers} 个并行任务）")
+
+    outcomes = []
+    if workers == 1:
+        job_results = map(_generate_batch_entry, jobs)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_batch_worker,
+            initargs=(templates, header_index.warm_include_index()),
+        )
+        job_results = pool.map(_generate_batch_entry, jobs)
+    try:
+        for entry, (log, results, error) in zip(entries, job_results):
+            print("=" * 60)
+            print(f"[{entry.target_class}] {entry.name}")
+            print("=" * 60)
+            print(log, end="")
+            if error:
+                print(f"[FAIL] 生成失败: {error}")
+            outcomes.append((results, error))
+    finally:
+        if workers > 1:
+            pool.shutdown()
+
+    report_file = Path(args.path) / BATCH_REPORT_NAME
+    write_batch_report(entries, outcomes, errors, report_file)
+
+    fuzzer_count = sum(len(results) for results, _ in outcomes)
+    passed = sum(
+        1 for results, _ in outcomes for r in results if r["status"] == "passed"
+    )
+    print()
+    print(f"批量生成完成: {fuzzer_count} 个 fuzzer，规范检查通过 {passed} 个")
+    print(f"汇总报告: {report_file}")
+    if errors or any(error for _, error in outcomes):
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="FUZZ测试用例快速生成工具",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+示例:
+  # 自动从头文件提取 public 方法并生成
+  python3 fuzz_generator.py -n SetScreenInfo_fuzzer -N Rosen -c RSInterfaces \
+      -H "rosen/modules/render_service_client/core/ui/rs_ui_director.h" \
+      --init-mode singleton -p ./test/fuzztest/
+
+    # 命令行生成（工厂模式）
+  python3 fuzz_generator.py -n RSTransitionEffect_fuzzer -N Rosen -c RSTransitionEffect \
+      -H "animation/rs_transition_effect.h" \
+      --init-mode factory -p ./test/fuzztest/
+
+  # 批量模式：按清单并行生成多个目标类，输出汇总报告
+  #   manifest.json: [{"header": "xxx.h", "class": "Xxx", "namespace": "Rosen", "init_mode": "singleton"}, ...]
+  python3 fuzz_generator.py --manifest manifest.json -j 8 -p ./test/fuzztest/
+        """
+        + header_index.ENV_HELP,
+    )
+
+    parser.add_argument(
+        "-n", "--name", help="fuzzer名称（如：SetScreenInfo_fuzzer）"
+    )
+    parser.add_argument(
+        "-N", "--namespace", help="命名空间（如：Rosen）"
+    )
+    parser.add_argument(
+        "-c",
+        "--class",
+        dest="target_class",
+        help="目标类名（如：RSInterfaces）",
+    )
+    parser.add_argument(
+        "-H",
+        "--header",
+        help="目标头文件路径（如：rosen/.../rs_interfaces.h）",
+    )
+    parser.add_argument("-p", "--path", default="./", help="输出路径（默认：当前目录）")
+    parser.add_argument("-i", "--interactive", action="store_true", help="交互式模式")
+    parser.add_argument(
+        "--init-mode",
+        default=INIT_MODE_NONE,
+        choices=VALID_INIT_MODES,
+        help="初始化模式: singleton(单例), factory(工厂), none(按需创建, 默认)",
+    )
+    parser.add_argument(
+        "--module-path", default="graphic_2d/graphic_2d", help="module_output_path"
+    )
+    parser.add_argument(
+        "--full-path",
+        default="foundation/graphic/graphic_2d/rosen/test/render_service/fuzztest",
+        help="fuzz_config_file完整路径",
+    )
+    parser.add_argument(
+        "--include1",
+        default="foundation/graphic/graphic_2d/rosen/modules/render_service_client/core",
+        help="include_dirs路径1",
+    )
+    parser.add_argument(
+        "--include2",
+        default="foundation/graphic/graphic_2d/rosen/modules/render_service_base/include",
+        help="include_dirs路径2",
+    )
+    parser.add_argument(
+        "--dep-path",
+        default="foundation/graphic/graphic_2d/rosen/modules/render_service_client",
+        help="deps路径",
+    )
+    parser.add_argument(
+        "--dep-target", default="librender_service_client", help="deps目标名"
+    )
+    parser.add_argument(
+        "--corpus-type",
+        default="auto",
+        choices=[
+            "gltf",
+            "shader",
+            "systemgraph",
+            "postprocess",
+            "rscommand",
+            "ipc",
+            "auto",
+        ],
+        help="corpus类型，自动生成对应的结构化种子 (默认: auto自动选择)",
+    )
+    parser.add_argument(
+        "--repo",
+        default="graphic_2d",
+        choices=["graphic_2d", "graphic_3d"],
+        help="目标仓库，用于选择corpus生成器 (默认: graphic_2d)",
+    )
+    parser.add_argument(
+        "--max-fix-rounds",
+        default=3,
+        type=int,
+        help="Verify阶段自动修复的最大轮数 (默认: 3)",
+    )
+    parser.add_argument(
+        "--manifest",
+        help="批量模式清单（JSON 数组，每项含 header/class/namespace，可选 init_mode/name 等），"
+        "指定后忽略 -n/-N/-c/-H",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        help="批量模式并行进程数（默认: 0 表示 CPU 核数）",
+    )
+    parser.add_argument("--version", action="version", version="%(prog)s 2.0")
+
+    args = parser.parse_args()
+
+    if args.manifest:
+        run_batch(args)
+        return
+    if not args.interactive:
+        missing = [
+            flag
+            for flag, value in (
+                ("-n/--name", args.name),
+                ("-N/--namespace", args.namespace),
+                ("-c/--class", args.target_class),
+                ("-H/--header", args.header),
+            )
+            if not value
+        ]
+        if missing:
+            parser.error(f"缺少必需参数: {', '.join(missing)}（或使用 --manifest 批量模式）")
+
+    # 只要显式指定了 -i，就进入交互式；否则按命令行参数处理
+    if args.interactive:
+        print("=" * 60)
+        print("FUZZ测试用例快速生成工具")
+        print("=" * 60)
+        print()
+
+        args.name = input("1. fuzzer名称（如：SetScreenInfo_fuzzer）: ").strip()
+        if not args.name:
+            print("错误: fuzzer名称不能为空")
+            sys.exit(1)
+
+        args.namespace = input("2. 命名空间（如：Rosen）: ").strip()
+        if not args.namespace:
+            print("错误: 命名空间不能为空")
+            sys.exit(1)
+
+        args.target_class = input("3. 目标类名（如：RSInterfaces）: ").strip()
+        if not args.target_class:
+            print("错误: 目标类名不能为空")
+            sys.exit(1)
+
+        args.header = input(
+            "4. 目标头文件路径（如：rosen/.../rs_interfaces.h）: "
+        ).strip()
+        if not args.header:
+            args.header = f"path/to/{args.target_class.lower()}.h"
+
+        print()
+        print("  初始化模式:")
+        print("    singleton - 通过 GetInstance() 获取全局单例")
+        print("    factory   - 通过 Create() 工厂方法创建实例")
+        print("    none      - 无全局实例，DoXXX中按需创建（默认）")
+        init_input = (
+            input("5. 初始化模式（singleton/factory/none，默认：none）: ")
+            .strip()
+            .lower()
+        )
+        if init_input in VALID_INIT_MODES:
+            args.init_mode = init_input
+        else:
+            args.init_mode = INIT_MODE_NONE
+
+        args.path = input(f"6. 输出路径（默认：{args.path}）: ").strip() or args.path
+
+        print()
+        print("生成配置：")
+        print(f"  fuzzer名称:    {args.name}")
+        print(f"  命名空间:      {args.namespace}")
+        print(f"  目标类:        {args.target_class}")
+        print(f"  头文件:        {args.header}")
+        print(f"  初始化模式:    {args.init_mode}")
+        print(f"  输出路径:      {args.path}")
+        print()
+
+        confirm = input("确认生成？(y/n): ").strip().lower()
+        if confirm != "y":
+            print("已取消")
+            return
+
+    valid, msg = validate_fuzzer_name(args.name)
+    if not valid:
+        print(f"错误: {msg}")
+        sys.exit(1)
+
+    generate_fuzzers(args)
+
 
 if __name__ == "__main__":
     main()
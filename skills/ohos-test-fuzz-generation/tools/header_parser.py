@@ -18,6 +18,12 @@ if sys.platform == "win32":
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8")
     os.environ["PYTHONIOENCODING"] = "utf-8"
 
+# 头文件解析索引（与 fuzz_generator、fuzz_check 规则002 共用）
+check_scripts_dir = os.path.join(os.path.dirname(__file__), "..", "check_scripts")
+if check_scripts_dir not in sys.path:
+    sys.path.insert(0, check_scripts_dir)
+import header_index
+
 
 class HeaderParser:
     """增强版头文件解析器"""
@@ -28,18 +34,12 @@ class HeaderParser:
 
     def _read_and_preprocess(self) -> str:
         """读取文件并进行预处理"""
-        try:
-            with open(self.header_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
-        except Exception as e:
-            print(f"[WARN] 无法读取头文件: {e}")
+        if not os.access(self.header_path, os.R_OK):
+            print(f"[WARN] 无法读取头文件: {self.header_path}")
             return ""
 
-        # 1. 移除单行注释
-        content = re.sub(r"//[^\n]*", "", content)
-
-        # 2. 移除多行注释
-        content = re.sub(r"/\*.*?\*/", "", content, flags=re.DOTALL)
+        # 1-2. 读取并移除单行/多行注释（共享头文件索引，同一文件只读取一次）
+        content = header_index.get_index().source(self.header_path)
 
         # 3. 处理续行
         content = re.sub(r"\\\s*\n", " ", content)
@@ -470,6 +470,10 @@ class HeaderParser:
         return t
 
 
+# 增强解析器版本：写入共享索引的查询名，HeaderParser 修改后持久化的旧结果不再命中
+PARSER_VERSION = header_index.source_digest(HeaderParser)
+
+
 def parse_header_methods_enhanced(
     header_path: str, target_class: str, include_no_params: bool = False
 ) -> List[Tuple[str, str, str]]:
@@ -487,8 +491,15 @@ def parse_header_methods_enhanced(
         print(f"[WARN] 头文件不存在: {header_path}")
         return []
 
-    parser = HeaderParser(header_path)
-    methods = parser.parse_class(target_class, include_no_params=include_no_params)
+    # 解析结果按 (头文件版本, 解析器版本, 类名, include_no_params) 记忆化，重复查询不再预处理头文件
+    methods = header_index.get_index().query(
+        header_path,
+        f"enhanced:{PARSER_VERSION}:{target_class}:{int(include_no_params)}",
+        lambda: HeaderParser(header_path).parse_class(
+            target_class, include_no_params=include_no_params
+        ),
+    )
+    methods = [tuple(m) for m in methods]
 
     if methods:
         print(f"[OK] 从头文件解析到 {len(methods)} 个 public 有参方法")
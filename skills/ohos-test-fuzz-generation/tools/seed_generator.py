@@ -12,13 +12,15 @@ FUZZ种子与语料生成工具 (增强版 v2.0)
 - 完整边界值集合（含浮点特殊值 NaN/Inf/-Inf）
 - 智能语义推断（基于参数名称如 screenId、width、callback）
 - 增强字典生成（魔数、协议关键字、安全测试字符串）
-- 笛卡尔积组合种子生成
+- 组合种子生成（pairwise 覆盖 / 分层随机采样 / 笛卡尔积，流式写盘）
 - 畸形数据测试种子
+- 语料精简（写盘前内容去重 + 按 FuzzedDataProvider 消费结果归并）
 
 用法：
     # Seed模式 - 通用种子
     python3 seed_generator.py seed -t json -o corpus/init.json
     python3 seed_generator.py seed --analyze path/to/fuzzer.cpp -o corpus/
+    python3 seed_generator.py seed --combo pairwise -p '[{"name":"width","type":"int32_t"}]' -o corpus/
 
     # Corpus模式 - 领域特定语料
     python3 seed_generator.py corpus --repo graphic_2d --type rscommand --output ./corpus/
@@ -33,13 +35,14 @@ import json
 import struct
 import re
 import math
+import hashlib
 import itertools
 import random
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple, Any, Callable
 
-# Windows兼容性：强制UTF-8编码
-if sys.platform == "win32":
+# Windows兼容性：强制UTF-8编码（仅命令行运行时；被 fuzz_generator 导入时不替换调用方的输出流）
+if sys.platform == "win32" and __name__ == "__main__":
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8")
     os.environ["PYTHONIOENCODING"] = "utf-8"
@@ -521,22 +524,23 @@ def pack_value(param_type: str, value: Any) -> bytes:
 
     if "bool" in type_lower:
         return struct.pack("<?", bool(value))
-    elif "int8" in type_lower or type_lower == "char":
-        return struct.pack("<b", int(value))
+    # 无符号类型先于有符号类型判断（"int8" 是 "uint8_t" 的子串）
     elif "uint8" in type_lower or "unsigned char" in type_lower:
         return struct.pack("<B", int(value) & 0xFF)
-    elif "int16" in type_lower or "short" in type_lower:
-        return struct.pack("<h", int(value))
+    elif "int8" in type_lower or type_lower == "char":
+        return struct.pack("<b", int(value))
     elif "uint16" in type_lower or "unsigned short" in type_lower:
         return struct.pack("<H", int(value) & 0xFFFF)
-    elif "int32" in type_lower or type_lower == "int":
-        return struct.pack("<i", int(value))
+    elif "int16" in type_lower or "short" in type_lower:
+        return struct.pack("<h", int(value))
     elif "uint32" in type_lower or "unsigned int" in type_lower:
         return struct.pack("<I", int(value) & 0xFFFFFFFF)
-    elif "int64" in type_lower or "long long" in type_lower:
-        return struct.pack("<q", int(value))
+    elif "int32" in type_lower or type_lower == "int":
+        return struct.pack("<i", int(value))
     elif "uint64" in type_lower or "unsigned long long" in type_lower:
         return struct.pack("<Q", int(value) & 0xFFFFFFFFFFFFFFFF)
+    elif "int64" in type_lower or "long long" in type_lower:
+        return struct.pack("<q", int(value))
     elif "float" in type_lower and "double" not in type_lower:
         return struct.pack("<f", float(value))
     elif "double" in type_lower:
@@ -550,25 +554,123 @@ def pack_value(param_type: str, value: Any) -> bytes:
         return struct.pack("<I", int(value))
 
 
+COMBO_STRATEGIES = ["pairwise", "stratified", "cartesian"]
+
+
+def _pairwise_combos(value_counts):
+    """
+    贪心构造 pairwise 覆盖数组：每轮从一个未覆盖的取值对出发，其余参数依次选择
+    新覆盖取值对最多的值，直到任意两参数的所有取值对都至少出现一次
+
+    内存只与未覆盖取值对数量相关（每参数最多 4 个取值时为 O(16·n²)），组合逐个产出
+    """
+    n = len(value_counts)
+    if n <= 1:
+        for idx in range(value_counts[0] if n else 1):
+            yield (idx,) if n else ()
+        return
+
+    uncovered = {
+        (i, a, j, b)
+        for i in range(n)
+        for j in range(i + 1, n)
+        for a in range(value_counts[i])
+        for b in range(value_counts[j])
+    }
+    while uncovered:
+        i, a, j, b = min(uncovered)
+        combo = [None] * n
+        combo[i], combo[j] = a, b
+        for k in range(n):
+            if combo[k] is not None:
+                continue
+            best_value, best_gain = 0, -1
+            for v in range(value_counts[k]):
+                gain = sum(
+                    1
+                    for m in range(n)
+                    if combo[m] is not None
+                    and ((m, combo[m], k, v) if m < k else (k, v, m, combo[m]))
+                    in uncovered
+                )
+                if gain > best_gain:
+                    best_value, best_gain = v, gain
+            combo[k] = best_value
+        for x in range(n):
+            for y in range(x + 1, n):
+                uncovered.discard((x, combo[x], y, combo[y]))
+        yield tuple(combo)
+
+
+def _stratified_combos(value_counts, rng):
+    """
+    分层随机采样：每个参数独立打乱取值顺序并循环使用，保证每个取值出现次数均衡，
+    参数之间的组合随机；无限产出，由调用方截断
+    """
+    orders = [[] for _ in value_counts]
+    while True:
+        combo = []
+        for k, count in enumerate(value_counts):
+            if not orders[k]:
+                orders[k] = list(range(count))
+                rng.shuffle(orders[k])
+            combo.append(orders[k].pop())
+        yield tuple(combo)
+
+
 def generate_cartesian_seeds(
-    params: List[Dict], output_dir: str, max_combinations: int = 30
+    params: List[Dict],
+    output_dir: str,
+    max_combinations: int = 30,
+) -> List[str]:
+    """
+    生成笛卡尔积组合种子（按字典序枚举，等价于 strategy="cartesian" 的 generate_combination_seeds）
+
+    Args:
+        params: 参数列表 [{"name": "xxx", "type": "xxx"}, ...]
+        output_dir: 输出目录
+        max_combinations: 最大组合数量（默认 30，避免过度膨胀）
+
+    Returns:
+        生成的种子文件路径列表
+    """
+    return generate_combination_seeds(
+        params, output_dir, max_combinations, strategy="cartesian"
+    )
+
+
+def generate_combination_seeds(
+    params: List[Dict],
+    output_dir: str,
+    max_combinations: int = 30,
+    strategy: str = "pairwise",
+    rng_seed: int = 0,
 ) -> List[str]:
     """
-    使用笛卡尔积生成组合种子
+    按组合策略生成参数取值组合种子
 
     优化:
     - 默认 max_combinations 从 100 降至 30
-    - 按内容 hash 去重
+    - 按内容 hash 去重（8 字节 blake2b 摘要，内存占用与种子数量线性相关且很小）
     - 限制每个参数的取值数量（最多 4 个）
+    - 组合逐个产出并立即写盘，不在内存中展开笛卡尔积
 
     Args:
         params: 参数列表 [{"name": "xxx", "type": "xxx"}, ...]
         output_dir: 输出目录
         max_combinations: 最大组合数量（默认 30，避免过度膨胀）
+        strategy: 组合策略
+            pairwise   - 任意两参数的取值对全覆盖后停止（默认，相同种子数下覆盖最好）
+            stratified - 分层随机采样，每个参数的取值均衡出现
+            cartesian  - 按字典序枚举笛卡尔积（前若干个种子只变化最后一个参数）
+        rng_seed: stratified 模式的随机种子，保证结果可复现
 
     Returns:
         生成的种子文件路径列表
     """
+    if strategy not in COMBO_STRATEGIES:
+        raise ValueError(f"不支持的组合策略: {strategy}")
+
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
@@ -578,43 +680,47 @@ def generate_cartesian_seeds(
         param_type = param.get("type", "int32_t")
 
         values = infer_value_from_param_name(param_name, param_type)
-        if values is None:
+        if not values:
             boundary_seeds = generate_boundary_seed_for_type(param_type)
             if boundary_seeds:
                 values = boundary_seeds[:4]
             else:
                 values = [pack_value(param_type, 0), pack_value(param_type, 1)]
 
-        # 限制每个参数的取值数量，防止笛卡尔积爆炸
-        values = values[:4]
-        param_value_lists.append(values)
+        # 限制每个参数的取值数量，防止组合爆炸；取值预先打包为字节
+        param_value_lists.append(
+            [
+                val if isinstance(val, bytes) else pack_value(param_type, val)
+                for val in values[:4]
+            ]
+        )
+
+    value_counts = [len(values) for values in param_value_lists]
+    if strategy == "pairwise":
+        combos = _pairwise_combos(value_counts)
+    elif strategy == "stratified":
+        combos = _stratified_combos(value_counts, random.Random(rng_seed))
+    else:
+        combos = itertools.product(*[range(count) for count in value_counts])
 
     generated_files = []
     seen_hashes = set()
     combo_count = 0
+    # stratified 模式无限产出，连续重复过多时说明取值空间已耗尽
+    max_attempts = max_combinations * 20
 
-    for combo in itertools.product(*param_value_lists):
-        if combo_count >= max_combinations:
+    for attempt, combo in enumerate(combos):
+        if combo_count >= max_combinations or attempt >= max_attempts:
             break
 
         seed = bytearray()
         seed.append(0)
-        for val_bytes in combo:
-            if isinstance(val_bytes, bytes):
-                seed.extend(val_bytes)
-            else:
-                seed.extend(
-                    pack_value(
-                        params[combo_count % len(params)].get("type", "int32_t"),
-                        val_bytes,
-                    )
-                )
+        for k, idx in enumerate(combo):
+            seed.extend(param_value_lists[k][idx])
 
         # 去重：跳过内容相同的种子
         seed_bytes = bytes(seed)
-        import hashlib
-
-        seed_hash = hashlib.md5(seed_bytes).hexdigest()
+        seed_hash = hashlib.blake2b(seed_bytes, digest_size=8).digest()
         if seed_hash in seen_hashes:
             continue
         seen_hashes.add(seed_hash)
@@ -879,6 +985,182 @@ def generate_seeds_from_analysis(
     return generated_files
 
 
+# ============================================================================
+# 语料精简 - 写盘前去重与消费模式归并
+# ============================================================================
+
+# FuzzedDataProvider 整型消费的 (字节数, 是否有符号)
+FDP_INTEGRAL_TYPES = {
+    "bool": (1, False),
+    "char": (1, True),
+    "int8_t": (1, True),
+    "uint8_t": (1, False),
+    "int16_t": (2, True),
+    "uint16_t": (2, False),
+    "int": (4, True),
+    "int32_t": (4, True),
+    "uint32_t": (4, False),
+    "int64_t": (8, True),
+    "uint64_t": (8, False),
+    "size_t": (8, False),
+}
+
+
+def _to_float32(value: float) -> float:
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+
+class FuzzedDataProvider:
+    """
+    libFuzzer FuzzedDataProvider 的 Python 复刻（仅生成的 fuzzer 用到的接口），
+    与 C++ 实现逐字节一致：整型/浮点从数据尾部消费，字符串从头部消费
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.start = 0
+        self.end = len(data)
+
+    def remaining_bytes(self) -> int:
+        return self.end - self.start
+
+    def _consume_range(self, size: int, range_: int) -> int:
+        """ConsumeIntegralInRange 的核心：返回相对 min 的偏移量"""
+        result = 0
+        offset = 0
+        while offset < size * 8 and (range_ >> offset) > 0 and self.end > self.start:
+            self.end -= 1
+            result = (result << 8) | self.data[self.end]
+            offset += 8
+        if range_ != (1 << 64) - 1:
+            result %= range_ + 1
+        return result
+
+    def consume_integral(self, type_name: str = "uint8_t") -> int:
+        size, signed = FDP_INTEGRAL_TYPES[type_name]
+        lowest = -(1 << (size * 8 - 1)) if signed else 0
+        return lowest + self._consume_range(size, (1 << (size * 8)) - 1)
+
+    def consume_integral_in_range(self, type_name: str, low: int, high: int) -> int:
+        size, _ = FDP_INTEGRAL_TYPES[type_name]
+        return low + self._consume_range(size, high - low)
+
+    def consume_bool(self) -> bool:
+        return bool(1 & self.consume_integral("uint8_t"))
+
+    def consume_floating_point(self, type_name: str = "double") -> float:
+        if type_name == "float":
+            lowest, highest = -3.4028234663852886e38, 3.4028234663852886e38
+            rnd, int_type = _to_float32, "uint32_t"
+        else:
+            lowest, highest = -sys.float_info.max, sys.float_info.max
+            rnd, int_type = float, "uint64_t"
+        # 范围跨越 0 且溢出时分两半：先消费一个 bool 选择上/下半区
+        range_ = rnd(highest / 2.0 - lowest / 2.0)
+        result = lowest
+        if self.consume_bool():
+            result = rnd(result + range_)
+        size, _ = FDP_INTEGRAL_TYPES[int_type]
+        probability = rnd(
+            rnd(float(self.consume_integral(int_type))) / rnd(float((1 << (size * 8)) - 1))
+        )
+        return rnd(result + rnd(range_ * probability))
+
+    def consume_random_length_string(self, max_length: int = 256) -> bytes:
+        result = bytearray()
+        while len(result) < max_length and self.end > self.start:
+            ch = self.data[self.start]
+            self.start += 1
+            # 反斜杠转义："\\" 表示一个反斜杠，"\" 后跟其他字符表示字符串结束
+            if ch == 0x5C and self.end > self.start:
+                ch = self.data[self.start]
+                self.start += 1
+                if ch != 0x5C:
+                    break
+            result.append(ch)
+        return bytes(result)
+
+    def consume(self, method: str, template: Optional[str] = None, arg: str = ""):
+        """
+        按生成代码中的调用名执行一次消费，返回可哈希的消费结果
+
+        不支持的调用抛出 ValueError，调用方应停止解码并保守地保留剩余原始字节
+        """
+        template = (template or "").strip()
+        if method == "ConsumeBool":
+            return self.consume_bool()
+        if method == "ConsumeIntegral" and template in FDP_INTEGRAL_TYPES:
+            return self.consume_integral(template)
+        if method == "ConsumeFloatingPoint" and template in ("float", "double"):
+            value = self.consume_floating_point(template)
+            # 以位模式作为结果，使 NaN 与 -0.0 也能精确比较
+            return struct.pack("<f" if template == "float" else "<d", value)
+        if method == "ConsumeRandomLengthString":
+            max_length = int(arg) if arg.strip().isdigit() else (1 << 64) - 1
+            return self.consume_random_length_string(max_length)
+        raise ValueError(f"不支持的 FuzzedDataProvider 调用: {method}<{template}>")
+
+
+class CorpusDistiller:
+    """
+    语料精简器：种子先在内存中按内容哈希去重，再可选地按消费模式归并，只有保留的种子才写盘
+
+    pattern: 可选，pattern(data) 返回种子在目标 fuzzer 中被 FuzzedDataProvider 解码出的结果，
+             解码结果相同的种子走相同的代码路径，只保留第一个
+    """
+
+    def __init__(self, output_dir: str, pattern: Optional[Callable[[bytes], Any]] = None):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.pattern = pattern
+        self._hashes: Dict[bytes, Path] = {}
+        self._patterns: Dict[Any, Path] = {}
+        self.input_count = 0
+        self.input_bytes = 0
+        self.kept_count = 0
+        self.kept_bytes = 0
+        self.duplicate_count = 0
+        self.pattern_count = 0
+
+    def add(self, filename: str, data: bytes) -> Tuple[Path, bool]:
+        """
+        提交一个种子
+
+        返回: (路径, 是否写入)；被精简掉时路径为与之重复的已保留种子
+        """
+        self.input_count += 1
+        self.input_bytes += len(data)
+
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if digest in self._hashes:
+            self.duplicate_count += 1
+            return self._hashes[digest], False
+
+        key = None
+        if self.pattern is not None:
+            key = self.pattern(data)
+            if key in self._patterns:
+                self.pattern_count += 1
+                self._hashes[digest] = self._patterns[key]
+                return self._patterns[key], False
+
+        filepath = self.output_dir / filename
+        filepath.write_bytes(data)
+        self._hashes[digest] = filepath
+        if key is not None:
+            self._patterns[key] = filepath
+        self.kept_count += 1
+        self.kept_bytes += len(data)
+        return filepath, True
+
+    def summary(self) -> str:
+        return (
+            f"语料精简: {self.input_count} 个种子 ({self.input_bytes} 字节) → "
+            f"{self.kept_count} 个 ({self.kept_bytes} 字节)，"
+            f"移除内容重复 {self.duplicate_count} 个、消费结果重复 {self.pattern_count} 个"
+        )
+
+
 # ============================================================================
 # Corpus 模式 - 领域特定语料生成
 # ============================================================================
@@ -890,15 +1172,21 @@ class CorpusGenerator:
     def __init__(self, output_dir: str):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.distiller = CorpusDistiller(output_dir)
 
     def generate(self) -> List[Path]:
         """生成corpus文件，返回生成的文件路径列表"""
         raise NotImplementedError
 
+    def generate_distilled(self) -> List[Path]:
+        """生成并精简corpus：内容重复的语料不写盘，返回去重后的文件路径列表"""
+        generated_files = list(dict.fromkeys(self.generate()))
+        print(f"[INFO] {self.distiller.summary()}")
+        return generated_files
+
     def _write_file(self, filename: str, content: bytes) -> Path:
-        """写入文件"""
-        filepath = self.output_dir / filename
-        filepath.write_bytes(content)
+        """写入文件（内容与已写入语料重复时不写盘，返回已有文件路径）"""
+        filepath, _ = self.distiller.add(filename, content)
         return filepath
 
 
@@ -1593,6 +1881,7 @@ def main():
   # Seed模式 - 生成通用种子
   python3 seed_generator.py seed -t json -o corpus/init.json
   python3 seed_generator.py seed --analyze path/to/fuzzer.cpp -o corpus/
+  python3 seed_generator.py seed --combo pairwise -p '[{"name":"width","type":"int32_t"}]' -o corpus/
   
   # Corpus模式 - 生成领域特定语料
   python3 seed_generator.py corpus --repo graphic_2d --type rscommand --output ./corpus/
@@ -1614,7 +1903,20 @@ def main():
     )
     seed_parser.add_argument("-o", "--output", required=True, help="输出文件路径或目录")
     seed_parser.add_argument(
-        "-p", "--params", help="自定义参数（JSON格式，仅custom类型使用）"
+        "-p",
+        "--params",
+        help="自定义参数（JSON格式，custom类型使用；--combo 时为参数列表 [{\"name\":..., \"type\":...}]）",
+    )
+    seed_parser.add_argument(
+        "--combo",
+        choices=COMBO_STRATEGIES,
+        help="按 --params 参数列表生成组合种子到 -o 目录（pairwise/stratified/cartesian）",
+    )
+    seed_parser.add_argument(
+        "--max-combinations",
+        type=int,
+        default=30,
+        help="组合种子最大数量（默认: 30）",
     )
     seed_parser.add_argument(
         "--analyze", help="分析fuzzer代码路径（自动推断种子类型并生成）"
@@ -1680,6 +1982,16 @@ def main():
                     print("错误: 参数格式不正确，应为JSON格式")
                     sys.exit(1)
 
+            if args.combo:
+                if not isinstance(params, list):
+                    print("错误: --combo 需要通过 --params 提供参数列表（JSON数组）")
+                    sys.exit(1)
+                generated = generate_combination_seeds(
+                    params, args.output, args.max_combinations, strategy=args.combo
+                )
+                print(f"[OK] 生成 {len(generated)} 个组合种子 ({args.combo}): {args.output}")
+                return
+
             if not generate_seed(args.type, args.output, params):
                 sys.exit(1)
 
@@ -1696,7 +2008,7 @@ def main():
 
         generator_class = CORPUS_GENERATORS[args.type]
         generator = generator_class(args.output)
-        generated_files = generator.generate()
+        generated_files = generator.generate_distilled()
 
         if generated_files:
             print(f"\n[OK] 成功生成 {len(generated_files)} 个语料文件")